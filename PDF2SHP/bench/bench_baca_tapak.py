@@ -0,0 +1,60 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+import geopandas as gpd
+
+from bench.synthetic import tapak_zip_bytes
+from pkkpr.shp import read_shp_zip
+
+# =========================================================
+# BENCHMARK BACA SHP ZIP TAPAK
+# =========================================================
+# python -m bench.bench_baca_tapak --features 20000 100000
+# Tapak "se-provinsi" (extent 3°) dengan beberapa kolom atribut; PKKPR di salah satu sudutnya.
+
+def baca_lama(data):
+    with tempfile.TemporaryDirectory() as tmp:
+        zipfile.ZipFile(io.BytesIO(data)).extractall(tmp)
+        for root, _, files in os.walk(tmp):
+            for f in files:
+                if f.lower().endswith(".shp"):
+                    return gpd.read_file(os.path.join(root, f))
+    return None
+
+
+def make_zip(n):
+    return tapak_zip_bytes(n, lon=107.5, lat=-6.9, extent=3.0)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    gdf = fn()
+    return time.perf_counter() - t0, gdf
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan ekstrak+read_file dengan baca /vsizip (+bbox/kolom)")
+    parser.add_argument("--features", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--bbox", type=float, nargs=4, default=[106.0, -8.4, 106.1, -8.3])
+    args = parser.parse_args(argv)
+
+    print(f"{'fitur':>7} {'cara':<22} {'detik':>7} {'fitur dibaca':>13} {'memori (MB)':>12}")
+    for n in args.features:
+        data = make_zip(n)
+        runs = [
+            ("ekstrak + read_file", lambda: baca_lama(data)),
+            ("/vsizip", lambda: read_shp_zip(io.BytesIO(data))),
+            ("/vsizip + bbox + kolom", lambda: read_shp_zip(io.BytesIO(data), bbox=args.bbox, columns=["status"])),
+        ]
+        for name, fn in runs:
+            dt, gdf = timed(fn)
+            mb = gdf.memory_usage(deep=True).sum() / 1024 / 1024
+            print(f"{n:>7} {name:<22} {dt:>7.2f} {len(gdf):>13} {mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+import shapely
+
+from bench.synthetic import make_tapak_gdf
+from pkkpr.export import EXPORT_FORMATS, available_formats, export_bytes
+
+# =========================================================
+# BENCHMARK FORMAT EXPORT
+# =========================================================
+# python -m bench.bench_export --features 20000 --polygons 50
+# Persil sintetis dipadatkan lalu digabung menjadi multipolygon besar (mirip hasil PKKPR banyak sumur).
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukuran dan waktu tulis tiap format export")
+    parser.add_argument("--features", type=int, default=20000)
+    parser.add_argument("--polygons", type=int, default=50)
+    parser.add_argument("--segment", type=float, default=0.00002)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    gdf = make_tapak_gdf(args.features)
+    gdf["geometry"] = shapely.segmentize(gdf.geometry.to_numpy(), args.segment)
+    gdf = gdf.dissolve(by=gdf["id"] % args.polygons).reset_index(drop=True)
+    n_vertex = int(shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum())
+    print(f"{len(gdf)} multipolygon, {n_vertex} vertex")
+
+    print(f"{'format':<12} {'ukuran (MB)':>12} {'tulis (s)':>10}")
+    for label in available_formats():
+        kode = EXPORT_FORMATS[label][0]
+        best = None
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            data = export_bytes(kode, gdf)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        print(f"{label:<12} {len(data) / 1024 / 1024:>12.2f} {best:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon
+from shapely.validation import make_valid
+
+from bench.synthetic import make_tapak_gdf
+from pkkpr.geometry import fix_geometry
+
+# =========================================================
+# BENCHMARK PERBAIKAN GEOMETRI
+# =========================================================
+# python -m bench.bench_fix_geometry --features 10000 50000 --invalid 0 0.02
+
+def fix_geometry_lama(gdf):
+    # make_valid + clean_geom per baris, lalu buffer(0) untuk semua
+    gdf = gdf.copy()
+    gdf["geometry"] = gdf.geometry.apply(make_valid)
+
+    def clean_geom(geom):
+        if geom is None:
+            return None
+        if geom.geom_type == "GeometryCollection":
+            polys = [g for g in geom.geoms if g.geom_type in ["Polygon", "MultiPolygon"]]
+            if len(polys) == 0:
+                return None
+            if len(polys) == 1:
+                return polys[0]
+            return MultiPolygon(polys)
+        return geom
+
+    gdf["geometry"] = gdf.geometry.apply(clean_geom)
+    gdf = gdf[gdf.geometry.notnull()]
+    gdf["geometry"] = gdf.geometry.buffer(0)
+    return gdf
+
+
+def make_layer(n, invalid_frac, seed=0):
+    # Persil dipadatkan (segmentize) dengan sebagian kecil berbentuk "bowtie" (invalid)
+    gdf = make_tapak_gdf(n, extent=0.5, seed=seed)
+    geoms = shapely.segmentize(gdf.geometry.to_numpy(), 0.0001)
+    rng = np.random.default_rng(seed)
+    bad = rng.random(n) < invalid_frac
+    coords = [shapely.get_coordinates(g) for g in geoms[bad]]
+    geoms[bad] = [shapely.Polygon(np.vstack([c[:1], c[len(c) // 2:], c[1:len(c) // 2], c[:1]])) for c in coords]
+    gdf["geometry"] = geoms
+    return gdf
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan fix_geometry per baris dengan versi vektor")
+    parser.add_argument("--features", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--invalid", type=float, nargs="+", default=[0.0, 0.02])
+    args = parser.parse_args(argv)
+
+    print(f"{'fitur':>7} {'invalid':>8} {'lama (s)':>9} {'vektor (s)':>11} {'speedup':>8} {'selisih luas':>13}")
+    for n, frac in [(n, f) for n in args.features for f in args.invalid]:
+        gdf = make_layer(n, frac)
+        t0 = time.perf_counter()
+        old = fix_geometry_lama(gdf)
+        t_old = time.perf_counter() - t0
+        stats = {}
+        t0 = time.perf_counter()
+        new = fix_geometry(gdf, stats=stats)
+        t_new = time.perf_counter() - t0
+        diff = abs(old.area.sum() - new.area.sum())
+        print(f"{n:>7} {stats['diperbaiki']:>8} {t_old:>9.2f} {t_new:>11.2f} {t_old / t_new:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+# =========================================================
+# BENCHMARK WAKTU IMPOR (COLD START APLIKASI)
+# =========================================================
+# python -m bench.bench_impor --repeat 5 --top 15
+# Menjalankan semua impor tingkat atas pdf2shp.py di proses baru (seperti container yang baru start),
+# mengukur waktunya dan mencetak modul paling mahal dari python -X importtime.
+# Dependensi berat yang seharusnya baru dimuat saat tahapnya jalan (peta, PNG, PDF) tidak boleh ikut.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "pdf2shp.py")
+LAZY_MODULES = ("folium", "streamlit_folium", "matplotlib", "pdfplumber", "xyzservices", "PIL")
+
+
+def app_imports(path=APP):
+    # Impor tingkat atas skrip aplikasi (tanpa menjalankan UI Streamlit)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+
+def measure_import(repeat=3):
+    # (detik tercepat, modul berat yang ikut dimuat) untuk impor aplikasi di proses baru
+    code = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        + app_imports() + "\n"
+        "print(time.perf_counter() - t0)\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    times = []
+    for _ in range(repeat):
+        out = _run(code).stdout.split("\n")
+        times.append(float(out[0]))
+        loaded = [m for m in out[1].split(",") if m]
+    return min(times), loaded
+
+
+def import_profile():
+    # [(kumulatif us, sendiri us, modul)] dari python -X importtime
+    rows = []
+    for line in _run(app_imports(), "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cum_us), int(self_us), name.strip()))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Waktu impor aplikasi di proses baru (cold start)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Modul termahal yang ditampilkan")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    seconds, loaded = measure_import(args.repeat)
+    print(f"impor aplikasi     : {seconds:.3f} s (tercepat dari {args.repeat}, {time.perf_counter() - t0:.1f} s total)")
+    print(f"dimuat terlalu awal: {', '.join(loaded) or '-'}")
+
+    print(f"\n{'kumulatif (ms)':>15} {'sendiri (ms)':>13}  modul")
+    for cum, own, name in sorted(import_profile(), reverse=True)[:args.top]:
+        print(f"{cum / 1000:>15.1f} {own / 1000:>13.1f}  {name}")
+    return 1 if loaded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
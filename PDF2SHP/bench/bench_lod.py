@@ -0,0 +1,50 @@
+import argparse
+import time
+
+import folium
+import shapely
+
+from bench.synthetic import make_tapak_gdf
+from pkkpr.peta import MAP_MAX_BYTES, lod_geojson
+
+# =========================================================
+# BENCHMARK LOD LAYER PETA
+# =========================================================
+# python -m bench.bench_lod --features 1000 10000 50000 --max-kb 2048
+# Tapak sintetis dipadatkan (segmentize) agar mirip batas persil hasil digitasi.
+
+def html_bytes(data):
+    t0 = time.perf_counter()
+    m = folium.Map(location=[-6.2, 106.8], zoom_start=14, tiles=None)
+    folium.GeoJson(data, style_function=lambda x: {"color": "red", "weight": 2}).add_to(m)
+    size = len(m.get_root().render().encode("utf-8"))
+    return time.perf_counter() - t0, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukuran dan waktu layer peta: geometri penuh vs LOD")
+    parser.add_argument("--features", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--segment", type=float, default=0.00002, help="Jarak vertex batas persil (derajat)")
+    parser.add_argument("--max-kb", type=int, default=MAP_MAX_BYTES // 1024)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'fitur':>7} {'vertex':>9} {'penuh (s)':>10} {'penuh (KB)':>11} "
+        f"{'lod (s)':>8} {'lod (KB)':>9} {'vertex lod':>11} {'toleransi':>10}"
+    )
+    for n in args.features:
+        gdf = make_tapak_gdf(n)
+        gdf["geometry"] = shapely.segmentize(gdf.geometry.to_numpy(), args.segment)
+        t_full, b_full = html_bytes(gdf)
+        t0 = time.perf_counter()
+        data, info = lod_geojson(gdf, args.max_kb * 1024)
+        _, b_lod = html_bytes(data)
+        t_lod = time.perf_counter() - t0
+        print(
+            f"{n:>7} {info['vertex_asli']:>9} {t_full:>10.2f} {b_full / 1024:>11.0f} "
+            f"{t_lod:>8.2f} {b_lod / 1024:>9.0f} {info['vertex_peta']:>11} {info['toleransi']:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import copy
+import random
+import time
+
+import geopandas as gpd
+from shapely.geometry import Polygon
+from shapely.validation import make_valid
+
+from bench.synthetic import polygon_coords
+from pkkpr.geometry import close_ring, get_utm_info, hitung_luas_pkkpr
+
+# =========================================================
+# BENCHMARK LUAS PKKPR
+# =========================================================
+# python -m bench.bench_luas --polygons 10 200 1000
+
+def luas_lama(results):
+    # Cara lama: satu GeoDataFrame + to_crs per poligon, lalu semua poligon dibangun ulang untuk total
+    total_luas_ha = 0
+    for r in results:
+        try:
+            poly = Polygon(close_ring(r["coords"]))
+            centroid = poly.centroid
+            utm_epsg, _ = get_utm_info(centroid.x, centroid.y)
+            r["luas_ha"] = gpd.GeoDataFrame(geometry=[poly], crs="EPSG:4326").to_crs(utm_epsg).area.iloc[0] / 10000
+            total_luas_ha += r["luas_ha"]
+        except:
+            r["luas_ha"] = 0
+    polys = [make_valid(Polygon(close_ring(r["coords"]))) for r in results if len(r.get("coords", [])) >= 3]
+    gdf_all = gpd.GeoDataFrame(geometry=polys, crs="EPSG:4326")
+    c_all = gdf_all.geometry.union_all().centroid
+    epsg_all, _ = get_utm_info(c_all.x, c_all.y)
+    return total_luas_ha, gdf_all.to_crs(epsg_all).area.sum(), gdf_all.to_crs(3857).area.sum()
+
+
+def make_results(n, points=20, seed=0):
+    # Sumur/tapak kecil tersebar di sekitar batas zona UTM 48/49
+    rnd = random.Random(seed)
+    return [
+        {"coords": polygon_coords(points, lon=rnd.uniform(104, 110), lat=rnd.uniform(-7, -2), radius=0.002, seed=seed + i)}
+        for i in range(n)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan luas per poligon (to_crs satu-satu) dengan hitung_luas_pkkpr")
+    parser.add_argument("--polygons", type=int, nargs="+", default=[10, 200, 1000])
+    parser.add_argument("--points", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'poligon':>8} {'lama (s)':>9} {'batch (s)':>10} {'speedup':>8} {'selisih total (Ha)':>19} {'geodesik (s)':>13}")
+    for n in args.polygons:
+        results = make_results(n, args.points)
+        r_old = copy.deepcopy(results)
+        t0 = time.perf_counter()
+        total_old, _, _ = luas_lama(r_old)
+        t_old = time.perf_counter() - t0
+        r_new = copy.deepcopy(results)
+        t0 = time.perf_counter()
+        luas = hitung_luas_pkkpr(r_new)
+        t_new = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        hitung_luas_pkkpr(copy.deepcopy(results), geodesic=True)
+        t_geod = time.perf_counter() - t0
+        diff = abs(luas["total_ha"] - total_old)
+        print(f"{n:>8} {t_old:>9.3f} {t_new:>10.3f} {t_old / t_new:>7.1f}x {diff:>19.9f} {t_geod:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+import numpy as np
+
+from pkkpr.wilayah import Gazetteer, haversine_km
+
+# =========================================================
+# BENCHMARK KECAMATAN TERDEKAT
+# =========================================================
+# python -m bench.bench_nearest --points 1000 10000
+
+def nearest_linear(gazetteer, lon, lat):
+    # Pembanding: scan semua titik Kecamatan.csv untuk setiap titik
+    xy = gazetteer._points_xy
+    out = []
+    for x, y in zip(lon, lat):
+        out.append(int(np.argmin((xy[:, 0] - x) ** 2 + (xy[:, 1] - y) ** 2)))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan STRtree dan scan linear untuk kecamatan terdekat")
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    gazetteer = Gazetteer.load()
+    print(f"Gazetteer.load + STRtree : {(time.perf_counter() - t0) * 1000:.0f} ms ({len(gazetteer._points_xy)} titik)")
+
+    rng = np.random.default_rng(0)
+    for n in args.points:
+        lon = rng.uniform(95, 141, n)
+        lat = rng.uniform(-11, 6, n)
+        t0 = time.perf_counter()
+        near = gazetteer.nearest_many(lon, lat)
+        t_tree = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        idx = nearest_linear(gazetteer, lon, lat)
+        t_lin = time.perf_counter() - t0
+        # Jarak sama = titik terdekat sama (atau setara bila berjarak identik)
+        d_lin = haversine_km(lon, lat, gazetteer._points_xy[idx, 0], gazetteer._points_xy[idx, 1])
+        same = np.allclose(near["JARAK_KM"].to_numpy(dtype=float), d_lin)
+        print(
+            f"{n:>7} titik : STRtree {t_tree / n * 1e6:7.1f} us/titik | linear {t_lin / n * 1e6:7.1f} us/titik "
+            f"| {'sama' if same else 'BEDA'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
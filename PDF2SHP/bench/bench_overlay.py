@@ -0,0 +1,42 @@
+import argparse
+import time
+
+import geopandas as gpd
+
+from bench.synthetic import make_pkkpr_gdf, make_tapak_gdf
+from pkkpr.overlay import overlay_areas
+
+# =========================================================
+# BENCHMARK OVERLAY TAPAK vs PKKPR
+# =========================================================
+# python -m bench.bench_overlay --features 1000 10000 100000
+
+def overlay_lama(gdf_tapak_utm, gdf_poly_utm):
+    inter = gpd.overlay(gdf_tapak_utm, gdf_poly_utm, how="intersection")
+    luas_overlap = inter.area.sum()
+    luas_tapak = gdf_tapak_utm.area.sum()
+    return {"luas_tapak": luas_tapak, "luas_overlap": luas_overlap, "luas_luar": max(0, luas_tapak - luas_overlap)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan gpd.overlay dengan overlay_areas")
+    parser.add_argument("--features", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--epsg", type=int, default=32748)
+    args = parser.parse_args(argv)
+
+    gdf_poly = make_pkkpr_gdf().to_crs(args.epsg)
+    print(f"{'fitur':>8} {'gpd.overlay (s)':>16} {'overlay_areas (s)':>18} {'speedup':>8} {'selisih overlap (m²)':>21}")
+    for n in args.features:
+        gdf_tapak = make_tapak_gdf(n).to_crs(args.epsg)
+        t0 = time.perf_counter()
+        expected = overlay_lama(gdf_tapak, gdf_poly)
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, got = overlay_areas(gdf_tapak, gdf_poly)
+        t_new = time.perf_counter() - t0
+        diff = abs(got["luas_overlap"] - expected["luas_overlap"])
+        print(f"{n:>8} {t_old:>16.3f} {t_new:>18.3f} {t_old / t_new:>7.1f}x {diff:>21.6f}")
+
+
+if __name__ == "__main__":
+    main()
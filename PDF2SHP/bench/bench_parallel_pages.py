@@ -0,0 +1,50 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pkkpr.parse import extract_tables_and_coords_from_pdf
+
+# =========================================================
+# BENCHMARK EKSTRAKSI TABEL PARALEL PER HALAMAN
+# =========================================================
+# python -m bench.bench_parallel_pages [pdf ...] --workers 4
+
+def time_extract(path, workers):
+    with open(path, "rb") as f:
+        t0 = time.perf_counter()
+        results = extract_tables_and_coords_from_pdf(f, workers=workers)
+        return time.perf_counter() - t0, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan ekstraksi PDF sekuensial dan paralel per halaman")
+    parser.add_argument("pdf", nargs="*")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    paths = args.pdf
+    tmpdir = None
+    if not paths:
+        from bench.synthetic import write_pkkpr_pdf
+        tmpdir = tempfile.TemporaryDirectory()
+        paths = [write_pkkpr_pdf(os.path.join(tmpdir.name, "pkkpr_150.pdf"), n_pages=150, n_tables=3)]
+
+    # Pemanasan pool agar waktu start proses tidak ikut terhitung
+    time_extract(paths[0], args.workers)
+
+    print(f"{'dokumen':<28} {'1 proses (s)':>12} {f'{args.workers} proses (s)':>14} {'speedup':>8} {'sama':>5}")
+    for path in paths:
+        t_seq, r_seq = time_extract(path, 1)
+        t_par, r_par = time_extract(path, args.workers)
+        print(
+            f"{os.path.basename(path):<28} {t_seq:>12.2f} {t_par:>14.2f} "
+            f"{t_seq / t_par:>7.1f}x {'ya' if r_seq == r_par else 'TIDAK':>5}"
+        )
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
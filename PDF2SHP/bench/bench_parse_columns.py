@@ -0,0 +1,46 @@
+import argparse
+import time
+
+import pandas as pd
+
+from bench.synthetic import format_coordinate, polygon_coords
+from pkkpr.parse import table_coordinates, table_coordinates_rowwise
+
+# =========================================================
+# BENCHMARK PARSING KOLOM KOORDINAT
+# =========================================================
+# python -m bench.bench_parse_columns --rows 1000 10000 50000
+
+def make_table(n_rows, fmt, wells=50):
+    coords = polygon_coords(n_rows)
+    per_well = max(1, n_rows // wells)
+    rows = []
+    for i, (x, y) in enumerate(coords):
+        ket = f"Sumur {i // per_well + 1}" if i % per_well == 0 else ""
+        rows.append([str(i + 1), format_coordinate(x, fmt, True), format_coordinate(y, fmt, False), ket])
+    return pd.DataFrame(rows, columns=["no", "bujur", "lintang", "keterangan"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan parsing koordinat per baris dan per kolom")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args(argv)
+
+    print(f"{'baris':>8} {'format':>8} {'iterrows (s)':>13} {'vektor (s)':>11} {'speedup':>8} {'sama':>5}")
+    for n in args.rows:
+        for fmt in ("decimal", "comma", "dms"):
+            df = make_table(n, fmt)
+            t0 = time.perf_counter()
+            expected = table_coordinates_rowwise(df, "bujur", "lintang", "no", "keterangan")
+            t_row = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            got = table_coordinates(df, "bujur", "lintang", "no", "keterangan")
+            t_vec = time.perf_counter() - t0
+            print(
+                f"{n:>8} {fmt:>8} {t_row:>13.3f} {t_vec:>11.3f} "
+                f"{t_row / t_vec:>7.1f}x {'ya' if got == expected else 'TIDAK':>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import time
+
+import folium
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import Point
+
+from pkkpr.peta import CLUSTER_MIN_POINTS, add_vertex_layer
+
+# =========================================================
+# BENCHMARK LAYER TITIK PETA
+# =========================================================
+# python -m bench.bench_peta --points 100 1000 5000
+# Mengukur ukuran HTML yang dikirim ke st_folium dan waktu membangunnya di Python
+# (waktu render di browser tidak terukur di sini, tetapi sebanding dengan jumlah objek Leaflet).
+
+def make_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    xs = 106.8 + rng.uniform(-0.05, 0.05, n)
+    ys = -6.2 + rng.uniform(-0.05, 0.05, n)
+    return gpd.GeoDataFrame({"No": range(1, n + 1)}, geometry=[Point(x, y) for x, y in zip(xs, ys)], crs="EPSG:4326")
+
+
+def titik_lama(m, gdf_points):
+    for i, row in gdf_points.iterrows():
+        folium.CircleMarker(
+            location=[row.geometry.y, row.geometry.x],
+            radius=4,
+            color="black",
+            fill=True,
+            fill_color="orange",
+            fill_opacity=1,
+            popup=f"Titik {i+1}"
+        ).add_to(m)
+
+
+def render(add, gdf_points, **kwargs):
+    t0 = time.perf_counter()
+    m = folium.Map(location=[-6.2, 106.8], zoom_start=14, tiles=None, **kwargs)
+    add(m, gdf_points)
+    html = m.get_root().render()
+    return time.perf_counter() - t0, len(html.encode("utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan CircleMarker per titik dengan satu layer titik")
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--cluster-min", type=int, default=CLUSTER_MIN_POINTS)
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>7} {'lama (s)':>9} {'lama (KB)':>10} {'baru (s)':>9} {'baru (KB)':>10} {'mode':>8}")
+    for n in args.points:
+        gdf = make_points(n)
+        t_old, b_old = render(titik_lama, gdf)
+        t_new, b_new = render(
+            lambda m, g: add_vertex_layer(m, g, cluster_min=args.cluster_min), gdf, prefer_canvas=True
+        )
+        mode = "cluster" if args.cluster_min and n >= args.cluster_min else "geojson"
+        print(f"{n:>7} {t_old:>9.3f} {b_old / 1024:>10.1f} {t_new:>9.3f} {b_new / 1024:>10.1f} {mode:>8}")
+
+
+if __name__ == "__main__":
+    main()
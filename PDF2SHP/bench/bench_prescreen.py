@@ -0,0 +1,56 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pkkpr.parse import extract_tables_and_coords_from_pdf
+
+# =========================================================
+# BENCHMARK PRE-SCREENING HALAMAN
+# =========================================================
+# python -m bench.bench_prescreen [pdf ...]
+# Tanpa argumen: dokumen sintetis 40/150/300 halaman dengan 2 tabel koordinat.
+
+def time_extract(path, prescreen, repeat):
+    best = None
+    results = None
+    for _ in range(repeat):
+        with open(path, "rb") as f:
+            t0 = time.perf_counter()
+            results = extract_tables_and_coords_from_pdf(f, prescreen=prescreen)
+            dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan ekstraksi PDF dengan dan tanpa pre-screening halaman")
+    parser.add_argument("pdf", nargs="*")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    paths = args.pdf
+    tmpdir = None
+    if not paths:
+        from bench.synthetic import write_pkkpr_pdf
+        tmpdir = tempfile.TemporaryDirectory()
+        paths = [
+            write_pkkpr_pdf(os.path.join(tmpdir.name, f"pkkpr_{n}.pdf"), n_pages=n, n_tables=2)
+            for n in (40, 150, 300)
+        ]
+
+    print(f"{'dokumen':<28} {'semua (s)':>10} {'prescreen (s)':>14} {'speedup':>8} {'sama':>5}")
+    for path in paths:
+        t_full, r_full = time_extract(path, False, args.repeat)
+        t_pre, r_pre = time_extract(path, True, args.repeat)
+        print(
+            f"{os.path.basename(path):<28} {t_full:>10.2f} {t_pre:>14.2f} "
+            f"{t_full / t_pre:>7.1f}x {'ya' if r_full == r_pre else 'TIDAK':>5}"
+        )
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import shapely
+
+from pkkpr.registry import PkkprRegistry
+
+# =========================================================
+# BENCHMARK REGISTRY PKKPR
+# =========================================================
+# python -m bench.bench_registry --sizes 1000 10000 100000 --query 100
+# Latensi daftar (per dokumen) dan cek duplikat/tumpang tindih saat registry makin besar,
+# dibandingkan dengan cek tanpa indeks (semua poligon dibaca lalu diuji).
+
+INDONESIA = (95.0, -11.0, 141.0, 6.0)
+
+
+def make_polygons(n, seed=0):
+    # Persil persegi acak 100-500 m di seluruh wilayah Indonesia
+    rng = np.random.default_rng(seed)
+    w, s, e, n_ = INDONESIA
+    x = rng.uniform(w, e, n)
+    y = rng.uniform(s, n_, n)
+    size = rng.uniform(0.001, 0.005, n)
+    return shapely.box(x, y, x + size, y + size)
+
+
+def check_tanpa_indeks(path, geoms):
+    # Pendekatan tanpa registry berindeks: baca semua poligon tersimpan, uji satu per satu
+    conn = sqlite3.connect(path)
+    stored = shapely.from_wkb([r[0] for r in conn.execute("SELECT geom FROM pkkpr")])
+    conn.close()
+    return sum(int(shapely.intersects(g, stored).sum()) for g in geoms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latensi registry PKKPR (SQLite + R-tree) terhadap jumlah permit")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--query", type=int, default=100, help="Poligon per cek (setengah duplikat)")
+    parser.add_argument("--dokumen", type=int, default=1000, help="Poligon per pendaftaran")
+    parser.add_argument("--tanpa-indeks-max", type=int, default=10000, help="Lewati cek tanpa indeks di atas ini")
+    args = parser.parse_args(argv)
+
+    geoms = make_polygons(max(args.sizes))
+    rng = np.random.default_rng(1)
+    print(f"{'permit':>8} {'daftar (ms/dok)':>16} {'cek (ms)':>9} {'temuan':>7} {'tanpa indeks (ms)':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "registry.sqlite")
+        registry = PkkprRegistry(path)
+        stored = 0
+        for size in sorted(args.sizes):
+            t_insert = []
+            while stored < size:
+                batch = geoms[stored:min(size, stored + args.dokumen)]
+                t0 = time.perf_counter()
+                registry.register(batch, f"dok{stored}", f"dok{stored}.pdf")
+                t_insert.append(time.perf_counter() - t0)
+                stored += len(batch)
+
+            half = args.query // 2
+            query = np.concatenate([
+                geoms[rng.integers(0, stored, half)],
+                make_polygons(args.query - half, seed=size),
+            ])
+            t0 = time.perf_counter()
+            found = registry.check(query)
+            t_check = time.perf_counter() - t0
+
+            t_scan = ""
+            if stored <= args.tanpa_indeks_max:
+                t0 = time.perf_counter()
+                check_tanpa_indeks(path, query)
+                t_scan = f"{(time.perf_counter() - t0) * 1000:.1f}"
+            print(
+                f"{stored:>8} {np.median(t_insert) * 1000:>16.1f} {t_check * 1000:>9.1f} "
+                f"{len(found):>7} {t_scan:>18}"
+            )
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
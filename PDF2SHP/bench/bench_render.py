@@ -0,0 +1,66 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from bench.synthetic import make_pkkpr_gdf, make_tapak_gdf
+from pkkpr.render import RenderPool
+
+# =========================================================
+# BENCHMARK POOL RENDER PNG
+# =========================================================
+# python -m bench.bench_render --sessions 1 4 8 --workers 1 2 4
+# Setiap "sesi" adalah thread yang meminta PNG berbeda (tanpa cache) secara bersamaan;
+# latensi diukur dari sisi sesi (antre + render). Tanpa basemap agar tidak bergantung jaringan.
+
+def run_sessions(pool, layers, n_sessions, repeat):
+    latencies = []
+    rejected = 0
+    lock = threading.Lock()
+
+    def session(i):
+        nonlocal rejected
+        for r in range(repeat):
+            t0 = time.perf_counter()
+            try:
+                pool.render(f"sesi{i}_{r}", *layers[i % len(layers)])
+            except RuntimeError:
+                with lock:
+                    rejected += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(n_sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, np.array(latencies), rejected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latensi render PNG untuk N sesi bersamaan")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--queue", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--tapak", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    poly = make_pkkpr_gdf().to_crs(3857)
+    layers = [(poly, make_tapak_gdf(args.tapak, seed=s).to_crs(3857), None) for s in range(4)]
+
+    print(f"{'sesi':>5} {'worker':>7} {'total (s)':>10} {'p50 (s)':>8} {'p90 (s)':>8} {'p99 (s)':>8} {'ditolak':>8}")
+    for workers in args.workers:
+        for n in args.sessions:
+            pool = RenderPool(workers=workers, max_queue=args.queue)
+            total, lat, rejected = run_sessions(pool, layers, n, args.repeat)
+            p50, p90, p99 = (np.percentile(lat, p) if len(lat) else float("nan") for p in (50, 90, 99))
+            print(f"{n:>5} {workers:>7} {total:>10.2f} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {rejected:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pdfplumber
+
+from bench.synthetic import write_pkkpr_pdf
+from pkkpr.parse import (
+    build_results_from_tables,
+    detect_coordinate_type,
+    extract_page_tables,
+    get_table_priority,
+    iter_pdf_results,
+    page_may_hold_coordinates,
+    parse_coords_from_text_block,
+)
+
+# =========================================================
+# BENCHMARK EKSTRAKSI BERTAHAP
+# =========================================================
+# python -m bench.bench_streaming --pages 300 --tables 5
+# Memori puncak (tracemalloc) dan waktu sampai PKKPR pertama: ekstraksi lama (semua tabel
+# dikumpulkan, cache halaman tetap hidup, PDF dibuka ulang untuk teks) vs iter_pdf_results.
+
+def extract_lama(path):
+    with open(path, "rb") as f:
+        with pdfplumber.open(f) as pdf:
+            candidate_tables = []
+            for page in pdf.pages:
+                page_no = page.page_number - 1
+                page_text = page.extract_text() or ""
+                priority = get_table_priority(page_text)
+                if not page_may_hold_coordinates(page_text):
+                    continue
+                candidate_tables += extract_page_tables(page, page_no, priority)
+            results = build_results_from_tables(candidate_tables)
+        if results:
+            return results
+        f.seek(0)
+        full_text = ""
+        with pdfplumber.open(f) as pdf:
+            for page in pdf.pages:
+                full_text += (page.extract_text() or "") + "\n"
+    coords = parse_coords_from_text_block(full_text)
+    if len(coords) >= 3:
+        return [{"coords": coords, "coord_type": detect_coordinate_type(coords), "page": 0, "nama": "PKKPR 1"}]
+    return []
+
+
+def extract_bertahap(path, first):
+    with open(path, "rb") as f:
+        for event, data in iter_pdf_results(f):
+            if event == "pkkpr" and not first:
+                first.append(time.perf_counter())
+            if event == "selesai":
+                return data
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024, t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memori puncak ekstraksi PDF: sekaligus vs bertahap")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--tables", type=int, default=5)
+    parser.add_argument("--pdf", default=None, help="PDF sendiri (default: dokumen sintetis)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf or write_pkkpr_pdf(os.path.join(tmp, "pkkpr.pdf"), n_pages=args.pages, n_tables=args.tables)
+        old, t_old, peak_old, _ = measure(extract_lama, path)
+        first = []
+        new, t_new, peak_new, t0 = measure(extract_bertahap, path, first)
+
+    t_first = f"{first[0] - t0:.2f}" if first else "-"
+    print(f"{'versi':<9} {'pkkpr':>6} {'total (s)':>10} {'pkkpr pertama (s)':>18} {'peak (MB)':>10}")
+    print(f"{'lama':<9} {len(old):>6} {t_old:>10.2f} {t_old:>18.2f} {peak_old:>10.1f}")
+    print(f"{'bertahap':<9} {len(new):>6} {t_new:>10.2f} {t_first:>18} {peak_new:>10.1f}")
+    print(f"hasil sama: {old == new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import folium
+import geopandas as gpd
+
+from bench.bench_impor import measure_import
+from bench.synthetic import tapak_zip_bytes, write_pkkpr_pdf
+from pkkpr.export import export_bytes
+from pkkpr.geometry import build_total_points, fix_geometry, get_utm_info, hitung_luas_pkkpr
+from pkkpr.overlay import overlay_areas
+from pkkpr.parse import extract_tables_and_coords_from_pdf
+from pkkpr.peta import add_vertex_layer, lod_geojson
+from pkkpr.render import render_peta_png
+from pkkpr.reproject import reproject_gdf
+from pkkpr.shp import read_shp_zip
+
+# =========================================================
+# BENCHMARK SELURUH TAHAP PIPELINE
+# =========================================================
+# python -m bench.bench_suite                       bandingkan dengan bench/baseline.json
+# python -m bench.bench_suite --simpan              tulis ulang baseline (mesin ini)
+# python -m bench.bench_suite --pages 100 --format dms --no-lanjutan --tapak 50000 --baseline lain.json
+# Korpus sintetis (PDF PKKPR + SHP ZIP tapak) dibuat sekali, lalu tiap tahap diukur --repeat kali
+# (diambil yang tercepat). Tahap lebih lambat dari baseline * (1 + toleransi) dan --min-selisih, atau hasilnya
+# berbeda dari baseline dianggap regresi (exit code 1). Korpus berbeda = tidak dibandingkan; mesin berbeda
+# (python/platform/cpu) = hanya hasil yang dicek, waktu ditampilkan tanpa status. Tahap "impor" = cold start aplikasi di proses baru; hasilnya daftar
+# dependensi berat yang ikut dimuat saat start (harus kosong, lihat bench.bench_impor).
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def make_corpus(folder, args):
+    pdf = write_pkkpr_pdf(
+        os.path.join(folder, "pkkpr.pdf"),
+        n_pages=args.pages,
+        n_tables=args.tables,
+        points_per_table=args.titik,
+        fmt=args.format,
+        wells=args.sumur,
+        continuation=args.lanjutan,
+    )
+    with open(pdf, "rb") as f:
+        pdf_bytes = f.read()
+    return pdf_bytes, tapak_zip_bytes(args.tapak, lon=106.85, lat=-6.25, extent=0.3, folder="data")
+
+
+def build_map(gdf_poly, gdf_tapak, gdf_points):
+    # Sama dengan peta di aplikasi (tanpa st_folium): layer LOD + layer titik, lalu HTML
+    centroid = gdf_poly.union_all().centroid
+    m = folium.Map(location=[centroid.y, centroid.x], zoom_start=14, tiles=None, prefer_canvas=True)
+    size = 0
+    for gdf in (gdf_poly, gdf_tapak):
+        data, info = lod_geojson(gdf)
+        folium.GeoJson(data).add_to(m)
+        size += info["bytes"]
+    add_vertex_layer(m, gdf_points)
+    m.get_root().render()
+    return size
+
+
+def run_stages(pdf_bytes, tapak_bytes):
+    # (nama tahap, fungsi) berurutan; tiap fungsi memakai hasil tahap sebelumnya dari state
+    # dan mengembalikan nilai ringkas untuk cek hasil terhadap baseline
+    state = {}
+
+    def impor():
+        # Waktu diukur termasuk start interpreter baru, seperti container yang baru jalan
+        return measure_import(repeat=1)[1]
+
+    def parse():
+        state["results"] = extract_tables_and_coords_from_pdf(io.BytesIO(pdf_bytes))
+        return [len(state["results"]), sum(len(r["coords"]) for r in state["results"])]
+
+    def luas():
+        state["luas"] = hitung_luas_pkkpr([dict(r) for r in state["results"]])
+        state["poly"] = gpd.GeoDataFrame(geometry=state["luas"]["polygons"], crs="EPSG:4326")
+        state["points"] = build_total_points(state["results"])
+        return round(state["luas"]["total_ha"], 4)
+
+    def baca_tapak():
+        state["tapak"] = read_shp_zip(io.BytesIO(tapak_bytes))
+        return len(state["tapak"])
+
+    def perbaikan_geometri():
+        state["tapak"] = fix_geometry(state["tapak"])
+        return len(state["tapak"])
+
+    def overlay():
+        c = state["poly"].union_all().centroid
+        epsg, _ = get_utm_info(c.x, c.y)
+        _, total = overlay_areas(reproject_gdf(state["tapak"], epsg), reproject_gdf(state["poly"], epsg))
+        return round(total["luas_overlap"], 1)
+
+    def peta():
+        return build_map(state["poly"], state["tapak"], state["points"])
+
+    def export_shp():
+        return len(export_bytes("shp", state["poly"], state["points"]))
+
+    def render_png():
+        png, _ = render_peta_png(
+            reproject_gdf(state["poly"], 3857),
+            reproject_gdf(state["tapak"], 3857),
+            reproject_gdf(state["points"], 3857),
+        )
+        return png[:8] == b"\x89PNG\r\n\x1a\n"
+
+    return [
+        ("impor", impor),
+        ("parse", parse),
+        ("luas", luas),
+        ("baca_tapak", baca_tapak),
+        ("perbaikan_geometri", perbaikan_geometri),
+        ("overlay", overlay),
+        ("peta", peta),
+        ("export_shp", export_shp),
+        ("render_png", render_png),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Waktu tiap tahap pipeline PKKPR dibandingkan dengan baseline JSON")
+    parser.add_argument("--pages", type=int, default=20, help="Halaman teks/peta PDF sintetis")
+    parser.add_argument("--tables", type=int, default=3, help="Tabel koordinat")
+    parser.add_argument("--titik", type=int, default=40, help="Titik per tabel")
+    parser.add_argument("--format", choices=["decimal", "comma", "dms"], default="decimal")
+    parser.add_argument("--sumur", type=int, default=4, help="Sumur pada tabel berkolom Keterangan (0 = tanpa)")
+    parser.add_argument("--lanjutan", action=argparse.BooleanOptionalAction, default=True, help="Pecah tiap tabel ke dua halaman")
+    parser.add_argument("--tapak", type=int, default=5000, help="Fitur SHP tapak")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--simpan", action="store_true", help="Simpan hasil sebagai baseline")
+    parser.add_argument("--toleransi", type=float, default=0.25, help="Batas lambat relatif terhadap baseline")
+    parser.add_argument("--min-selisih", type=float, default=0.02, help="Selisih (detik) di bawah ini dianggap derau")
+    args = parser.parse_args(argv)
+
+    korpus = {k: getattr(args, k) for k in ("pages", "tables", "titik", "format", "sumur", "lanjutan", "tapak")}
+    mesin = {"python": platform.python_version(), "platform": platform.platform(), "cpu": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_bytes, tapak_bytes = make_corpus(tmp, args)
+
+    tahap = {}
+    for name, fn in run_stages(pdf_bytes, tapak_bytes):
+        times = []
+        for _ in range(args.repeat):
+            gc.collect()
+            t0 = time.perf_counter()
+            nilai = fn()
+            times.append(time.perf_counter() - t0)
+        tahap[name] = {"detik": round(min(times), 4), "nilai": nilai}
+
+    if args.simpan:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "korpus": korpus,
+                "mesin": mesin,
+                "tahap": tahap,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline disimpan : {args.baseline}")
+
+    base = {}
+    cek_waktu = True
+    if not args.simpan and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("korpus") == korpus:
+            base = saved["tahap"]
+        else:
+            print(f"Korpus berbeda dengan baseline {args.baseline}, tidak dibandingkan")
+        if base and saved.get("mesin") != mesin:
+            cek_waktu = False
+            print(f"Mesin berbeda dengan baseline ({saved.get('mesin')} -> {mesin}); hanya hasil yang dicek")
+
+    regresi = 0
+    print(f"{'tahap':<20} {'detik':>8} {'baseline':>9} {'rasio':>6}  status")
+    for name, r in tahap.items():
+        b = base.get(name)
+        if b is None:
+            print(f"{name:<20} {r['detik']:>8.3f} {'-':>9} {'-':>6}")
+            continue
+        ratio = r["detik"] / b["detik"] if b["detik"] else 1.0
+        if r["nilai"] != b["nilai"]:
+            status = f"HASIL BEDA ({b['nilai']} -> {r['nilai']})"
+        elif not cek_waktu:
+            status = "-"
+        elif abs(r["detik"] - b["detik"]) < args.min_selisih:
+            status = "ok"
+        elif ratio > 1 + args.toleransi:
+            status = "LAMBAT"
+        elif ratio < 1 - args.toleransi:
+            status = "lebih cepat"
+        else:
+            status = "ok"
+        regresi += status.startswith(("LAMBAT", "HASIL"))
+        print(f"{name:<20} {r['detik']:>8.3f} {b['detik']:>9.3f} {ratio:>6.2f}  {status}")
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import mercantile
+from PIL import Image
+
+from pkkpr.tiles import TileStore, add_basemap
+
+# =========================================================
+# BENCHMARK CACHE TILE BASEMAP
+# =========================================================
+# python -m bench.bench_tiles [--sumber URL] --repeat 5
+# Tanpa --sumber: sumber tile lokal sintetis (file://) sebagai pengganti server tile,
+# sehingga hasil bisa diulang di server tanpa internet.
+
+def write_local_source(folder, w, s, e, n, zooms):
+    for z in zooms:
+        for t in mercantile.tiles(w, s, e, n, z):
+            os.makedirs(os.path.join(folder, str(z), str(t.x)), exist_ok=True)
+            Image.new("RGB", (256, 256), ((t.x * 37) % 256, (t.y * 91) % 256, (z * 15) % 256)).save(
+                os.path.join(folder, str(z), str(t.x), f"{t.y}.png")
+            )
+    return "file://" + folder.replace(os.sep, "/") + "/{z}/{x}/{y}.png"
+
+
+def render(store, source, bbox):
+    (x0, y0), (x1, y1) = mercantile.xy(bbox[0], bbox[1]), mercantile.xy(bbox[2], bbox[3])
+    t0 = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(10, 10), dpi=150)
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    used = add_basemap(ax, store, [source])
+    plt.close(fig)
+    return time.perf_counter() - t0, used
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Waktu basemap PNG: cache tile kosong vs terisi")
+    parser.add_argument("--sumber", default=None, help="Template URL tile (default: sumber lokal sintetis)")
+    parser.add_argument("--bbox", type=float, nargs=4, default=[106.78, -6.22, 106.86, -6.16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.sumber or write_local_source(os.path.join(tmp, "sumber"), *args.bbox, range(12, 16))
+        store = TileStore(os.path.join(tmp, "cache"))
+        t_cold, used = render(store, source, args.bbox)
+        print(f"cache kosong : {t_cold:.3f} s ({'ok' if used else 'gagal'})")
+        warm = [render(store, source, args.bbox)[0] for _ in range(args.repeat)]
+        print(f"cache terisi : {min(warm):.3f} s (min dari {args.repeat})")
+        offline = TileStore(os.path.join(tmp, "cache"), offline=True)
+        t_off, used = render(offline, source, args.bbox)
+        print(f"offline      : {t_off:.3f} s ({'ok' if used else 'gagal'})")
+        print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import time
+
+import pandas as pd
+
+from pkkpr.geometry import get_utm_info
+from pkkpr.wilayah import Gazetteer, read_wilayah_csv
+
+# =========================================================
+# BENCHMARK SIDEBAR ZONA UTM
+# =========================================================
+# python -m bench.bench_wilayah
+# "lama" meniru alur sidebar sebelum Gazetteer: read_csv + filter + iterrows setiap rerun.
+
+def rerun_lama(provinsi, kabupaten="", kecamatan=""):
+    df_wilayah = read_wilayah_csv()
+    sorted(df_wilayah["PROVINSI"].dropna().astype(str).unique().tolist())
+    df_filter = df_wilayah.copy()
+    if provinsi:
+        df_filter = df_filter[df_filter["PROVINSI"] == provinsi]
+    sorted(df_filter["KABUPATEN/KOTA"].dropna().astype(str).unique().tolist())
+    if kabupaten:
+        df_filter = df_filter[df_filter["KABUPATEN/KOTA"] == kabupaten]
+    sorted(df_filter["KECAMATAN"].dropna().astype(str).unique().tolist())
+    if kecamatan:
+        df_zona = df_filter[df_filter["KECAMATAN"] == kecamatan].copy()
+    elif kabupaten:
+        df_zona = df_filter[df_filter["KABUPATEN/KOTA"] == kabupaten].copy()
+    elif provinsi:
+        df_zona = df_filter[df_filter["PROVINSI"] == provinsi].copy()
+    else:
+        df_zona = pd.DataFrame()
+    zona_list = []
+    for _, row in df_zona.iterrows():
+        try:
+            epsg, zona = get_utm_info(float(row["X"]), float(row["Y"]))
+            zona_list.append((zona, epsg))
+        except:
+            pass
+    return sorted(set(zona_list))
+
+
+def rerun_baru(gazetteer, provinsi, kabupaten="", kecamatan=""):
+    gazetteer.provinsi_options
+    gazetteer.kabupaten_options(provinsi)
+    gazetteer.kecamatan_options(provinsi, kabupaten)
+    return gazetteer.zona_utm(provinsi, kabupaten, kecamatan)
+
+
+def timed(fn, *args, repeat=20):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan biaya startup dan rerun sidebar zona UTM")
+    parser.add_argument("--provinsi", default="Jawa Tengah")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    gazetteer = Gazetteer.load()
+    t_load = time.perf_counter() - t0
+    t_csv = timed(read_wilayah_csv, repeat=args.repeat)
+    print(f"startup  : read_csv {t_csv * 1000:.1f} ms | Gazetteer.load {t_load * 1000:.1f} ms (sekali per proses)")
+
+    kab = gazetteer.kabupaten_options(args.provinsi)[1]
+    kec = gazetteer.kecamatan_options(args.provinsi, kab)[1]
+    for label, sel in [("provinsi", (args.provinsi,)), ("kabupaten", (args.provinsi, kab)), ("kecamatan", (args.provinsi, kab, kec))]:
+        t_old = timed(rerun_lama, *sel, repeat=args.repeat)
+        t_new = timed(rerun_baru, gazetteer, *sel, repeat=args.repeat)
+        same = list(rerun_baru(gazetteer, *sel)) == rerun_lama(*sel)
+        print(
+            f"rerun {label:<10}: lama {t_old * 1000:8.2f} ms | baru {t_new * 1000:8.4f} ms "
+            f"| {'sama' if same else 'BEDA'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
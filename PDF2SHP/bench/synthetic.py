@@ -0,0 +1,213 @@
+import math
+import random
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
+
+# =========================================================
+# DOKUMEN PKKPR SINTETIS
+# =========================================================
+_KALIMAT = [
+    "Berdasarkan Peraturan Pemerintah Nomor 21 Tahun 2021 tentang Penyelenggaraan Penataan Ruang,",
+    "dengan ini diberikan Persetujuan Kesesuaian Kegiatan Pemanfaatan Ruang kepada pemohon",
+    "untuk kegiatan sebagaimana tercantum dalam lampiran yang merupakan bagian tidak terpisahkan.",
+    "Pemegang PKKPR wajib melaksanakan kegiatan sesuai dengan ketentuan peraturan perundang-undangan",
+    "dan memperhatikan rencana tata ruang wilayah yang berlaku pada lokasi kegiatan tersebut.",
+    "Dokumen ini berlaku selama tiga tahun sejak tanggal diterbitkan dan dapat diperpanjang.",
+]
+
+
+def polygon_coords(n_points, lon=106.8, lat=-6.2, radius=0.01, seed=0):
+    rnd = random.Random(seed)
+    coords = []
+    for i in range(n_points):
+        a = 2 * math.pi * i / n_points
+        r = radius * (0.8 + 0.2 * rnd.random())
+        coords.append((lon + r * math.cos(a), lat + r * math.sin(a)))
+    return coords
+
+
+def format_coordinate(value, fmt, is_lon):
+    if fmt == "dms":
+        v = abs(value)
+        deg = int(v)
+        minutes = int((v - deg) * 60)
+        seconds = (v - deg - minutes / 60) * 3600
+        hemi = ("BT" if value >= 0 else "BB") if is_lon else ("LU" if value >= 0 else "LS")
+        return f"{deg}° {minutes}' {seconds:.2f}\" {hemi}"
+    if fmt == "comma":
+        return f"{value:.6f}".replace(".", ",")
+    return f"{value:.6f}"
+
+
+_FORMULIR = [
+    ["Nama Pemohon", "PT Contoh Energi Nusantara"],
+    ["Kegiatan", "Pembangunan Sumur Eksplorasi"],
+    ["Lokasi", "Kecamatan Contoh, Kabupaten Contoh"],
+    ["KBLI", "06100 - Pertambangan Minyak Bumi"],
+    ["Status", "Disetujui dengan catatan"],
+    ["Jangka Waktu", "Tiga tahun sejak diterbitkan"],
+]
+
+
+def _text_page(pdf, page_no, rnd):
+    # Halaman teks dengan tabel formulir bergaris (bukan tabel koordinat),
+    # seperti halaman isi PKKPR pada umumnya
+    fig = Figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.95, f"Halaman {page_no + 1}", fontsize=9)
+    y = 0.9
+    while y > 0.5:
+        fig.text(0.08, y, rnd.choice(_KALIMAT), fontsize=8)
+        y -= 0.025
+    ax = fig.add_axes([0.08, 0.05, 0.84, 0.4])
+    ax.axis("off")
+    ax.table(cellText=[row for row in _FORMULIR for _ in range(3)], colLabels=["Uraian", "Isian"], loc="upper center")
+    pdf.savefig(fig)
+
+
+def _map_page(pdf, page_no, rnd):
+    # Halaman peta lokasi: banyak garis vektor (grid + kontur) yang mahal untuk deteksi tabel
+    fig = Figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.95, f"Halaman {page_no + 1} - Peta Lokasi", fontsize=9)
+    ax = fig.add_axes([0.08, 0.1, 0.84, 0.8])
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for i in range(41):
+        ax.axhline(i / 40, color="0.8", linewidth=0.3)
+        ax.axvline(i / 40, color="0.8", linewidth=0.3)
+    for _ in range(60):
+        x0, y0 = rnd.random(), rnd.random()
+        xs = [x0 + 0.02 * k for k in range(20)]
+        ys = [y0 + 0.03 * math.sin(k / 3 + x0 * 10) for k in range(20)]
+        ax.plot(xs, ys, color="brown", linewidth=0.4)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    pdf.savefig(fig)
+
+
+def _table_page(pdf, title, header, rows):
+    fig = Figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.95, title, fontsize=10)
+    ax = fig.add_axes([0.08, 0.05, 0.84, 0.86])
+    ax.axis("off")
+    ax.table(cellText=rows, colLabels=header, loc="upper center")
+    pdf.savefig(fig)
+
+
+def _coordinate_rows(coords, fmt, start=1):
+    return [
+        [str(i), format_coordinate(x, fmt, True), format_coordinate(y, fmt, False)]
+        for i, (x, y) in enumerate(coords, start)
+    ]
+
+
+def _well_rows(n_wells, points, fmt, seed):
+    # Titik tapak sumur: nama sumur di kolom Keterangan hanya pada baris pertama tiap sumur
+    rows = []
+    for w in range(n_wells):
+        coords = polygon_coords(points, lon=106.9 + 0.004 * w, lat=-6.25, radius=0.0005, seed=seed + 100 + w)
+        for k, (x, y) in enumerate(coords):
+            keterangan = f"Sumur W-{w + 1}" if k == 0 else ""
+            rows.append([str(len(rows) + 1), format_coordinate(x, fmt, True), format_coordinate(y, fmt, False), keterangan])
+    return rows
+
+
+def write_pkkpr_pdf(path, n_pages=40, n_tables=1, points_per_table=20, fmt="decimal", map_every=5, seed=0,
+                    wells=0, points_per_well=5, continuation=False):
+    # n_pages halaman teks/peta + n_tables halaman "Tabel Koordinat Yang Disetujui"
+    # (fmt: decimal, comma atau dms). wells > 0: satu tabel tambahan dengan kolom Keterangan
+    # berisi titik per sumur. continuation=True: tiap tabel dipecah ke dua halaman berurutan,
+    # nomor titik di halaman kedua melanjutkan halaman pertama (judul tabel diulang).
+    rnd = random.Random(seed)
+    n_slots = n_tables + (1 if wells else 0)
+    table_pages = set(rnd.sample(range(n_pages + n_slots), n_slots)) if n_slots else set()
+    table_no = 0
+    with PdfPages(path) as pdf:
+        for page_no in range(n_pages + n_slots):
+            if page_no not in table_pages:
+                if map_every and page_no % map_every == map_every - 1:
+                    _map_page(pdf, page_no, rnd)
+                else:
+                    _text_page(pdf, page_no, rnd)
+                continue
+            if table_no == n_tables:
+                rows = _well_rows(wells, points_per_well, fmt, seed)
+                _table_page(pdf, "Tabel Koordinat Yang Disetujui", ["No", "Bujur", "Lintang", "Keterangan"], rows)
+                table_no += 1
+                continue
+            coords = polygon_coords(
+                points_per_table,
+                lon=106.8 + 0.05 * table_no,
+                lat=-6.2 - 0.05 * table_no,
+                seed=seed + table_no,
+            )
+            if continuation:
+                half = len(coords) // 2
+                _table_page(pdf, "Tabel Koordinat Yang Disetujui", ["No", "Bujur", "Lintang"], _coordinate_rows(coords[:half], fmt))
+                _table_page(pdf, "Tabel Koordinat Yang Disetujui (lanjutan)", ["No", "Bujur", "Lintang"], _coordinate_rows(coords[half:], fmt, half + 1))
+            else:
+                _table_page(pdf, "Tabel Koordinat Yang Disetujui", ["No", "Bujur", "Lintang"], _coordinate_rows(coords, fmt))
+            table_no += 1
+    return path
+
+
+# =========================================================
+# TAPAK SINTETIS
+# =========================================================
+def make_tapak_gdf(n_features, lon=106.8, lat=-6.2, extent=0.06, seed=0):
+    # Persil kotak berukuran acak dalam grid di sekitar lokasi PKKPR (EPSG:4326)
+    import geopandas as gpd
+    import numpy as np
+    import shapely
+
+    rng = np.random.default_rng(seed)
+    side = int(math.ceil(math.sqrt(n_features)))
+    cell = extent / side
+    ix = np.arange(n_features) % side
+    iy = np.arange(n_features) // side
+    x0 = lon - extent / 2 + ix * cell + rng.uniform(0, 0.2, n_features) * cell
+    y0 = lat - extent / 2 + iy * cell + rng.uniform(0, 0.2, n_features) * cell
+    w = cell * rng.uniform(0.5, 0.8, n_features)
+    h = cell * rng.uniform(0.5, 0.8, n_features)
+    return gpd.GeoDataFrame(
+        {"id": np.arange(1, n_features + 1)},
+        geometry=shapely.box(x0, y0, x0 + w, y0 + h),
+        crs="EPSG:4326",
+    )
+
+
+def tapak_zip_bytes(n_features, lon=107.5, lat=-6.9, extent=3.0, folder="data", seed=0):
+    # SHP ZIP tapak (dengan beberapa kolom atribut) seperti yang diunggah pengguna
+    import io
+    import os
+    import tempfile
+    import zipfile
+
+    import numpy as np
+
+    gdf = make_tapak_gdf(n_features, lon=lon, lat=lat, extent=extent, seed=seed)
+    rng = np.random.default_rng(seed)
+    gdf["pemilik"] = [f"Pemilik {i}" for i in range(n_features)]
+    gdf["status"] = rng.choice(["SHM", "HGB", "HGU"], n_features)
+    gdf["keterangan"] = "Persil hasil digitasi citra tahun 2023"
+    gdf["luas_m2"] = rng.uniform(100, 5000, n_features)
+    with tempfile.TemporaryDirectory() as tmp:
+        gdf.to_file(os.path.join(tmp, "tapak.shp"))
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for f in os.listdir(tmp):
+                zf.write(os.path.join(tmp, f), arcname=f"{folder}/{f}" if folder else f)
+    return buf.getvalue()
+
+
+def make_pkkpr_gdf(n_polygons=3, points=40, seed=0):
+    import geopandas as gpd
+    from shapely.geometry import Polygon
+
+    polys = [
+        Polygon(polygon_coords(points, lon=106.8 + 0.012 * (i - 1), lat=-6.2 + 0.008 * (i % 2), radius=0.01, seed=seed + i))
+        for i in range(n_polygons)
+    ]
+    return gpd.GeoDataFrame(geometry=polys, crs="EPSG:4326")
@@ -3,29 +3,30 @@ import geopandas as gpd
 import pandas as pd
 import io
 import os
-import zipfile
-import tempfile
-import re
-import math
-import pdfplumber
-import folium
-import contextily as ctx
-import xyzservices.providers as xyz
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-import matplotlib.lines as mlines
-
-from shapely.geometry import (
-    Point,
-    Polygon,
-    MultiPolygon,
-    GeometryCollection,
-    LineString,
-)
+import time
+import logging
+
+from shapely.geometry import Point, Polygon
 from shapely.validation import make_valid
-from shapely.ops import polygonize_full, unary_union
-from streamlit_folium import st_folium
-from folium.plugins import Fullscreen
+
+from pkkpr.cache import ByteCache, ExtractionCache, content_hash, extract_cached, geometry_fingerprint
+from pkkpr import instrument
+from pkkpr.export import EXPORT_FORMATS, available_formats, export_cached
+from pkkpr.geometry import (
+    get_utm_info,
+    fix_geometry,
+    hitung_luas_pkkpr,
+    build_total_points,
+)
+from pkkpr.jobs import JobPool
+from pkkpr.overlay import overlay_areas
+from pkkpr.peta import CLUSTER_MIN_POINTS, MAP_MAX_BYTES, add_vertex_layer, lod_geojson
+from pkkpr.render import PNG_DPI, PNG_SIZE, RenderPool
+from pkkpr.registry import PkkprRegistry, default_registry_path
+from pkkpr.reproject import ProjectedLayers
+from pkkpr.shp import read_shp_zip, zip_fields
+from pkkpr.tiles import TileStore, default_tile_dir
+from pkkpr.wilayah import Gazetteer
 
 # =========================================================
 # CONFIG
@@ -40,6 +41,95 @@ st.markdown("---")
 
 DEBUG = st.sidebar.checkbox("Debug Mode", False)
 
+# =========================================================
+# CACHE
+# =========================================================
+@st.cache_resource
+def get_extraction_cache():
+    # Satu cache per proses, dipakai bersama oleh semua sesi/pengguna
+    return ExtractionCache(
+        max_items=int(os.environ.get("PKKPR_CACHE_ITEMS", 32)),
+        disk_dir=os.environ.get("PKKPR_CACHE_DIR") or None,
+        disk_max_bytes=int(os.environ.get("PKKPR_CACHE_MAX_MB", 256)) * 1024 * 1024,
+    )
+
+extraction_cache = get_extraction_cache()
+
+@st.cache_resource
+def get_tile_store():
+    # Cache tile basemap untuk export PNG (MBTiles per sumber); PKKPR_TILES_OFFLINE=1 = tanpa unduh
+    return TileStore(
+        default_tile_dir(),
+        max_bytes=int(os.environ.get("PKKPR_TILE_MAX_MB", 512)) * 1024 * 1024,
+        offline=os.environ.get("PKKPR_TILES_OFFLINE", "") not in ("", "0"),
+    )
+
+tile_store = get_tile_store()
+
+@st.cache_resource
+def get_render_pool():
+    # Satu pool render PNG untuk semua sesi
+    return RenderPool(
+        workers=int(os.environ.get("PKKPR_PNG_WORKERS", 2)),
+        max_queue=int(os.environ.get("PKKPR_PNG_QUEUE", 8)),
+        cache=ByteCache(max_bytes=int(os.environ.get("PKKPR_PNG_CACHE_MB", 64)) * 1024 * 1024),
+    )
+
+render_pool = get_render_pool()
+
+@st.cache_resource
+def get_job_pool():
+    # Job berat (ekstraksi PDF) di thread latar belakang; batas berjalan + antre per proses untuk semua sesi
+    return JobPool(
+        workers=int(os.environ.get("PKKPR_JOB_WORKERS", 2)),
+        max_queue=int(os.environ.get("PKKPR_JOB_QUEUE", 8)),
+    )
+
+job_pool = get_job_pool()
+
+@st.cache_resource
+def get_export_cache():
+    return ByteCache(max_bytes=int(os.environ.get("PKKPR_EXPORT_CACHE_MB", 128)) * 1024 * 1024)
+
+export_cache = get_export_cache()
+
+@st.cache_resource
+def get_registry():
+    # Registry semua poligon PKKPR yang pernah diekstrak (SQLite + R-tree); hanya aktif bila PKKPR_REGISTRY=1
+    if os.environ.get("PKKPR_REGISTRY", "") in ("", "0"):
+        return None
+    return PkkprRegistry(default_registry_path())
+
+registry = get_registry()
+
+PROFIL_LOG = os.environ.get("PKKPR_PROFIL_LOG", "") not in ("", "0")
+
+@st.cache_resource
+def get_stage_recorder():
+    # Profil tahap untuk seluruh proses (semua sesi, termasuk export/PNG saat tombol download diklik).
+    # PKKPR_PROFIL_LOG=1: profil tiap rerun juga ditulis ke log "pkkpr.profil" (satu baris JSON per tahap)
+    if PROFIL_LOG:
+        logger = logging.getLogger("pkkpr.profil")
+        logger.setLevel(logging.INFO)
+        logger.addHandler(logging.StreamHandler())
+    recorder = instrument.StageRecorder()
+    instrument.set_process_recorder(recorder)
+    return recorder
+
+process_recorder = get_stage_recorder()
+
+# Profil rerun ini; memori (tracemalloc) hanya dilacak bila diminta karena memperlambat
+LACAK_MEMORI = DEBUG and st.sidebar.checkbox("Lacak memori (tracemalloc)", False)
+rerun_recorder = instrument.begin_rerun(st.session_state, memory=LACAK_MEMORI, log=PROFIL_LOG)
+
+# Jumlah proses untuk ekstraksi tabel per halaman (1 = sekuensial)
+PDF_WORKERS = int(os.environ.get("PKKPR_PDF_WORKERS", 1))
+TAPAK_MARGIN = float(os.environ.get("PKKPR_TAPAK_MARGIN_DEG", 0.01))  # ~1 km di sekitar extent PKKPR
+MAP_CLUSTER_MIN = int(os.environ.get("PKKPR_MAP_CLUSTER_MIN", CLUSTER_MIN_POINTS))
+MAP_BUDGET = int(os.environ.get("PKKPR_MAP_MAX_KB", MAP_MAX_BYTES // 1024)) * 1024
+MEMO_DOKUMEN = int(os.environ.get("PKKPR_MEMO_DOKUMEN", 3))  # dokumen PDF terakhir yang hasil turunannya disimpan per sesi
+JOB_TUNGGU = float(os.environ.get("PKKPR_JOB_TUNGGU", 0.5))  # detik; job yang selesai secepat ini tidak perlu tampilan progres
+
 # =========================================================
 # FORMAT
 # =========================================================
@@ -54,28 +144,14 @@ def format_angka_id(value):
         return str(value)
 
 # =========================================================
-# CRS
+# WILAYAH
 # =========================================================
-def get_utm_info(lon, lat):
-    zone = int((lon + 180) / 6) + 1
-    if lat >= 0:
-        epsg = 32600 + zone
-    else:
-        epsg = 32700 + zone
-    return epsg, f"{zone}{'N' if lat >= 0 else 'S'}"
-
-try:
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    CSV_PATH = os.path.join(BASE_DIR, "Kecamatan.csv")
-    
-    df_wilayah = pd.read_csv(
-        CSV_PATH,
-        sep=";",
-        encoding="utf-8"
-    )
-    df_wilayah.columns = df_wilayah.columns.astype(str).str.strip()
-except:
-    df_wilayah = pd.DataFrame(columns=["PROVINSI", "KABUPATEN/KOTA", "KECAMATAN", "X", "Y"])
+@st.cache_resource
+def get_gazetteer():
+    # Kecamatan.csv dibaca sekali per proses, dipakai bersama semua sesi (read-only)
+    return Gazetteer.load()
+
+gazetteer = get_gazetteer()
 
 # =========================================================
 # SIDEBAR ZONA UTM
@@ -85,359 +161,73 @@ st.sidebar.subheader("🗺️ Zona UTM")
 
 provinsi = st.sidebar.selectbox(
     "Provinsi",
-    [""] + sorted(df_wilayah["PROVINSI"].dropna().astype(str).unique().tolist())
+    gazetteer.provinsi_options
 )
 
-df_filter = df_wilayah.copy()
-
-if provinsi:
-    df_filter = df_filter[df_filter["PROVINSI"] == provinsi]
-
 kabupaten = st.sidebar.selectbox(
     "Kabupaten/Kota",
-    [""] + sorted(df_filter["KABUPATEN/KOTA"].dropna().astype(str).unique().tolist())
+    gazetteer.kabupaten_options(provinsi)
 )
 
-if kabupaten:
-    df_filter = df_filter[df_filter["KABUPATEN/KOTA"] == kabupaten]
-
 kecamatan = st.sidebar.selectbox(
     "Kecamatan",
-    [""] + sorted(df_filter["KECAMATAN"].dropna().astype(str).unique().tolist())
+    gazetteer.kecamatan_options(provinsi, kabupaten)
 )
 
 st.sidebar.markdown("---")
 
-if kecamatan:
-    df_zona = df_filter[df_filter["KECAMATAN"] == kecamatan].copy()
-elif kabupaten:
-    df_zona = df_filter[df_filter["KABUPATEN/KOTA"] == kabupaten].copy()
-elif provinsi:
-    df_zona = df_filter[df_filter["PROVINSI"] == provinsi].copy()
-else:
-    df_zona = pd.DataFrame()
-
-if not df_zona.empty:
-    zona_list = []
-    for _, row in df_zona.iterrows():
-        try:
-            lon = float(row["X"])
-            lat = float(row["Y"])
-            epsg, zona = get_utm_info(lon, lat)
-            zona_list.append((zona, epsg))
-        except:
-            pass
-    zona_unik = sorted(set(zona_list))
+zona_unik = gazetteer.zona_utm(provinsi, kabupaten, kecamatan)
+if zona_unik is not None:
     st.sidebar.markdown("### Zona UTM")
     for zona, epsg in zona_unik:
         st.sidebar.success(f"Zona UTM : {zona} | EPSG : {epsg}")
 
-# =========================================================
-# PARSE
-# =========================================================
-def try_parse_float(s):
-    try:
-        return float(str(s).strip().replace(",", "."))
-    except:
-        return None
-
-def dms_to_decimal(coord):
-    if coord is None:
-        return None
-    s = str(coord).upper().strip()
-    s = (
-        s.replace("BT", "E").replace("BB", "W")
-        .replace("LS", "S").replace("LU", "N")
-        .replace("º", "°").replace("'", "'")
-        .replace("′", "'").replace("″", '"')
-    )
-    direction = None
-    m = re.search(r"[NSEW]", s)
-    if m:
-        direction = m.group(0)
-    nums = re.findall(r"[-+]?\d+(?:\.\d+)?", s)
-    if not nums:
-        return None
-    try:
-        deg = float(nums[0])
-        minutes = float(nums[1]) if len(nums) > 1 else 0
-        seconds = float(nums[2]) if len(nums) > 2 else 0
-    except:
-        return None
-    val = abs(deg) + (minutes / 60) + (seconds / 3600)
-    if direction in ["S", "W"] or str(coord).strip().startswith("-"):
-        val *= -1
-    return val
-
-def parse_any_coordinate(val):
-    if val is None:
-        return None
-    s = str(val).strip()
-    f = try_parse_float(s)
-    if f is not None:
-        return f
-    return dms_to_decimal(s)
-
-def normalize_lon_lat(a, b):
-    if a is None or b is None:
-        return None
-    if 95 <= a <= 141 and -15 <= b <= 15:
-        return (a, b)
-    if 95 <= b <= 141 and -15 <= a <= 15:
-        return (b, a)
-    if abs(a) > 1000 and abs(b) > 1000:
-        return (a, b)
-    return None
-
-# =========================================================
-# GEOMETRY
-# =========================================================
-def fix_geometry(gdf):
-    if gdf is None or gdf.empty:
-        return gdf
-    gdf = gdf.copy()
-    gdf["geometry"] = gdf.geometry.apply(make_valid)
-
-    def clean_geom(geom):
-        if geom is None:
-            return None
-        if geom.geom_type == "GeometryCollection":
-            polys = [g for g in geom.geoms if g.geom_type in ["Polygon", "MultiPolygon"]]
-            if len(polys) == 0:
-                return None
-            if len(polys) == 1:
-                return polys[0]
-            return MultiPolygon(polys)
-        return geom
-
-    gdf["geometry"] = gdf.geometry.apply(clean_geom)
-    gdf = gdf[gdf.geometry.notnull()]
-    gdf["geometry"] = gdf.geometry.buffer(0)
-    return gdf
-
-def sort_coords_clockwise(coords):
-    cx = sum(x for x, y in coords) / len(coords)
-    cy = sum(y for x, y in coords) / len(coords)
-    return sorted(coords, key=lambda p: math.atan2(p[1] - cy, p[0] - cx))
-
-# =========================================================
-# PDF COORD PARSER
-# =========================================================
-def parse_coords_from_text_block(block):
-    coords = []
-    lines = block.splitlines()
-    for line in lines:
-        nums = re.findall(r'[-+]?\d+(?:\.\d+)?', line)
-        if len(nums) >= 2:
-            a = parse_any_coordinate(nums[-2])
-            b = parse_any_coordinate(nums[-1])
-            xy = normalize_lon_lat(a, b)
-            if xy:
-                coords.append(xy)
-    return coords
-
-def get_table_priority(text):
-    text = str(text).lower()
-    if "tabel koordinat yang disetujui" in text:
-        return 1
-    if "tabel koordinat yang dimohonkan" in text:
-        return 2
-    if "tabel koordinat yang dimohonkan dan disetujui" in text:
-        return 3
-    return 999
-
-def detect_coordinate_type(coords):
-    if not coords:
-        return "UNKNOWN"
-    xs = [x for x, y in coords]
-    ys = [y for x, y in coords]
-    try:
-        maxx = max(xs); minx = min(xs)
-        maxy = max(ys); miny = min(ys)
-        if (90 <= minx <= 150 and 90 <= maxx <= 150 and -15 <= miny <= 15 and -15 <= maxy <= 15):
-            return "WGS84"
-        if (100000 <= maxx <= 900000 and 1000000 <= maxy <= 10000000):
-            return "UTM"
-        if (maxx > 1000 and maxy > 1000):
-            return "TM3"
-    except:
-        pass
-    return "UNKNOWN"
-
-def extract_tables_and_coords_from_pdf(uploaded_file):
-    uploaded_file.seek(0)
-    candidate_tables = []
-
-    with pdfplumber.open(uploaded_file) as pdf:
-        for page_no, page in enumerate(pdf.pages):
-            page_text = page.extract_text() or ""
-            priority = get_table_priority(page_text)
-            try:
-                tables = page.extract_tables()
-            except:
-                tables = []
-            for table in tables:
-                if not table or len(table) < 2:
-                    continue
-                candidate_tables.append({"priority": priority, "page": page_no, "table": table})
-
-    candidate_tables.sort(key=lambda x: (x["priority"], x["page"]))
-    all_results = []
-    seen_coords = set()
-
-    for item in candidate_tables:
-        table = item["table"]
-        try:
-            df = pd.DataFrame(table[1:], columns=table[0])
-        except:
-            continue
-
-        df.columns = [re.sub(r"\s+", " ", str(c)).strip().lower() for c in df.columns]
-
-        no_col = x_col = y_col = ket_col = None
-        for c in df.columns:
-            if "no" in c:
-                no_col = c
-            if any(k in c for k in ["bujur", "longitude", "long", "x"]):
-                x_col = c
-            if any(k in c for k in ["lintang", "latitude", "lat", "y"]):
-                y_col = c
-            if "keterangan" in c:
-                ket_col = c
-
-        if not (x_col and y_col):
-            continue
-
-        coords_with_no = []
-        groups = {}
-        last_ket = None
-
-        for _, row in df.iterrows():
-            try:
-                x = parse_any_coordinate(row.get(x_col))
-                y = parse_any_coordinate(row.get(y_col))
-                if x is None or y is None:
-                    continue
-                xy = normalize_lon_lat(x, y)
-                if not xy:
-                    continue
-                ket = ""
-                if ket_col:
-                    val = row.get(ket_col)
-                    if pd.notna(val):
-                        ket = str(val).strip()
-                        if ket:
-                            last_ket = ket
-                if last_ket:
-                    groups.setdefault(last_ket, []).append(xy)
-                no = len(coords_with_no) + 1
-                if no_col:
-                    try:
-                        no = int(str(row.get(no_col)).strip())
-                    except:
-                        pass
-                coords_with_no.append((no, xy))
-            except:
-                continue
-
-        if groups:
-            for nama_sumur, coords in groups.items():
-                if len(coords) < 4:
-                    continue
-                coord_type = detect_coordinate_type(coords)
-                coord_signature = tuple((round(x, 8), round(y, 8)) for x, y in coords)
-                if coord_signature in seen_coords:
-                    continue
-                seen_coords.add(coord_signature)
-                all_results.append({"nama": nama_sumur, "coords": coords, "coord_type": coord_type, "page": item["page"]})
-
-        if len(coords_with_no) >= 3:
-            coords_with_no.sort(key=lambda x: x[0])
-            coords = [xy for _, xy in coords_with_no]
-            coord_type = detect_coordinate_type(coords)
-            if coord_type == "TM3":
-                continue
-            coord_signature = tuple((round(x, 8), round(y, 8)) for x, y in coords)
-            if coord_signature in seen_coords:
-                continue
-
-            # Cek apakah tabel ini adalah lanjutan dari tabel sebelumnya
-            # (tabel multi-halaman yang dipecah — nomor urut lanjut dari tabel sebelumnya)
-            merged = False
-            if all_results:
-                prev = all_results[-1]
-                prev_coords = prev["coords"]
-                # Cek apakah titik pertama tabel ini dekat dengan titik terakhir tabel sebelumnya
-                # atau nomor koordinat lanjut (tidak mulai dari 1)
-                first_no = coords_with_no[0][0] if coords_with_no else 1
-                if first_no > 1 and abs(item["page"] - prev.get("page", 0)) <= 2:
-                    # Gabung ke tabel sebelumnya
-                    merged_coords = prev_coords + coords
-                    # Hapus duplikat berurutan
-                    deduped = [merged_coords[0]]
-                    for c in merged_coords[1:]:
-                        if (round(c[0], 6), round(c[1], 6)) != (round(deduped[-1][0], 6), round(deduped[-1][1], 6)):
-                            deduped.append(c)
-                    prev["coords"] = deduped
-                    prev["coord_type"] = detect_coordinate_type(deduped)
-                    seen_coords.add(coord_signature)
-                    merged = True
-
-            if not merged:
-                seen_coords.add(coord_signature)
-                all_results.append({"coords": coords, "coord_type": coord_type, "page": item["page"], "nama": f"PKKPR {len(all_results)+1}"})
-
-    if len(all_results) > 0:
-        return all_results
-
-    uploaded_file.seek(0)
-    full_text = ""
-    with pdfplumber.open(uploaded_file) as pdf:
-        for page in pdf.pages:
-            full_text += (page.extract_text() or "") + "\n"
-
-    coords = parse_coords_from_text_block(full_text)
-    if len(coords) >= 3:
-        coord_type = detect_coordinate_type(coords)
-        return [{"coords": coords, "coord_type": coord_type, "page": 0, "nama": "PKKPR 1"}]
-
-    return []
-
-# =========================================================
-# SHP
-# =========================================================
-def read_shp_zip(uploaded):
-    with tempfile.TemporaryDirectory() as tmp:
-        zf = zipfile.ZipFile(io.BytesIO(uploaded.read()))
-        zf.extractall(tmp)
-        shp_path = None
-        for root, _, files in os.walk(tmp):
-            for f in files:
-                if f.lower().endswith(".shp"):
-                    shp_path = os.path.join(root, f)
-                    break
-        if shp_path:
-            return gpd.read_file(shp_path)
-    return None
-
 def show_attributes(gdf, title):
     cols = [c for c in gdf.columns if c.lower() != "geometry"]
     if cols:
         st.subheader(title)
         st.dataframe(gdf[cols], use_container_width=True)
 
-def save_shapefile_layers(gdf_poly, gdf_points):
-    with tempfile.TemporaryDirectory() as tmpdir:
-        if gdf_poly is not None:
-            gdf_poly.to_crs(4326).to_file(os.path.join(tmpdir, "PKKPR_Polygon.shp"))
-        if gdf_points is not None:
-            gdf_points.to_crs(4326).to_file(os.path.join(tmpdir, "PKKPR_Points.shp"))
-        buf = io.BytesIO()
-        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in os.listdir(tmpdir):
-                zf.write(os.path.join(tmpdir, f), arcname=f)
-        buf.seek(0)
-        return buf.read()
+# =========================================================
+# JOB EKSTRAKSI PDF
+# =========================================================
+def ekstraksi_pdf_job(job, data, name, key=None):
+    # Dijalankan di thread JobPool. Progres halaman ke job.progress, PKKPR yang sudah lengkap ke
+    # job.info["pkkpr"]; job.check() di tiap event sehingga pembatalan berlaku di antara halaman
+    pdf_file = io.BytesIO(data)
+    pdf_file.name = name
+    job.info.update(pkkpr=[], ekstraksi={})
+
+    def progres(event, data):
+        job.check()
+        if event == "pkkpr":
+            job.info["pkkpr"].append(f"{data['nama']} (hal. {data['page'] + 1}, {len(data['coords'])} titik)")
+        else:
+            job.progress = data
+
+    return extract_cached(pdf_file, extraction_cache, workers=PDF_WORKERS, progress=progres, stats=job.info["ekstraksi"], key=key)
+
+@st.fragment(run_every=0.5)
+def pantau_job(job_id):
+    # Hanya bagian ini yang dijalankan ulang selama job berjalan; setelah selesai seluruh skrip
+    # dijalankan ulang untuk memakai hasilnya
+    job = job_pool.get(job_id)
+    if job is None or job.done:
+        st.rerun()
+    if job.cancelled:
+        st.info("Membatalkan ekstraksi ...")
+        return
+    if job.status == "antre":
+        st.info(f"Menunggu antrean pemrosesan (posisi {job_pool.position(job)})")
+    else:
+        selesai, total = job.progress or (0, 1)
+        st.progress(selesai / total, text=f"Membaca halaman {selesai}/{total}")
+        ditemukan = list(job.info.get("pkkpr", []))
+        if ditemukan:
+            st.caption("PKKPR ditemukan : " + ", ".join(ditemukan))
+    if st.button("✖️ Batalkan", key=f"batal_{job_id}"):
+        job.cancel()
+        st.rerun(scope="fragment")
 
 # =========================================================
 # STATE
@@ -446,6 +236,9 @@ gdf_polygon = None
 gdf_points = None
 gdf_tapak = None
 coord_type = "WGS84"
+sel = None  # memo pilihan PKKPR aktif (dokumen PDF)
+# Proyeksi per layer di-cache selama satu rerun ("pkkpr", "titik", "tapak")
+layers = ProjectedLayers()
 
 # =========================================================
 # SINGLE PAGE LAYOUT
@@ -465,6 +258,20 @@ with col_upload:
 with col_tapak_upload:
     st.write("**Tapak Proyek**")
     uploaded_tapak = st.file_uploader("Upload SHP ZIP Tapak", type=["zip"])
+    filter_tapak = st.checkbox(
+        "Baca hanya tapak di sekitar PKKPR",
+        value=False,
+        help="Fitur tapak di luar extent PKKPR (+ margin) tidak dibaca sama sekali. "
+             "Luas Tapak hanya menghitung fitur yang dibaca.",
+    )
+    tapak_columns = None
+    if uploaded_tapak:
+        try:
+            tapak_fields = zip_fields(uploaded_tapak)
+        except Exception:
+            tapak_fields = []
+        if tapak_fields:
+            tapak_columns = st.multiselect("Kolom atribut tapak", tapak_fields, default=tapak_fields)
     tapak_info = st.empty()
     tapak_info_detail = st.container()  # ← baris luas UTM & Mercator Tapak
 
@@ -476,62 +283,115 @@ st.markdown("---")
 # ------------------
 if uploaded:
     if uploaded.name.lower().endswith(".pdf"):
-        results = extract_tables_and_coords_from_pdf(uploaded)
-
-        total_luas_ha = 0
-        for r in results:
-            coords = r["coords"].copy()
-            if coords[0] != coords[-1]:
-                coords.append(coords[0])
-            try:
-                poly = Polygon(coords)
-                gdf_tmp = gpd.GeoDataFrame(geometry=[poly], crs="EPSG:4326")
-                centroid = poly.centroid
-                utm_epsg, _ = get_utm_info(centroid.x, centroid.y)
-                luas_ha = (gdf_tmp.to_crs(utm_epsg).area.iloc[0] / 10000)
-                r["luas_ha"] = luas_ha
-                total_luas_ha += luas_ha
-            except:
-                r["luas_ha"] = 0
-
-        # Hitung luas total dengan dua proyeksi
-        try:
-            _all_polys = [make_valid(Polygon(r["coords"] if r["coords"][0] == r["coords"][-1] else r["coords"] + [r["coords"][0]])) for r in results if len(r.get("coords", [])) >= 3]
-            _gdf_all = gpd.GeoDataFrame(geometry=_all_polys, crs="EPSG:4326")
-            _c_all = _gdf_all.geometry.unary_union.centroid
-            _epsg_all, _zone_all = get_utm_info(_c_all.x, _c_all.y)
-            _luas_utm_all = _gdf_all.to_crs(_epsg_all).area.sum()
-            _luas_merc_all = _gdf_all.to_crs(3857).area.sum()
+        # Hasil turunan disimpan di sesi per dokumen (hasil ekstraksi, luas, titik) dan per pilihan
+        # PKKPR (poligon, titik, proyeksi, GeoJSON peta): ganti "Pilih PKKPR" atau kembali ke TOTAL
+        # hanya menukar objek yang sudah dihitung
+        # Hash isi dihitung sekali per unggahan (file_id), bukan di setiap rerun
+        hash_unggahan = st.session_state.get("hash_unggahan")
+        if hash_unggahan is None or hash_unggahan[0] != uploaded.file_id:
+            hash_unggahan = (uploaded.file_id, content_hash(uploaded.getvalue()))
+            st.session_state["hash_unggahan"] = hash_unggahan
+        dokumen = hash_unggahan[1]
+        memo_pkkpr = st.session_state.setdefault("memo_pkkpr", {})
+        memo = memo_pkkpr.get(dokumen)
+        ekstraksi = {}
+        if memo is None:
+            # Ekstraksi berjalan sebagai job latar belakang (ID disimpan di sesi). Selama berjalan hanya
+            # progres dan tombol batal yang tampil; sisa halaman menunggu hasilnya
+            job_sesi = st.session_state.get("job_pdf")
+            job = job_pool.get(job_sesi[1]) if job_sesi is not None else None
+            if job is not None and job_sesi[0] != dokumen:
+                job.cancel()  # dokumen lain diunggah, job lama tidak dibutuhkan lagi
+                job = None
+            if job is None:
+                try:
+                    job = job_pool.submit(ekstraksi_pdf_job, uploaded.getvalue(), uploaded.name, key=dokumen, label=uploaded.name)
+                except RuntimeError as e:
+                    job = None
+                    st.warning(str(e))
+                    if st.button("🔄 Coba lagi"):
+                        st.rerun()
+                if job is not None:
+                    st.session_state["job_pdf"] = (dokumen, job.id)
+                    job.wait(JOB_TUNGGU)
+
+            selesai = job is not None and job.done
+            if selesai and job.status != "selesai":
+                if job.status == "batal":
+                    st.info("Ekstraksi PDF dibatalkan")
+                else:
+                    st.error(f"Gagal membaca PDF : {job.error}")
+                if st.button("🔄 Proses ulang"):
+                    del st.session_state["job_pdf"]
+                    st.rerun()
+            elif job is not None and not selesai:
+                pantau_job(job.id)
+            if not selesai or job.status != "selesai":
+                st.stop()
+
+            del st.session_state["job_pdf"]
+            results = job.result
+            ekstraksi = job.info["ekstraksi"]
+
+            # Luas per PKKPR dan luas total dengan dua proyeksi (sekali hitung untuk semua poligon)
+            luas = hitung_luas_pkkpr(results)
+            memo = {"results": results, "luas": luas, "titik": build_total_points(results), "pilihan": {}}
+            memo_pkkpr[dokumen] = memo
+            while len(memo_pkkpr) > MEMO_DOKUMEN:
+                memo_pkkpr.pop(next(iter(memo_pkkpr)))
+
+        results, luas = memo["results"], memo["luas"]
+
+        if DEBUG:
+            st.sidebar.markdown("### Cache Ekstraksi")
+            st.sidebar.json(extraction_cache.stats())
+            if ekstraksi:
+                st.sidebar.markdown("### Ekstraksi PDF")
+                st.sidebar.json({("peak_proses_mb" if k == "peak_mb" else k): v for k, v in ekstraksi.items()})
+
+        if luas["zona"]:
+            _luas_utm_all, _luas_merc_all = luas["luas_utm"], luas["luas_mercator"]
             pkkpr_luas_box.success(f"Jumlah PKKPR unik : {len(results)}")
-            info_box_detail.caption(f"UTM {_zone_all} : {format_angka_id(_luas_utm_all)} m² / **{format_angka_id(_luas_utm_all/10000)} Ha**")
+            info_box_detail.caption(f"UTM {luas['zona']} : {format_angka_id(_luas_utm_all)} m² / **{format_angka_id(_luas_utm_all/10000)} Ha**")
             info_box_detail.caption(f"Mercator : {format_angka_id(_luas_merc_all)} m² / **{format_angka_id(_luas_merc_all/10000)} Ha**")
-        except:
+        else:
             pkkpr_luas_box.success(
                 f"Jumlah PKKPR unik : {len(results)} | "
-                f"Total luas PKKPR : {format_angka_id(total_luas_ha)} Ha"
+                f"Total luas PKKPR : {format_angka_id(luas['total_ha'])} Ha"
             )
 
-        total_polygons = []
-        for r in results:
-            c = r["coords"].copy()
-            if c[0] != c[-1]:
-                c.append(c[0])
-            try:
-                poly = make_valid(Polygon(c))
-                if not poly.is_empty and poly.geom_type in ["Polygon", "MultiPolygon"]:
-                    total_polygons.append(poly)
-            except:
-                pass
+        total_polygons = luas["polygons"]
+        gdf_points_total = memo["titik"]
 
-        unique_points = set()
-        for r in results:
-            for x, y in r["coords"]:
-                unique_points.add((round(x, 8), round(y, 8)))
+        # Cek duplikat / tumpang tindih dengan PKKPR terdaftar, lalu daftarkan (sekali per dokumen per sesi).
+        # Hanya hasil WGS84: koordinat UTM/TM3 tanpa zona tidak bisa diproyeksikan ke EPSG:4326
+        reg_index = [i for i in luas["index"] if results[i]["coord_type"] == "WGS84"]
+        reg_polygons = [g for g, i in zip(total_polygons, luas["index"]) if results[i]["coord_type"] == "WGS84"]
+        if registry is not None and reg_polygons:
+            cek_registry = st.session_state.setdefault("cek_registry", {})
+            if dokumen not in cek_registry:
+                try:
+                    pernah = registry.seen(dokumen)
+                    temuan = registry.check(reg_polygons, exclude_dokumen=dokumen)
+                    registry.register(reg_polygons, dokumen, uploaded.name, [
+                        {"nama": results[i]["nama"], "halaman": results[i]["page"] + 1, "luas_ha": results[i]["luas_ha"]}
+                        for i in reg_index
+                    ])
+                    cek_registry[dokumen] = (pernah, temuan)
+                except Exception as e:
+                    cek_registry[dokumen] = (None, None)
+                    st.caption(f"Registry PKKPR tidak tersedia : {e}")
+            pernah, temuan = cek_registry[dokumen]
+            if pernah:
+                st.info(f"Dokumen ini sudah pernah diproses ({time.strftime('%d-%m-%Y %H:%M', time.localtime(pernah))})")
+            if temuan is not None and not temuan.empty:
+                st.warning(
+                    f"{(temuan['jenis'] == 'duplikat').sum()} duplikat dan "
+                    f"{(temuan['jenis'] == 'tumpang tindih').sum()} tumpang tindih dengan PKKPR terdaftar"
+                )
+                temuan = temuan.assign(pkkpr=[results[reg_index[i]]["nama"] for i in temuan["pkkpr"]])
+                st.dataframe(temuan.drop(columns="id"), use_container_width=True)
 
-        gdf_points_total = gpd.GeoDataFrame(
-            geometry=[Point(x, y) for x, y in unique_points],
-            crs="EPSG:4326"
-        )
 
         if len(results) > 0:
             opsi = ["PKKPR TOTAL"] + list(range(len(results)))
@@ -541,31 +401,42 @@ if uploaded:
                 format_func=lambda x: "PKKPR TOTAL" if x == "PKKPR TOTAL" else f"{results[x]['nama']} | {results[x]['luas_ha']:.2f} Ha"
             )
 
-            if pilihan == "PKKPR TOTAL":
-                gdf_polygon = gpd.GeoDataFrame(geometry=total_polygons, crs="EPSG:4326")
-                coord_type = "WGS84"
-                gdf_points = gdf_points_total
-            else:
-                coords = results[pilihan]["coords"]
-                coord_type = results[pilihan]["coord_type"]
-        else:
-            st.error("Koordinat PDF tidak ditemukan")
-
-        if pilihan != "PKKPR TOTAL":
-            source_crs = "EPSG:4326"
-            gdf_points = gpd.GeoDataFrame(
-                {"No": list(range(1, len(coords) + 1))},
-                geometry=[Point(x, y) for x, y in coords],
-                crs=source_crs
-            )
-            coords_proc = coords.copy()
-            if coords_proc[0] != coords_proc[-1]:
-                coords_proc.append(coords_proc[0])
-
-            try:
-                from shapely.validation import make_valid
-                poly_candidate = make_valid(Polygon(coords_proc))
-
+            sel = memo["pilihan"].get(pilihan)
+            if sel is None:
+                # proyeksi: cache ProjectedLayers per layer, peta: GeoJSON LOD per budget, wilayah: terdekat
+                sel = {"proyeksi": {"pkkpr": {}, "titik": {}}, "peta": {}, "poligon": None, "pkkpr": None}
+                if pilihan == "PKKPR TOTAL":
+                    sel["pkkpr"] = gpd.GeoDataFrame(geometry=total_polygons, crs="EPSG:4326")
+                    sel["coord_type"] = "WGS84"
+                    sel["titik"] = gdf_points_total
+                else:
+                    coords = results[pilihan]["coords"]
+                    sel["coord_type"] = results[pilihan]["coord_type"]
+                    source_crs = "EPSG:4326"
+                    sel["titik"] = gpd.GeoDataFrame(
+                        {"No": list(range(1, len(coords) + 1))},
+                        geometry=[Point(x, y) for x, y in coords],
+                        crs=source_crs
+                    )
+                    coords_proc = coords.copy()
+                    if coords_proc[0] != coords_proc[-1]:
+                        coords_proc.append(coords_proc[0])
+                    try:
+                        sel["poligon"] = make_valid(Polygon(coords_proc))
+                        sel["pkkpr"] = gpd.GeoDataFrame(geometry=[sel["poligon"]], crs=source_crs)
+                    except Exception as e:
+                        sel["error"] = e
+                memo["pilihan"][pilihan] = sel
+
+            coord_type = sel["coord_type"]
+            gdf_points = sel["titik"]
+            if sel["pkkpr"] is not None:
+                gdf_polygon = layers.set("pkkpr", sel["pkkpr"], cache=sel["proyeksi"]["pkkpr"])
+
+            poly_candidate = sel["poligon"]
+            if pilihan != "PKKPR TOTAL" and poly_candidate is None:
+                st.error(f"Gagal membuat polygon : {sel['error']}")
+            elif pilihan != "PKKPR TOTAL":
                 if DEBUG:
                     st.write("Geom Type :", poly_candidate.geom_type)
                     st.write("Valid :", poly_candidate.is_valid)
@@ -574,9 +445,8 @@ if uploaded:
                 try:
                     _c_sel = poly_candidate.centroid
                     _epsg_sel, _zone_sel = get_utm_info(_c_sel.x, _c_sel.y)
-                    _gdf_sel = gpd.GeoDataFrame(geometry=[poly_candidate], crs="EPSG:4326")
-                    _luas_utm_sel = _gdf_sel.to_crs(_epsg_sel).area.sum()
-                    _luas_merc_sel = _gdf_sel.to_crs(3857).area.sum()
+                    _luas_utm_sel = layers.get("pkkpr", _epsg_sel).area.sum()
+                    _luas_merc_sel = layers.get("pkkpr", 3857).area.sum()
                     info_box.success(f"Jenis koordinat : {coord_type} | Valid : {'Ya' if poly_candidate.is_valid else 'Tidak'}")
                     info_box_detail.caption(f"UTM {_zone_sel} : {format_angka_id(_luas_utm_sel)} m² / **{format_angka_id(_luas_utm_sel/10000)} Ha**")
                     info_box_detail.caption(f"Mercator : {format_angka_id(_luas_merc_sel)} m² / **{format_angka_id(_luas_merc_sel/10000)} Ha**")
@@ -592,23 +462,19 @@ if uploaded:
                         st.warning(f"Polygon invalid : {explain_validity(poly_candidate)}")
                     except:
                         pass
-
-                gdf_polygon = gpd.GeoDataFrame(geometry=[poly_candidate], crs=source_crs)
-
-            except Exception as e:
-                st.error(f"Gagal membuat polygon : {e}")
-                gdf_polygon = None
+        else:
+            st.error("Koordinat PDF tidak ditemukan")
 
     elif uploaded.name.lower().endswith(".zip"):
-        gdf_polygon = read_shp_zip(uploaded)
+        gdf_polygon = layers.set("pkkpr", read_shp_zip(uploaded))
         if gdf_polygon is not None:
             if DEBUG:
                 st.write("CRS :", gdf_polygon.crs)
             try:
-                _c = gdf_polygon.to_crs(4326).geometry.centroid.iloc[0]
+                _c = layers.get("pkkpr", 4326).geometry.centroid.iloc[0]
                 _epsg, _zone = get_utm_info(_c.x, _c.y)
-                _luas_utm = gdf_polygon.to_crs(_epsg).area.sum()
-                _luas_merc = gdf_polygon.to_crs(3857).area.sum()
+                _luas_utm = layers.get("pkkpr", _epsg).area.sum()
+                _luas_merc = layers.get("pkkpr", 3857).area.sum()
                 info_box.success("SHP PKKPR berhasil dibaca")
                 info_box_detail.caption(f"UTM {_zone} : {format_angka_id(_luas_utm)} m² / **{format_angka_id(_luas_utm/10000)} Ha**")
                 info_box_detail.caption(f"Mercator : {format_angka_id(_luas_merc)} m² / **{format_angka_id(_luas_merc/10000)} Ha**")
@@ -616,23 +482,57 @@ if uploaded:
                 info_box.success("SHP PKKPR berhasil dibaca")
             show_attributes(gdf_polygon, "Atribut SHP PKKPR")
 
+    # Wilayah administrasi terdekat dari centroid PKKPR (indeks spasial Kecamatan.csv)
+    if gdf_polygon is not None and coord_type == "WGS84":
+        try:
+            _near = sel.get("wilayah") if sel is not None else None
+            if _near is None:
+                _near = gazetteer.nearest_for_geometries([layers.get("pkkpr", 4326).geometry.union_all()]).iloc[0]
+                if sel is not None:
+                    sel["wilayah"] = _near
+            if pd.notna(_near["KECAMATAN"]):
+                info_box_detail.caption(
+                    f"Wilayah terdekat : Kec. {_near['KECAMATAN']}, {_near['KABUPATEN/KOTA']}, "
+                    f"{_near['PROVINSI']} | Zona UTM {_near['UTM_ZONA']}"
+                )
+        except:
+            pass
+
+layers.set("titik", gdf_points, cache=sel["proyeksi"]["titik"] if sel is not None else None)
+
 # ------------------
 # TAPAK
 # ------------------
 if uploaded_tapak and gdf_polygon is not None:
-    gdf_tapak = read_shp_zip(uploaded_tapak)
+    tapak_bbox = None
+    if filter_tapak:
+        minx, miny, maxx, maxy = layers.get("pkkpr", 4326).total_bounds
+        tapak_bbox = (minx - TAPAK_MARGIN, miny - TAPAK_MARGIN, maxx + TAPAK_MARGIN, maxy + TAPAK_MARGIN)
+    gdf_tapak = read_shp_zip(uploaded_tapak, bbox=tapak_bbox, columns=tapak_columns)
+    if gdf_tapak is not None and gdf_tapak.empty:
+        tapak_info.warning("Tidak ada fitur tapak yang terbaca" + (" di sekitar PKKPR" if filter_tapak else ""))
+        gdf_tapak = None
     if gdf_tapak is not None:
-        gdf_tapak = fix_geometry(gdf_tapak)
+        perbaikan_tapak = {}
+        gdf_tapak = layers.set("tapak", fix_geometry(gdf_tapak, stats=perbaikan_tapak))
+        if DEBUG:
+            st.sidebar.markdown("### Perbaikan Geometri Tapak")
+            st.sidebar.json(perbaikan_tapak)
         try:
-            _c = gdf_tapak.to_crs(4326).geometry.centroid.iloc[0]
+            _c = layers.get("tapak", 4326).geometry.centroid.iloc[0]
             _epsg, _zone = get_utm_info(_c.x, _c.y)
-            _luas_utm_t = gdf_tapak.to_crs(_epsg).area.sum()
-            _luas_merc_t = gdf_tapak.to_crs(3857).area.sum()
+            _luas_utm_t = layers.get("tapak", _epsg).area.sum()
+            _luas_merc_t = layers.get("tapak", 3857).area.sum()
             tapak_info.success("SHP Tapak berhasil dibaca")
             tapak_info_detail.caption(f"UTM {_zone} : {format_angka_id(_luas_utm_t)} m² / **{format_angka_id(_luas_utm_t/10000)} Ha**")
             tapak_info_detail.caption(f"Mercator : {format_angka_id(_luas_merc_t)} m² / **{format_angka_id(_luas_merc_t/10000)} Ha**")
         except:
             tapak_info.success("SHP Tapak berhasil dibaca")
+        if perbaikan_tapak["diperbaiki"] or perbaikan_tapak["dibuang"]:
+            tapak_info_detail.caption(
+                f"Geometri diperbaiki : {perbaikan_tapak['diperbaiki']} dari {perbaikan_tapak['fitur']} fitur"
+                f" | dibuang (kosong) : {perbaikan_tapak['dibuang']}"
+            )
         show_attributes(gdf_tapak, "Atribut SHP Tapak")
 
 # =========================================================
@@ -640,17 +540,17 @@ if uploaded_tapak and gdf_polygon is not None:
 # =========================================================
 if gdf_polygon is not None and coord_type == "WGS84" and gdf_tapak is not None:
     st.subheader("Analisis Overlay")
-    centroid = gdf_polygon.to_crs(4326).geometry.centroid.iloc[0]
+    centroid = layers.get("pkkpr", 4326).geometry.centroid.iloc[0]
     utm_epsg, utm_zone = get_utm_info(centroid.x, centroid.y)
 
-    gdf_poly_utm = gdf_polygon.to_crs(utm_epsg)
-    gdf_tapak_utm = gdf_tapak.to_crs(utm_epsg)
+    gdf_poly_utm = layers.get("pkkpr", utm_epsg)
+    gdf_tapak_utm = layers.get("tapak", utm_epsg)
 
-    inter = gpd.overlay(gdf_tapak_utm, gdf_poly_utm, how="intersection")
+    _, overlay_total = overlay_areas(gdf_tapak_utm, gdf_poly_utm)
 
-    luas_overlap = inter.area.sum()
-    luas_tapak  = gdf_tapak_utm.area.sum()
-    luas_luar = max(0, luas_tapak - luas_overlap)
+    luas_overlap = overlay_total["luas_overlap"]
+    luas_tapak  = overlay_total["luas_tapak"]
+    luas_luar = overlay_total["luas_luar"]
 
     col_a, col_b, col_c = st.columns(3)
     col_a.metric(f"Luas Tapak (UTM {utm_zone})", f"{format_angka_id(luas_tapak/10000)} Ha", f"{format_angka_id(luas_tapak)} m²")
@@ -667,69 +567,98 @@ if gdf_polygon is not None and coord_type == "WGS84":
 
     if gdf_tapak is not None:
         combined_preview = pd.concat(
-            [gdf_polygon.to_crs(4326), gdf_tapak.to_crs(4326)],
+            [layers.get("pkkpr", 4326), layers.get("tapak", 4326)],
             ignore_index=True
         )
+        bounds = combined_preview.total_bounds  # [minx, miny, maxx, maxy]
+        centroid = combined_preview.geometry.union_all().centroid
     else:
-        combined_preview = gdf_polygon.to_crs(4326)
-
-    bounds = combined_preview.total_bounds  # [minx, miny, maxx, maxy]
-    centroid = combined_preview.geometry.unary_union.centroid
+        # Tanpa tapak extent hanya bergantung PKKPR, jadi ikut disimpan di memo pilihan
+        extent = sel.get("extent") if sel is not None else None
+        if extent is None:
+            combined_preview = layers.get("pkkpr", 4326)
+            extent = (combined_preview.total_bounds, combined_preview.geometry.union_all().centroid)
+            if sel is not None:
+                sel["extent"] = extent
+        bounds, centroid = extent
 
     # Key unik berdasarkan bounds — paksa st_folium re-render saat data berubah
     map_key = f"map_{bounds[0]:.6f}_{bounds[1]:.6f}_{bounds[2]:.6f}_{bounds[3]:.6f}"
 
-    m = folium.Map(
-        location=[centroid.y, centroid.x],
-        zoom_start=14,
-        tiles=None,
-        zoom_control=True,
-    )
-    Fullscreen().add_to(m)
-    folium.TileLayer(xyz.Esri.WorldImagery, name="Esri Satellite").add_to(m)
-
-    folium.GeoJson(
-        gdf_polygon.to_crs(4326),
-        name="PKKPR",
-        style_function=lambda x: {
-            "color": "yellow",
-            "weight": 3,
-            "fillOpacity": 0.1
-        }
-    ).add_to(m)
+    # Bangun peta + kirim ke browser (tercatat sebagai tahap "peta" di profil).
+    # folium/streamlit_folium baru dimuat di sini, tidak saat aplikasi dibuka
+    with instrument.stage("peta"):
+        import folium
+        import xyzservices.providers as xyz
+        from folium.plugins import Fullscreen
+        from streamlit_folium import st_folium
+
+        m = folium.Map(
+            location=[centroid.y, centroid.x],
+            zoom_start=14,
+            tiles=None,
+            zoom_control=True,
+            prefer_canvas=True,
+        )
+        Fullscreen().add_to(m)
+        folium.TileLayer(xyz.Esri.WorldImagery, name="Esri Satellite").add_to(m)
+
+        # Geometri peta disederhanakan + dibulatkan agar muat dalam MAP_BUDGET;
+        # luas, overlay dan export tetap memakai layer presisi penuh
+        budget = MAP_BUDGET // 2 if gdf_tapak is not None else MAP_BUDGET
+        peta_memo = sel["peta"] if sel is not None else {}
+        if budget not in peta_memo:
+            peta_memo[budget] = lod_geojson(layers.get("pkkpr", 4326), budget)
+        pkkpr_peta, payload_peta = peta_memo[budget]
+        payload_peta = {"pkkpr": payload_peta}
 
-    if gdf_tapak is not None:
         folium.GeoJson(
-            gdf_tapak.to_crs(4326),
-            name="Tapak",
+            pkkpr_peta,
+            name="PKKPR",
             style_function=lambda x: {
-                "color": "red",
-                "fillColor": "red",
-                "weight": 2,
-                "fillOpacity": 0.35
+                "color": "yellow",
+                "weight": 3,
+                "fillOpacity": 0.1
             }
         ).add_to(m)
 
-    if gdf_points is not None and not gdf_points.empty:
-        for i, row in gdf_points.iterrows():
-            folium.CircleMarker(
-                location=[row.geometry.y, row.geometry.x],
-                radius=4,
-                color="black",
-                fill=True,
-                fill_color="orange",
-                fill_opacity=1,
-                popup=f"Titik {i+1}"
+        if gdf_tapak is not None:
+            # Sisa anggaran setelah PKKPR, minimal seperempat MAP_BUDGET (GeoJSON PKKPR bisa melebihi
+            # anggarannya). Tapak dibaca ulang tiap rerun, jadi GeoJSON-nya dimemo per file/bbox/budget
+            tapak_budget = max(MAP_BUDGET - payload_peta["pkkpr"]["bytes"], MAP_BUDGET // 4)
+            kunci_tapak = (uploaded_tapak.file_id, tapak_bbox, tapak_budget)
+            memo_peta_tapak = st.session_state.setdefault("memo_peta_tapak", {})
+            if kunci_tapak not in memo_peta_tapak:
+                memo_peta_tapak[kunci_tapak] = lod_geojson(layers.get("tapak", 4326), tapak_budget)
+                while len(memo_peta_tapak) > MEMO_DOKUMEN:
+                    memo_peta_tapak.pop(next(iter(memo_peta_tapak)))
+            tapak_peta, payload_peta["tapak"] = memo_peta_tapak[kunci_tapak]
+            folium.GeoJson(
+                tapak_peta,
+                name="Tapak",
+                style_function=lambda x: {
+                    "color": "red",
+                    "fillColor": "red",
+                    "weight": 2,
+                    "fillOpacity": 0.35
+                }
             ).add_to(m)
 
-    # Zoom to layer — fit_bounds ke extent semua layer
-    m.fit_bounds([
-        [bounds[1], bounds[0]],
-        [bounds[3], bounds[2]]
-    ])
+        if gdf_points is not None and not gdf_points.empty:
+            add_vertex_layer(m, layers.get("titik", 4326), cluster_min=MAP_CLUSTER_MIN)
+
+        if DEBUG:
+            st.sidebar.markdown("### Payload Peta")
+            st.sidebar.json(payload_peta)
+
+        # Zoom to layer — fit_bounds ke extent semua layer
+        m.fit_bounds([
+            [bounds[1], bounds[0]],
+            [bounds[3], bounds[2]]
+        ])
 
-    folium.LayerControl().add_to(m)
-    st_folium(m, width="100%", height=650, key=map_key, returned_objects=[])
+        folium.LayerControl().add_to(m)
+        st_folium(m, width="100%", height=650, key=map_key, returned_objects=[])
 
     st.markdown("---")
 
@@ -740,112 +669,66 @@ if gdf_polygon is not None and coord_type == "WGS84":
     col_export1, col_export2 = st.columns(2)
 
     with col_export1:
-        st.write("**SHP PKKPR**")
-        geom = gdf_polygon.to_crs(4326).geometry.iloc[0]
+        st.write("**Data PKKPR**")
+        geom = layers.get("pkkpr", 4326).geometry.iloc[0]
         if geom is not None and not geom.is_empty:
-            zip_bytes = save_shapefile_layers(gdf_polygon, gdf_points)
-            st.download_button(
-                "⬇️ Download SHP PKKPR",
-                zip_bytes,
-                "PKKPR_Hasil.zip",
-                mime="application/zip"
-            )
+            format_label = st.selectbox("Format", available_formats(), key="format_export")
+            kode, ext, mime = EXPORT_FORMATS[format_label]
+            export_poly = layers.get("pkkpr", 4326)
+            export_titik = layers.get("titik", 4326)
+
+            # Sidik jari dan file dibuat hanya saat tombol diklik, lalu di-cache sampai geometri/atribut berubah
+            def unduh_export(*gdfs, **kwargs):
+                return lambda: export_cached(
+                    export_cache, geometry_fingerprint(gdfs, attributes=True, jenis=kode, **kwargs), kode, *gdfs, **kwargs
+                )
+
+            if kode == "shp":
+                st.download_button(
+                    "⬇️ Download SHP PKKPR",
+                    data=unduh_export(export_poly, export_titik),
+                    file_name="PKKPR_Hasil.zip",
+                    mime=mime,
+                    on_click="ignore",
+                )
+            else:
+                st.download_button(
+                    f"⬇️ Download PKKPR ({format_label})",
+                    data=unduh_export(export_poly, layer="PKKPR_Polygon"),
+                    file_name=f"PKKPR_Polygon{ext}",
+                    mime=mime,
+                    on_click="ignore",
+                )
+                if export_titik is not None and not export_titik.empty:
+                    st.download_button(
+                        f"⬇️ Download Titik PKKPR ({format_label})",
+                        data=unduh_export(export_titik, layer="PKKPR_Points"),
+                        file_name=f"PKKPR_Points{ext}",
+                        mime=mime,
+                        on_click="ignore",
+                    )
 
     with col_export2:
         st.write("**Peta PNG**")
         try:
-            gdf_poly_3857 = gdf_polygon.to_crs(3857).copy()
-            gdf_poly_3857["geometry"] = gdf_poly_3857.geometry.buffer(0)
-
-            if gdf_tapak is not None:
-                gdf_tapak_3857 = gdf_tapak.to_crs(3857).copy()
-                gdf_tapak_3857["geometry"] = gdf_tapak_3857.geometry.buffer(0)
-                extent_gdf = pd.concat([gdf_poly_3857, gdf_tapak_3857], ignore_index=True)
-            else:
-                gdf_tapak_3857 = None
-                extent_gdf = gdf_poly_3857
-
-            xmin, ymin, xmax, ymax = extent_gdf.total_bounds
-            width = xmax - xmin
-            height = ymax - ymin
-            padx = max(width * 0.20, 100)
-            pady = max(height * 0.20, 100)
-
-            x0 = xmin - padx
-            x1 = xmax + padx
-            y0 = ymin - pady
-            y1 = ymax + pady
-
-            fig, ax = plt.subplots(figsize=(10, 10), dpi=150)
-
-            # 1. Set extent sebelum basemap
-            ax.set_xlim(x0, x1)
-            ax.set_ylim(y0, y1)
-
-            # 2. Basemap dengan reset_extent=False agar extent tidak berubah
-            basemap_ok = False
-            for source in [ctx.providers.Esri.WorldImagery, ctx.providers.OpenStreetMap.Mapnik]:
-                try:
-                    ctx.add_basemap(ax, source=source, crs="EPSG:3857", reset_extent=False)
-                    basemap_ok = True
-                    break
-                except Exception:
-                    continue
-            if not basemap_ok:
-                ax.set_facecolor("#c9e8f5")
-
-            # 3. Plot vektor di atas basemap
-            if gdf_tapak_3857 is not None:
-                gdf_tapak_3857.plot(ax=ax, facecolor="red", edgecolor="red", alpha=0.35, linewidth=1.5, zorder=5)
-
-            gdf_poly_3857.plot(ax=ax, facecolor="none", edgecolor="yellow", linewidth=2, zorder=4)
-
-            if gdf_points is not None and not gdf_points.empty:
-                gdf_points_3857 = gdf_points.to_crs(3857)
-                gdf_points_3857.plot(ax=ax, color="orange", edgecolor="black", markersize=30, zorder=6)
-
-            # 4. Paksa extent kembali ke nilai awal (plot() bisa menggeser)
-            ax.set_xlim(x0, x1)
-            ax.set_ylim(y0, y1)
-            ax.set_aspect("equal")
-            ax.axis("off")
-            ax.set_title("Peta Kesesuaian Tapak Proyek dengan PKKPR", fontsize=12, pad=10)
-
-            legend_elements = [
-                mlines.Line2D([], [], color="orange", marker="o", markeredgecolor="black", linestyle="None", markersize=8, label="Titik PKKPR"),
-                mpatches.Patch(facecolor="none", edgecolor="yellow", linewidth=2, label="PKKPR"),
-                mpatches.Patch(facecolor="red", edgecolor="red", alpha=0.4, label="Tapak")
-            ]
-
-            poly_centroid = gdf_poly_3857.unary_union.centroid
-            corners = {
-                "upper left":  (xmin, ymax),
-                "upper right": (xmax, ymax),
-                "lower left":  (xmin, ymin),
-                "lower right": (xmax, ymin)
-            }
-            max_dist = -1
-            best_corner = "upper right"
-            for loc, (x, y) in corners.items():
-                dist = ((poly_centroid.x - x) ** 2 + (poly_centroid.y - y) ** 2)
-                if dist > max_dist:
-                    max_dist = dist
-                    best_corner = loc
-
-            ax.legend(handles=legend_elements, loc=best_corner, frameon=True,
-                      facecolor="white", framealpha=0.9, edgecolor="black", fontsize=9)
-
-            buf = io.BytesIO()
-            plt.savefig(buf, format="png", bbox_inches="tight", dpi=150)
-            buf.seek(0)
-            png_bytes = buf.getvalue()
-            plt.close(fig)
+            # Reproyeksi, sidik jari dan render hanya saat tombol diklik, lewat pool bersama
+            # (batas render bersamaan + antrean); hasil di-cache per sidik jari
+            def unduh_png(layers=layers, tapak=gdf_tapak is not None,
+                          titik=gdf_points is not None and not gdf_points.empty):
+                png_layers = (
+                    layers.get("pkkpr", 3857),
+                    layers.get("tapak", 3857) if tapak else None,
+                    layers.get("titik", 3857) if titik else None,
+                )
+                png_key = geometry_fingerprint(png_layers, jenis="png", dpi=PNG_DPI, size=PNG_SIZE)
+                return render_pool.render(png_key, *png_layers, tile_store=tile_store)
 
             st.download_button(
                 "⬇️ Download Peta PNG",
-                data=png_bytes,
+                data=unduh_png,
                 file_name="Peta_Overlay.png",
-                mime="image/png"
+                mime="image/png",
+                on_click="ignore",
             )
 
         except Exception as e:
@@ -855,6 +738,50 @@ else:
     if not uploaded:
         st.info("💡 Silakan upload dokumen PKKPR untuk memulai.")
 
+if DEBUG:
+    st.sidebar.markdown("### Cache Tile")
+    st.sidebar.json(tile_store.stats())
+    st.sidebar.markdown("### Cache Export")
+    st.sidebar.json(export_cache.stats())
+    st.sidebar.markdown("### Render PNG")
+    st.sidebar.json({**render_pool.stats(), "cache": render_pool.cache.stats()})
+    st.sidebar.markdown("### Job Latar Belakang")
+    st.sidebar.json(job_pool.stats())
+    st.sidebar.markdown("### Reproyeksi")
+    st.sidebar.json(layers.stats())
+    if st.session_state.get("memo_pkkpr"):
+        st.sidebar.markdown("### Memo Sesi")
+        st.sidebar.json({
+            "dokumen": len(st.session_state["memo_pkkpr"]),
+            "pilihan": sum(len(m["pilihan"]) for m in st.session_state["memo_pkkpr"].values()),
+        })
+    if registry is not None:
+        st.sidebar.markdown("### Registry PKKPR")
+        st.sidebar.json(registry.stats())
+
+    # Profil tahap: rerun ini dan kumulatif seluruh proses (export/PNG tercatat saat tombol diklik)
+    # Puncak tracemalloc berlaku untuk seluruh proses: ikut menghitung alokasi sesi lain yang berjalan bersamaan
+    st.sidebar.markdown("### Profil Tahap")
+    if LACAK_MEMORI:
+        st.sidebar.caption(
+            f"peak_proses_mb: puncak memori seluruh proses selama tahap (semua sesi; "
+            f"tracemalloc dipakai {instrument.memory_tracing.owners()} pemilik)"
+        )
+    kolom_peak = {"peak_mb": "peak_proses_mb"}
+    st.sidebar.caption("Rerun ini")
+    st.sidebar.dataframe(pd.DataFrame(rerun_recorder.records()).rename(columns=kolom_peak), hide_index=True)
+    st.sidebar.caption("Semua sesi")
+    st.sidebar.dataframe(pd.DataFrame(process_recorder.records()).rename(columns=kolom_peak), hide_index=True)
+    st.sidebar.download_button(
+        "⬇️ Profil (JSON)",
+        data=rerun_recorder.to_json(lingkup="rerun", semua_sesi=process_recorder.records()),
+        file_name="profil_tahap.json",
+        mime="application/json",
+        on_click="ignore",
+    )
+
+instrument.end_rerun(st.session_state)
+
 # =========================================================
 # END
 # =========================================================
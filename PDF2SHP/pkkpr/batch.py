@@ -0,0 +1,217 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import geopandas as gpd
+
+from pkkpr.parse import extract_tables_and_coords_from_pdf
+from pkkpr.cache import content_hash
+from pkkpr.geometry import hitung_luas_pkkpr, build_total_points
+from pkkpr.registry import PkkprRegistry
+from pkkpr.shp import save_shapefile_layers
+from pkkpr.wilayah import default_gazetteer
+
+SUMMARY_FILE = "Ringkasan_PKKPR.csv"
+SUMMARY_FIELDS = [
+    "file",
+    "jumlah_pkkpr",
+    "coord_type",
+    "zona_utm",
+    "luas_utm_ha",
+    "luas_mercator_ha",
+    "luas_geodesik_ha",
+    "provinsi",
+    "kabupaten",
+    "kecamatan",
+    "duplikat",
+    "tumpang_tindih",
+    "output",
+    "status",
+    "detik",
+]
+
+# =========================================================
+# DOKUMEN
+# =========================================================
+def find_pdfs(folder, recursive=False):
+    paths = []
+    if recursive:
+        for root, _, files in os.walk(folder):
+            paths += [os.path.join(root, f) for f in files if f.lower().endswith(".pdf")]
+    else:
+        paths = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".pdf")]
+    return sorted(paths)
+
+def document_name(pdf_path, folder):
+    # Path relatif terhadap folder input ("sub/a.pdf"), dipakai di ringkasan dan registry
+    return os.path.relpath(pdf_path, folder).replace(os.sep, "/")
+
+def output_stem(name):
+    # Nama file hasil dari path relatif: "sub/a.pdf" -> "sub__a" (a.pdf dan sub/a.pdf tidak bertabrakan)
+    return os.path.splitext(name)[0].replace("/", "__")
+
+def check_output_collisions(names):
+    # Dua dokumen dengan nama hasil sama akan saling menimpa (juga saat diproses paralel)
+    stems = {}
+    for name in names:
+        stems.setdefault(output_stem(name).lower(), []).append(name)
+    collisions = [v for v in stems.values() if len(v) > 1]
+    if collisions:
+        raise ValueError(
+            "Nama file hasil bertabrakan : " + "; ".join(" & ".join(v) for v in collisions)
+        )
+
+def build_pkkpr_layer(results, luas):
+    # Sama dengan "PKKPR TOTAL" di aplikasi, ditambah atribut per PKKPR
+    # (luas = hasil hitung_luas_pkkpr, poligonnya tidak dibangun ulang)
+    records = []
+    for i, poly in zip(luas["index"], luas["polygons"]):
+        r = results[i]
+        records.append({
+            "nama": r["nama"],
+            "coord_type": r["coord_type"],
+            "halaman": r["page"] + 1,
+            "luas_ha": r.get("luas_ha", 0),
+            "geometry": poly,
+        })
+    gdf = gpd.GeoDataFrame(records, geometry="geometry", crs="EPSG:4326")
+    return annotate_wilayah(gdf)
+
+def annotate_wilayah(gdf):
+    # Kecamatan/kabupaten/provinsi terdekat per polygon (hanya koordinat WGS84)
+    for col in ["provinsi", "kabupaten", "kecamatan", "zona_utm"]:
+        gdf[col] = None
+    wgs84 = (gdf["coord_type"] == "WGS84").to_numpy() if not gdf.empty else []
+    if len(gdf) and wgs84.any():
+        near = default_gazetteer().nearest_for_geometries(gdf.geometry.values[wgs84])
+        gdf.loc[wgs84, "provinsi"] = near["PROVINSI"].to_numpy()
+        gdf.loc[wgs84, "kabupaten"] = near["KABUPATEN/KOTA"].to_numpy()
+        gdf.loc[wgs84, "kecamatan"] = near["KECAMATAN"].to_numpy()
+        gdf.loc[wgs84, "zona_utm"] = near["UTM_ZONA"].to_numpy()
+    return gdf
+
+def _join_unique(values):
+    return ";".join(dict.fromkeys(str(v) for v in values if isinstance(v, str)))
+
+def write_output(gdf_poly, gdf_points, out_dir, stem, fmt):
+    if fmt == "gpkg":
+        path = os.path.join(out_dir, f"{stem}.gpkg")
+        if os.path.exists(path):
+            os.remove(path)
+        gdf_poly.to_crs(4326).to_file(path, layer="PKKPR_Polygon", driver="GPKG")
+        gdf_points.to_crs(4326).to_file(path, layer="PKKPR_Points", driver="GPKG")
+    else:
+        path = os.path.join(out_dir, f"{stem}.zip")
+        with open(path, "wb") as f:
+            f.write(save_shapefile_layers(gdf_poly, gdf_points))
+    return path
+
+def check_registry(registry_path, pdf_path, gdf_poly, row):
+    # Duplikat / tumpang tindih dengan registry (dokumen yang sama diabaikan), lalu daftarkan.
+    # Hanya poligon WGS84: koordinat UTM/TM3 tanpa zona tidak bisa diproyeksikan ke EPSG:4326
+    gdf_poly = gdf_poly[gdf_poly["coord_type"] == "WGS84"]
+    with open(pdf_path, "rb") as f:
+        dokumen = content_hash(f.read())
+    registry = PkkprRegistry(registry_path)
+    try:
+        geoms = gdf_poly.geometry.to_numpy()
+        temuan = registry.check(geoms, exclude_dokumen=dokumen)
+        registry.register(geoms, dokumen, row["file"], gdf_poly[["nama", "halaman", "luas_ha"]].to_dict("records"))
+    finally:
+        registry.close()
+    row["duplikat"] = int((temuan["jenis"] == "duplikat").sum())
+    row["tumpang_tindih"] = int((temuan["jenis"] == "tumpang tindih").sum())
+
+def process_pdf(pdf_path, out_dir, fmt="shp", page_workers=1, geodesic=False, registry_path=None, name=None):
+    # name = path relatif terhadap folder input (default: nama file saja)
+    t0 = time.perf_counter()
+    name = name or os.path.basename(pdf_path)
+    stem = output_stem(name)
+    row = {k: "" for k in SUMMARY_FIELDS}
+    row["file"] = name
+    row["jumlah_pkkpr"] = 0
+    try:
+        with open(pdf_path, "rb") as f:
+            results = extract_tables_and_coords_from_pdf(f, workers=page_workers)
+        row["jumlah_pkkpr"] = len(results)
+        if not results:
+            row["status"] = "Koordinat PDF tidak ditemukan"
+        else:
+            luas = hitung_luas_pkkpr(results, geodesic=geodesic)
+            row["coord_type"] = ";".join(sorted({r["coord_type"] for r in results}))
+            if luas["zona"]:
+                row["zona_utm"] = luas["zona"]
+                row["luas_utm_ha"] = round(luas["luas_utm"] / 10000, 4)
+                row["luas_mercator_ha"] = round(luas["luas_mercator"] / 10000, 4)
+            else:
+                row["luas_utm_ha"] = round(luas["total_ha"], 4)
+            if luas["luas_geodesik"] is not None:
+                row["luas_geodesik_ha"] = round(luas["luas_geodesik"] / 10000, 4)
+
+            gdf_poly = build_pkkpr_layer(results, luas)
+            row["provinsi"] = _join_unique(gdf_poly["provinsi"])
+            row["kabupaten"] = _join_unique(gdf_poly["kabupaten"])
+            row["kecamatan"] = _join_unique(gdf_poly["kecamatan"])
+            if registry_path:
+                check_registry(registry_path, pdf_path, gdf_poly, row)
+            gdf_points = build_total_points(results)
+            row["output"] = os.path.basename(write_output(gdf_poly, gdf_points, out_dir, stem, fmt))
+            row["status"] = "OK"
+    except Exception as e:
+        row["status"] = f"Gagal : {e}"
+    row["detik"] = round(time.perf_counter() - t0, 3)
+    return row
+
+# =========================================================
+# BATCH
+# =========================================================
+def run_batch(
+    folder, out_dir=None, workers=None, fmt="shp", recursive=False, page_workers=1, geodesic=False,
+    registry_path=None, log=print,
+):
+    pdfs = find_pdfs(folder, recursive=recursive)
+    names = [document_name(path, folder) for path in pdfs]
+    check_output_collisions(names)
+    out_dir = out_dir or os.path.join(folder, "hasil_pkkpr")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    rows = []
+    t0 = time.perf_counter()
+    if workers == 1 or len(pdfs) <= 1:
+        for i, (path, name) in enumerate(zip(pdfs, names), 1):
+            rows.append(process_pdf(path, out_dir, fmt, page_workers, geodesic, registry_path, name))
+            log(f"[{i}/{len(pdfs)}] {rows[-1]['file']} : {rows[-1]['status']} ({rows[-1]['detik']} s)")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(process_pdf, path, out_dir, fmt, page_workers, geodesic, registry_path, name)
+                for path, name in zip(pdfs, names)
+            ]
+            for i, fut in enumerate(as_completed(futures), 1):
+                rows.append(fut.result())
+                log(f"[{i}/{len(pdfs)}] {rows[-1]['file']} : {rows[-1]['status']} ({rows[-1]['detik']} s)")
+    elapsed = time.perf_counter() - t0
+
+    rows.sort(key=lambda r: r["file"])
+    summary_path = os.path.join(out_dir, SUMMARY_FILE)
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    report = {
+        "dokumen": len(pdfs),
+        "berhasil": sum(1 for r in rows if r["status"] == "OK"),
+        "workers": workers,
+        "detik": round(elapsed, 3),
+        "dokumen_per_detik": round(len(pdfs) / elapsed, 3) if elapsed > 0 else 0.0,
+        "ringkasan": summary_path,
+    }
+    log(
+        f"{report['berhasil']}/{report['dokumen']} dokumen berhasil dalam {report['detik']} s "
+        f"({report['dokumen_per_detik']} dokumen/detik, {workers} worker)"
+    )
+    log(f"Ringkasan : {summary_path}")
+    return report
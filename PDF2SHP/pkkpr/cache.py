@@ -0,0 +1,212 @@
+import copy
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import shapely
+
+from pkkpr import parse
+from pkkpr.instrument import timed
+from pkkpr.parse import iter_pdf_results
+
+
+def _parser_hash():
+    # Sidik isi pkkpr/parse.py: setiap perubahan parser otomatis memakai cache disk baru
+    with open(parse.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+# Naikkan jika format hasil ekstraksi berubah di luar parse.py agar cache disk lama tidak terpakai
+CACHE_VERSION = f"2-{_parser_hash()}"
+
+# =========================================================
+# CACHE HASIL EKSTRAKSI PDF
+# =========================================================
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    # Dua tingkat: LRU di memori (per proses, dibagi semua sesi) dan
+    # opsional folder di disk dengan batas ukuran total (hapus yang paling lama dipakai).
+
+    def __init__(self, max_items=32, disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hit_memori": 0, "hit_disk": 0, "miss": 0, "evict_memori": 0, "evict_disk": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"v{CACHE_VERSION}_{key}.pkl")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self._stats["hit_memori"] += 1
+                return copy.deepcopy(self._mem[key])
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                os.utime(path)
+            except Exception:
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._stats["hit_disk"] += 1
+                    self._put_memory(key, value)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self._stats["miss"] += 1
+        return None
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                return
+            self._evict_disk()
+
+    def _put_memory(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+            self._stats["evict_memori"] += 1
+
+    def _evict_disk(self):
+        entries = []
+        for f in os.listdir(self.disk_dir):
+            if not f.endswith(".pkl"):
+                continue
+            path = os.path.join(self.disk_dir, f)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._stats["evict_disk"] += 1
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["item_memori"] = len(self._mem)
+        lookups = s["hit_memori"] + s["hit_disk"] + s["miss"]
+        s["hit_rate"] = round((s["hit_memori"] + s["hit_disk"]) / lookups, 3) if lookups else 0.0
+        return s
+
+
+# =========================================================
+# CACHE HASIL TURUNAN (PNG, EXPORT)
+# =========================================================
+def geometry_fingerprint(gdfs, attributes=False, **settings):
+    # Sidik jari isi geometri (WKB) + CRS tiap layer dan pengaturan render/export; None = layer kosong.
+    # attributes=True ikut memperhitungkan kolom atribut (untuk export).
+    h = hashlib.sha256()
+    for gdf in gdfs:
+        if gdf is None:
+            h.update(b"<none>")
+            continue
+        h.update(str(gdf.crs).encode("utf-8"))
+        for wkb in shapely.to_wkb(gdf.geometry.to_numpy()):
+            h.update(wkb or b"<null>")
+        if attributes:
+            attrs = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+            h.update(repr(list(attrs.columns)).encode("utf-8"))
+            if len(attrs.columns):
+                h.update(pd.util.hash_pandas_object(attrs.astype(str), index=False).to_numpy().tobytes())
+        h.update(b"<layer>")
+    h.update(repr(sorted(settings.items())).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ByteCache:
+    # LRU bytes di memori dengan batas ukuran total; hasil dipakai bersama semua sesi
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._mem = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "miss": 0, "evict": 0}
+
+    def get(self, key):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self._stats["hit"] += 1
+                return self._mem[key]
+            self._stats["miss"] += 1
+            return None
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._mem:
+                self._bytes -= len(self._mem.pop(key))
+            self._mem[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, old = self._mem.popitem(last=False)
+                self._bytes -= len(old)
+                self._stats["evict"] += 1
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["item"] = len(self._mem)
+            s["mb"] = round(self._bytes / 1024 / 1024, 2)
+        lookups = s["hit"] + s["miss"]
+        s["hit_rate"] = round(s["hit"] / lookups, 3) if lookups else 0.0
+        return s
+
+
+@timed("ekstraksi_pdf")
+def extract_cached(uploaded_file, cache, workers=1, progress=None, stats=None, key=None):
+    # progress(event, data) dipanggil untuk tiap event iter_pdf_results (hanya bila cache miss).
+    # key = content_hash isi file bila pemanggil sudah menghitungnya
+    if key is None:
+        uploaded_file.seek(0)
+        key = content_hash(uploaded_file.read())
+    results = cache.get(key)
+    if results is None:
+        for event, data in iter_pdf_results(uploaded_file, workers=workers, stats=stats):
+            if event == "selesai":
+                results = data
+            elif progress:
+                progress(event, data)
+        cache.put(key, results)
+    return results
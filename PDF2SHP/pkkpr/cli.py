@@ -0,0 +1,85 @@
+import argparse
+import sys
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pkkpr", description="PKKPR → SHP tanpa antarmuka Streamlit")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_batch = sub.add_parser("batch", help="Konversi semua PDF PKKPR dalam satu folder")
+    p_batch.add_argument("folder", help="Folder berisi PDF PKKPR")
+    p_batch.add_argument("-o", "--output", default=None, help="Folder hasil (default: <folder>/hasil_pkkpr)")
+    p_batch.add_argument("-j", "--workers", type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    p_batch.add_argument("-f", "--format", choices=["shp", "gpkg"], default="shp", help="Format hasil per dokumen")
+    p_batch.add_argument("-r", "--recursive", action="store_true", help="Cari PDF di subfolder juga")
+    p_batch.add_argument("--page-workers", type=int, default=1, help="Proses per dokumen untuk ekstraksi tabel per halaman")
+    p_batch.add_argument("--geodesik", action="store_true", help="Tambahkan luas geodesik (elipsoid WGS84) di ringkasan")
+    p_batch.add_argument(
+        "--registry", nargs="?", const="", default=None, metavar="PATH",
+        help="Cek duplikat/tumpang tindih dan daftarkan poligon ke registry PKKPR "
+             "(default: PKKPR_REGISTRY_PATH atau ~/.cache/pkkpr/registry.sqlite)",
+    )
+
+    p_tiles = sub.add_parser("tiles", help="Cache tile basemap untuk export PNG (server tanpa internet)")
+    p_tiles.add_argument("aksi", choices=["seed", "stats"])
+    p_tiles.add_argument("--dir", default=None, help="Folder cache tile (default: PKKPR_TILE_DIR atau ~/.cache/pkkpr/tiles)")
+    p_tiles.add_argument("--max-mb", type=int, default=512, help="Batas ukuran cache tile")
+    p_tiles.add_argument("--sumber", nargs="+", default=["esri", "osm"], help="esri, osm atau template URL .../{z}/{x}/{y}.png")
+    p_tiles.add_argument("--bbox", type=float, nargs=4, metavar=("W", "S", "E", "N"), help="Area seeding (lon/lat)")
+    p_tiles.add_argument("--provinsi", default=None, help="Area seeding dari Kecamatan.csv")
+    p_tiles.add_argument("--kabupaten", default="")
+    p_tiles.add_argument("--zoom", type=int, nargs=2, default=[10, 14], metavar=("MIN", "MAX"))
+    p_tiles.add_argument("--max-tiles", type=int, default=20000, help="Batalkan bila jumlah tile melebihi ini")
+    return parser
+
+
+def run_tiles(args):
+    from pkkpr.tiles import BASEMAPS, TileStore, basemap_source, default_tile_dir, wilayah_bbox
+
+    store = TileStore(args.dir or default_tile_dir(), max_bytes=args.max_mb * 1024 * 1024)
+    if args.aksi == "seed":
+        if args.bbox:
+            bbox = args.bbox
+        elif args.provinsi:
+            from pkkpr.wilayah import default_gazetteer
+            bbox = wilayah_bbox(default_gazetteer(), args.provinsi, args.kabupaten)
+        else:
+            print("Seeding butuh --bbox atau --provinsi")
+            return 2
+        zooms = range(args.zoom[0], args.zoom[1] + 1)
+        for name in args.sumber:
+            source = basemap_source(name) if name in BASEMAPS else name
+            print(f"Seeding {name} zoom {args.zoom[0]}-{args.zoom[1]} bbox {tuple(round(v, 4) for v in bbox)}")
+            store.seed(source, *bbox, zooms, max_tiles=args.max_tiles, log=print)
+    print(store.stats())
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        from pkkpr.batch import run_batch
+        from pkkpr.registry import default_registry_path
+        try:
+            report = run_batch(
+                args.folder,
+                out_dir=args.output,
+                workers=args.workers,
+                fmt=args.format,
+                recursive=args.recursive,
+                page_workers=args.page_workers,
+                geodesic=args.geodesik,
+                registry_path=None if args.registry is None else (args.registry or default_registry_path()),
+            )
+        except ValueError as e:
+            print(e)
+            return 2
+        return 0 if report["berhasil"] == report["dokumen"] else 1
+    if args.command == "tiles":
+        return run_tiles(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
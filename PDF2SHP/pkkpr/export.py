@@ -0,0 +1,54 @@
+import importlib.util
+import io
+
+import pyogrio
+
+from pkkpr.instrument import timed
+from pkkpr.shp import save_shapefile_layers
+
+# =========================================================
+# FORMAT EXPORT
+# =========================================================
+# label -> (kode, ekstensi, mime). SHP tetap satu ZIP berisi layer polygon + titik;
+# format lain satu file per layer dan ditulis langsung ke memori.
+EXPORT_FORMATS = {
+    "SHP (ZIP)": ("shp", ".zip", "application/zip"),
+    "GeoPackage": ("gpkg", ".gpkg", "application/geopackage+sqlite3"),
+    "FlatGeobuf": ("fgb", ".fgb", "application/octet-stream"),
+    "GeoParquet": ("parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+_DRIVERS = {"gpkg": "GPKG", "fgb": "FlatGeobuf"}
+
+
+def available_formats():
+    # GeoParquet hanya bila pyarrow terpasang
+    has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+    return [label for label, (kode, _, _) in EXPORT_FORMATS.items() if kode != "parquet" or has_pyarrow]
+
+
+def layer_bytes(gdf, kode, layer):
+    # Satu layer EPSG:4326 sebagai bytes file tunggal, tanpa folder sementara
+    gdf = gdf.to_crs(4326)
+    buf = io.BytesIO()
+    if kode == "parquet":
+        gdf.to_parquet(buf, index=False, compression="zstd")
+    else:
+        pyogrio.write_dataframe(gdf, buf, driver=_DRIVERS[kode], layer=layer)
+    return buf.getvalue()
+
+
+@timed("export")
+def export_bytes(kode, gdf_poly, gdf_points=None, layer="PKKPR_Polygon"):
+    if kode == "shp":
+        return save_shapefile_layers(gdf_poly, gdf_points)
+    return layer_bytes(gdf_poly, kode, layer)
+
+
+def export_cached(cache, key, kode, gdf_poly, gdf_points=None, layer="PKKPR_Polygon"):
+    # key = geometry_fingerprint(..., attributes=True, jenis=kode, layer=layer)
+    data = cache.get(key)
+    if data is None:
+        data = export_bytes(kode, gdf_poly, gdf_points, layer)
+        cache.put(key, data)
+    return data
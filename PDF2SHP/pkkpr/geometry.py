@@ -0,0 +1,184 @@
+import math
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import Geod
+from shapely.geometry import Point, Polygon
+from shapely.validation import make_valid
+
+from pkkpr.instrument import stage, timed
+from pkkpr.reproject import get_transformer
+
+# =========================================================
+# CRS
+# =========================================================
+def get_utm_info(lon, lat):
+    zone = int((lon + 180) / 6) + 1
+    if lat >= 0:
+        epsg = 32600 + zone
+    else:
+        epsg = 32700 + zone
+    return epsg, f"{zone}{'N' if lat >= 0 else 'S'}"
+
+# =========================================================
+# GEOMETRY
+# =========================================================
+_POLYGONAL = [3, 6]  # shapely type id Polygon, MultiPolygon
+_COLLECTION = 7  # GeometryCollection
+
+def _polygonal_parts(collections):
+    # GeometryCollection -> hanya bagian Polygon/MultiPolygon (None bila tidak ada,
+    # bagian itu sendiri bila satu, MultiPolygon bila lebih dari satu)
+    out = np.full(len(collections), None, dtype=object)
+    parts, idx = shapely.get_parts(collections, return_index=True)
+    keep = np.isin(shapely.get_type_id(parts), _POLYGONAL)
+    parts, idx = parts[keep], idx[keep]
+    counts = np.bincount(idx, minlength=len(collections))
+    single = counts[idx] == 1
+    out[idx[single]] = parts[single]
+    multi = counts > 1
+    if multi.any():
+        polys, pidx = shapely.get_parts(parts[~single], return_index=True)
+        owner = idx[~single][pidx]
+        rows = np.flatnonzero(multi)
+        out[rows] = shapely.multipolygons(polys, indices=np.searchsorted(rows, owner))
+    return out
+
+@timed("perbaikan_geometri")
+def fix_geometry(gdf, stats=None):
+    # Perbaiki hanya geometri invalid (make_valid vektor), ambil bagian poligon dari
+    # GeometryCollection, buang yang None. Geometri poligon yang sudah valid tidak diubah.
+    # Bila stats (dict) diberikan, diisi jumlah fitur, yang diperbaiki/dibuang dan waktu.
+    if gdf is None or gdf.empty:
+        return gdf
+    t0 = time.perf_counter()
+    gdf = gdf.copy()
+    geoms = gdf.geometry.to_numpy().copy()
+
+    missing = shapely.is_missing(geoms)
+    invalid = ~missing & ~shapely.is_valid(geoms)
+    if invalid.any():
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+    gc = shapely.get_type_id(geoms) == _COLLECTION
+    if gc.any():
+        geoms[gc] = _polygonal_parts(geoms[gc])
+
+    # buffer(0) seperti sebelumnya, tetapi hanya untuk hasil perbaikan dan geometri non-poligon
+    todo = ~shapely.is_missing(geoms) & (invalid | ~np.isin(shapely.get_type_id(geoms), _POLYGONAL))
+    if todo.any():
+        geoms[todo] = shapely.buffer(geoms[todo], 0)
+
+    gdf["geometry"] = geoms
+    keep = ~shapely.is_missing(geoms)
+    gdf = gdf[keep]
+    if stats is not None:
+        stats.update({
+            "fitur": int(len(keep)),
+            "diperbaiki": int(invalid.sum()),
+            "dibuang": int((~keep).sum()),
+            "detik": round(time.perf_counter() - t0, 4),
+        })
+    return gdf
+
+def sort_coords_clockwise(coords):
+    cx = sum(x for x, y in coords) / len(coords)
+    cy = sum(y for x, y in coords) / len(coords)
+    return sorted(coords, key=lambda p: math.atan2(p[1] - cy, p[0] - cx))
+
+def close_ring(coords):
+    coords = list(coords)
+    if coords[0] != coords[-1]:
+        coords.append(coords[0])
+    return coords
+
+# =========================================================
+# LUAS PKKPR
+# =========================================================
+def _zone_epsg(lon, lat):
+    # Versi array dari get_utm_info (hanya EPSG)
+    zone = np.floor((np.asarray(lon) + 180) / 6).astype(int) + 1
+    return np.where(np.asarray(lat) >= 0, 32600, 32700) + zone
+
+def _area_in(geoms, epsg):
+    # Luas (m²) sekumpulan geometri EPSG:4326 dalam satu kali transformasi ke epsg
+    transformer = get_transformer(4326, epsg)
+    projected = shapely.transform(geoms, lambda x, y: transformer.transform(x, y), interleaved=False)
+    return shapely.area(projected)
+
+@timed("luas")
+def hitung_luas_pkkpr(results, geodesic=False):
+    # Semua luas PKKPR sekaligus; poligon dibangun sekali lalu diproyeksikan per zona UTM.
+    # Mengisi r["luas_ha"] (UTM zona centroid masing-masing, 0 bila gagal) dan mengembalikan dict:
+    #   total_ha     : jumlah r["luas_ha"]
+    #   polygons     : poligon valid (make_valid) untuk PKKPR TOTAL
+    #   index        : indeks results untuk tiap poligon di atas
+    #   zona         : zona UTM centroid gabungan (None bila tidak ada poligon valid)
+    #   luas_utm     : luas gabungan di zona tersebut (m²)
+    #   luas_mercator: luas gabungan EPSG:3857 (m²)
+    #   luas_geodesik: luas gabungan pada elipsoid WGS84 (m²), hanya bila geodesic=True
+    with stage("bangun_poligon"):
+        raw = np.empty(len(results), dtype=object)
+        for i, r in enumerate(results):
+            try:
+                raw[i] = Polygon(close_ring(r["coords"]))
+            except:
+                raw[i] = None
+            r["luas_ha"] = 0
+
+        ok = ~shapely.is_missing(raw)
+        ok[ok] = ~shapely.is_empty(raw[ok])
+        idx = np.flatnonzero(ok)
+        # Total: poligon yang sudah di-make_valid (dipakai juga untuk layer PKKPR TOTAL)
+        valid = np.array([make_valid(g) for g in raw[idx]], dtype=object)
+
+    if len(idx):
+        centroids = shapely.centroid(raw[idx])
+        epsg = _zone_epsg(shapely.get_x(centroids), shapely.get_y(centroids))
+        luas = np.zeros(len(idx))
+        for code in np.unique(epsg):
+            in_zone = epsg == code
+            luas[in_zone] = _area_in(raw[idx[in_zone]], int(code))
+        for i, a in zip(idx, luas):
+            if np.isfinite(a):
+                results[i]["luas_ha"] = a / 10000
+
+    out = {
+        "total_ha": sum(r["luas_ha"] for r in results),
+        "polygons": [],
+        "index": [],
+        "zona": None,
+        "luas_utm": None,
+        "luas_mercator": None,
+        "luas_geodesik": None,
+    }
+
+    if len(valid) == 0:
+        return out
+    keep = ~shapely.is_empty(valid) & np.isin(shapely.get_type_id(valid), [3, 6])
+    out["polygons"] = list(valid[keep])
+    out["index"] = [int(i) for i in idx[keep]]
+
+    c_all = shapely.union_all(valid).centroid
+    if c_all.is_empty:
+        return out
+    epsg_all, out["zona"] = get_utm_info(c_all.x, c_all.y)
+    out["luas_utm"] = float(_area_in(valid, epsg_all).sum())
+    out["luas_mercator"] = float(_area_in(valid, 3857).sum())
+    if geodesic:
+        geod = Geod(ellps="WGS84")
+        out["luas_geodesik"] = float(sum(abs(geod.geometry_area_perimeter(g)[0]) for g in valid))
+    return out
+
+@timed("bangun_titik")
+def build_total_points(results):
+    unique_points = set()
+    for r in results:
+        for x, y in r["coords"]:
+            unique_points.add((round(x, 8), round(y, 8)))
+
+    return gpd.GeoDataFrame(
+        geometry=[Point(x, y) for x, y in unique_points],
+        crs="EPSG:4326"
+    )
@@ -0,0 +1,195 @@
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+
+# =========================================================
+# PROFIL PER TAHAP
+# =========================================================
+# Rekaman aktif untuk rerun/konteks ini, dan satu rekaman untuk seluruh proses
+# (semua sesi, termasuk export/PNG yang dibuat di thread lain saat tombol download diklik)
+_active = contextvars.ContextVar("pkkpr_recorders", default=())
+_process = None
+
+
+class MemoryTracing:
+    # tracemalloc berlaku untuk seluruh proses (semua sesi). Tiap pemilik (sesi Streamlit,
+    # StageRecorder) yang ingin melacak memori memegang satu referensi; tracing baru dihentikan
+    # bila tidak ada lagi pemilik. Pemilik yang tidak memperbarui referensinya dalam ttl detik
+    # (mis. sesi yang sudah ditutup tanpa rerun terakhir) dianggap sudah melepas.
+
+    def __init__(self, ttl=1800):
+        self.ttl = ttl
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def hold(self, owner, on=True):
+        with self._lock:
+            now = time.monotonic()
+            if on:
+                self._owners[owner] = now
+            else:
+                self._owners.pop(owner, None)
+            for o, t in list(self._owners.items()):
+                if now - t > self.ttl:
+                    del self._owners[o]
+            if self._owners and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif not self._owners and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def release(self, owner):
+        self.hold(owner, on=False)
+
+    def owners(self):
+        with self._lock:
+            return len(self._owners)
+
+
+memory_tracing = MemoryTracing()
+
+
+class StageRecorder:
+    # Waktu (wall), jumlah panggilan dan opsional puncak memori tracemalloc per tahap.
+    # Tahap bersarang ikut terhitung di tahap induknya. Memori hanya dilacak bila memory=True
+    # dan tracemalloc aktif; peak_mb = puncak di atas memori saat tahap dimulai. Puncak tracemalloc
+    # berlaku untuk seluruh proses, jadi peak_mb ikut menghitung alokasi sesi/thread lain.
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._local = threading.local()
+
+    def start(self):
+        if self.memory:
+            memory_tracing.hold(self)
+        return self
+
+    def stop(self):
+        if self.memory:
+            memory_tracing.release(self)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self):
+        frame = {"t0": time.perf_counter()}
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self._stack()
+            for parent in stack:
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame.update(mem0=current, peak=current)
+            stack.append(frame)
+        return frame
+
+    def _exit(self, name, frame):
+        elapsed = time.perf_counter() - frame["t0"]
+        peak = None
+        if "mem0" in frame:
+            stack = self._stack()
+            if stack and stack[-1] is frame:
+                stack.pop()
+            if tracemalloc.is_tracing():
+                frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            peak = frame["peak"] - frame["mem0"]
+        with self._lock:
+            s = self._stats.setdefault(name, {"panggilan": 0, "total": 0.0, "maks": 0.0, "peak": None})
+            s["panggilan"] += 1
+            s["total"] += elapsed
+            s["maks"] = max(s["maks"], elapsed)
+            if peak is not None:
+                s["peak"] = max(s["peak"] or 0, peak)
+
+    def records(self):
+        with self._lock:
+            items = [(name, dict(s)) for name, s in self._stats.items()]
+        return [
+            {
+                "tahap": name,
+                "panggilan": s["panggilan"],
+                "total_ms": round(s["total"] * 1000, 2),
+                "rata_ms": round(s["total"] / s["panggilan"] * 1000, 2),
+                "maks_ms": round(s["maks"] * 1000, 2),
+                "peak_mb": None if s["peak"] is None else round(s["peak"] / 1024 / 1024, 2),
+            }
+            for name, s in items
+        ]
+
+    def to_json(self, **extra):
+        return json.dumps({**extra, "waktu": time.time(), "tahap": self.records()}, indent=2)
+
+    def log(self, logger=None, **extra):
+        # Satu baris JSON per tahap (log terstruktur untuk monitoring)
+        logger = logger or logging.getLogger("pkkpr.profil")
+        for r in self.records():
+            logger.info(json.dumps({**extra, **r}))
+
+
+def use(*recorders):
+    # Rekaman untuk konteks (thread skrip) saat ini; menggantikan yang sebelumnya
+    _active.set(tuple(recorders))
+
+
+def begin_rerun(state, memory=False, log=False):
+    # Rekaman baru untuk satu rerun Streamlit (state = st.session_state), dipasang untuk konteks ini.
+    # tracemalloc dipegang per sesi (bukan per rerun), sehingga rerun yang berhenti lebih awal
+    # (error, st.rerun(), st.stop()) tidak meninggalkan tracing; rekaman rerun seperti itu
+    # ditutup (dan di-log) di awal rerun berikutnya.
+    owner = state.setdefault("_profil_sesi", uuid.uuid4().hex)
+    memory_tracing.hold(owner, on=memory)
+    end_rerun(state)
+    recorder = StageRecorder(memory=memory)
+    state["_profil_rerun"] = (recorder, log)
+    use(recorder)
+    return recorder
+
+
+def end_rerun(state):
+    # Tutup rekaman rerun sesi ini (sekali saja); log=True: tulis ke log "pkkpr.profil"
+    recorder, log = state.pop("_profil_rerun", (None, False))
+    if recorder is not None and log:
+        recorder.log(lingkup="rerun")
+
+
+def set_process_recorder(recorder):
+    global _process
+    _process = recorder
+
+
+@contextlib.contextmanager
+def stage(name):
+    recorders = _active.get()
+    if _process is not None:
+        recorders = recorders + (_process,)
+    if not recorders:
+        yield
+        return
+    frames = [r._enter() for r in recorders]
+    try:
+        yield
+    finally:
+        for r, frame in zip(reversed(recorders), reversed(frames)):
+            r._exit(name, frame)
+
+
+def timed(name):
+    # Dekorator: seluruh pemanggilan fungsi dicatat sebagai satu tahap (tanpa biaya bila tidak ada rekaman)
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _process is None and not _active.get():
+                return fn(*args, **kwargs)
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
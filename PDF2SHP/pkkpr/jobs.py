@@ -0,0 +1,127 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================================
+# JOB LATAR BELAKANG
+# =========================================================
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    # Satu pekerjaan berat (mis. ekstraksi PDF) yang dijalankan JobPool di thread lain.
+    # Fungsi job memanggil job.check() secara berkala (mis. tiap halaman) agar bisa dibatalkan,
+    # dan mengisi job.progress / job.info untuk ditampilkan UI selama berjalan.
+    # status: antre, berjalan, selesai, gagal, batal
+
+    def __init__(self, label=""):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.status = "antre"
+        self.progress = None  # (selesai, total)
+        self.info = {}
+        self.result = None
+        self.error = None
+        self.dibuat = time.time()
+        self.mulai = None
+        self.selesai = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} dibatalkan")
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class JobPool:
+    # Batasi job berat yang berjalan bersamaan (workers) dan yang menunggu (max_queue) untuk
+    # semua sesi dalam satu proses, agar beberapa PDF besar tidak menghabiskan CPU sesi lain.
+    # Job di atas batas itu ditolak (RuntimeError). Job yang sudah selesai disimpan (maks. keep)
+    # sehingga rerun berikutnya bisa mengambil hasilnya lewat ID.
+
+    def __init__(self, workers=2, max_queue=8, keep=64):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pkkpr-job")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._stats = {"dikirim": 0, "selesai": 0, "gagal": 0, "batal": 0, "ditolak": 0}
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            job.check()
+            job.status = "berjalan"
+            job.mulai = time.time()
+            job.result = fn(job, *args, **kwargs)
+            job.status = "selesai"
+        except JobCancelled:
+            job.status = "batal"
+        except Exception as e:
+            job.error = e
+            job.status = "gagal"
+        finally:
+            job.selesai = time.time()
+            with self._lock:
+                self._stats[job.status] += 1
+                self._prune()
+            self._slots.release()
+            job._done.set()
+
+    def _prune(self):
+        done = [job_id for job_id, job in self._jobs.items() if job.status in ("selesai", "gagal", "batal")]
+        for job_id in done[:max(0, len(done) - self.keep)]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, label="", **kwargs):
+        # fn(job, *args, **kwargs) dijalankan di thread pool; hasilnya di job.result.
+        # Konteks pemanggil (mis. rekaman profil rerun di pkkpr.instrument) ikut dibawa ke thread job.
+        # RuntimeError bila antrean penuh
+        with self._lock:
+            if not self._slots.acquire(blocking=False):
+                self._stats["ditolak"] += 1
+                raise RuntimeError("Antrean pemrosesan penuh, coba beberapa saat lagi")
+            job = Job(label)
+            self._jobs[job.id] = job
+            self._stats["dikirim"] += 1
+        self._executor.submit(contextvars.copy_context().run, self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job):
+        # Posisi dalam antrean (1 = berikutnya), 0 bila sudah berjalan/selesai
+        if job.status != "antre":
+            return 0
+        with self._lock:
+            waiting = [j for j in self._jobs.values() if j.status == "antre" and not j.cancelled]
+        return waiting.index(job) + 1 if job in waiting else 0
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            jobs = list(self._jobs.values())
+        s["berjalan"] = sum(1 for j in jobs if j.status == "berjalan")
+        s["antre"] = sum(1 for j in jobs if j.status == "antre")
+        return s
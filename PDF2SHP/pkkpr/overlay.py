@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import shapely
+
+from pkkpr.instrument import timed
+
+# =========================================================
+# OVERLAY TAPAK vs PKKPR
+# =========================================================
+# Pengganti gpd.overlay(..., how="intersection") bila yang dibutuhkan hanya luas:
+# pasangan kandidat dari STRtree, pasangan yang terpisah dilewati, pasangan yang
+# salah satunya tercakup penuh memakai luas geometrinya, sisanya diiris secara vektor.
+# Luas overlap = jumlah luas irisan per pasangan (tapak, PKKPR), sama seperti gpd.overlay.
+
+def intersection_pairs(tapak_geoms, poly_geoms):
+    # Kembalikan (indeks tapak, indeks PKKPR, luas irisan) untuk pasangan yang beririsan
+    tapak_geoms = np.asarray(tapak_geoms, dtype=object)
+    poly_geoms = np.asarray(poly_geoms, dtype=object)
+    empty = (np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=float))
+    if len(tapak_geoms) == 0 or len(poly_geoms) == 0:
+        return empty
+
+    tree = shapely.STRtree(poly_geoms)
+    it, ip = tree.query(tapak_geoms)
+    if len(it) == 0:
+        return empty
+
+    shapely.prepare(tapak_geoms)
+    shapely.prepare(poly_geoms)
+    t = tapak_geoms[it]
+    p = poly_geoms[ip]
+
+    keep = shapely.intersects(t, p)
+    it, ip, t, p = it[keep], ip[keep], t[keep], p[keep]
+
+    area = np.zeros(len(it))
+    t_inside = shapely.covered_by(t, p)
+    p_inside = ~t_inside & shapely.covered_by(p, t)
+    partial = ~t_inside & ~p_inside
+    area[t_inside] = shapely.area(t[t_inside])
+    area[p_inside] = shapely.area(p[p_inside])
+    if partial.any():
+        area[partial] = shapely.area(shapely.intersection(t[partial], p[partial]))
+    return it, ip, area
+
+
+@timed("overlay")
+def overlay_areas(gdf_tapak, gdf_poly):
+    # Kedua layer harus dalam CRS proyeksi yang sama (mis. UTM).
+    # Kembalikan (DataFrame per fitur tapak, dict total) dalam m².
+    tapak_geoms = gdf_tapak.geometry.to_numpy()
+    it, _, inter_area = intersection_pairs(tapak_geoms, gdf_poly.geometry.to_numpy())
+
+    luas = shapely.area(tapak_geoms)
+    luas = np.where(np.isnan(luas), 0.0, luas)
+    overlap = np.bincount(it, weights=inter_area, minlength=len(tapak_geoms))
+    per_feature = pd.DataFrame(
+        {
+            "luas": luas,
+            "luas_overlap": overlap,
+            "luas_luar": np.maximum(0, luas - overlap),
+        },
+        index=gdf_tapak.index,
+    )
+
+    luas_tapak = float(luas.sum())
+    luas_overlap = float(inter_area.sum())
+    total = {
+        "luas_tapak": luas_tapak,
+        "luas_overlap": luas_overlap,
+        "luas_luar": max(0, luas_tapak - luas_overlap),
+    }
+    return per_feature, total
@@ -0,0 +1,606 @@
+import io
+import math
+import multiprocessing
+import re
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pkkpr.instrument import stage, timed
+
+# =========================================================
+# PARSE
+# =========================================================
+def try_parse_float(s):
+    try:
+        return float(str(s).strip().replace(",", "."))
+    except:
+        return None
+
+_DMS_REPLACEMENTS = [
+    ("BT", "E"), ("BB", "W"),
+    ("LS", "S"), ("LU", "N"),
+    ("º", "°"), ("'", "'"),
+    ("′", "'"), ("″", '"'),
+]
+_DIRECTION_RE = re.compile(r"[NSEW]")
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+def dms_to_decimal(coord):
+    if coord is None:
+        return None
+    s = str(coord).upper().strip()
+    for old, new in _DMS_REPLACEMENTS:
+        s = s.replace(old, new)
+    direction = None
+    m = _DIRECTION_RE.search(s)
+    if m:
+        direction = m.group(0)
+    nums = _NUMBER_RE.findall(s)
+    if not nums:
+        return None
+    try:
+        deg = float(nums[0])
+        minutes = float(nums[1]) if len(nums) > 1 else 0
+        seconds = float(nums[2]) if len(nums) > 2 else 0
+    except:
+        return None
+    val = abs(deg) + (minutes / 60) + (seconds / 3600)
+    if direction in ["S", "W"] or str(coord).strip().startswith("-"):
+        val *= -1
+    return val
+
+def parse_any_coordinate(val):
+    if val is None:
+        return None
+    s = str(val).strip()
+    f = try_parse_float(s)
+    if f is not None:
+        return f
+    return dms_to_decimal(s)
+
+def normalize_lon_lat(a, b):
+    if a is None or b is None:
+        return None
+    if 95 <= a <= 141 and -15 <= b <= 15:
+        return (a, b)
+    if 95 <= b <= 141 and -15 <= a <= 15:
+        return (b, a)
+    if abs(a) > 1000 and abs(b) > 1000:
+        return (a, b)
+    return None
+
+# =========================================================
+# VECTORIZED PARSE (per kolom tabel)
+# =========================================================
+# Angka desimal biasa (setelah koma -> titik) langsung dikonversi tanpa regex DMS
+_DECIMAL_RE = r"[-+]?(?:\d+\.?\d*|\.\d+)"
+# Karakter yang masih mungkin diterima float() (mis. "1e5", "inf", "1_000")
+_FLOAT_CHARS_RE = r"[\d.+\-_eEiInNfFtTyYaA\s]+"
+# Tiga angka pertama (derajat, menit, detik) — sama dengan re.findall(...)[:3]
+_DMS_PARTS_RE = r"(?s)([-+]?\d+(?:\.\d+)?)(?:.*?([-+]?\d+(?:\.\d+)?))?(?:.*?([-+]?\d+(?:\.\d+)?))?"
+
+def _to_float_array(values):
+    # object -> float lewat float() per elemen agar hasil identik dengan parser skalar
+    return np.asarray(values, dtype=object).astype(float)
+
+def parse_coordinate_series(values):
+    # Versi kolom dari parse_any_coordinate; None/gagal -> NaN
+    # None -> "None" dan tidak menghasilkan angka, sama seperti parser skalar
+    s = pd.Series(values, dtype=object).reset_index(drop=True)
+    out = np.full(len(s), np.nan)
+    if s.empty:
+        return out
+    text = s.astype(str).str.strip()
+
+    dec = text.str.replace(",", ".", regex=False)
+    is_dec = dec.str.fullmatch(_DECIMAL_RE).to_numpy(dtype=bool)
+    if is_dec.any():
+        out[is_dec] = _to_float_array(dec[is_dec])
+
+    rest = ~is_dec
+    # Dicocokkan pada dec (koma sudah jadi titik), sama seperti try_parse_float
+    maybe_float = rest & dec.str.fullmatch(_FLOAT_CHARS_RE).to_numpy(dtype=bool)
+    for i in np.flatnonzero(maybe_float):
+        f = try_parse_float(text.iat[i])
+        if f is not None:
+            out[i] = f
+            rest[i] = False
+
+    if rest.any():
+        raw = text[rest]
+        up = raw.str.upper()
+        for old, new in _DMS_REPLACEMENTS:
+            up = up.str.replace(old, new, regex=False)
+        direction = up.str.extract(r"([NSEW])", expand=False)
+        parts = up.str.extract(_DMS_PARTS_RE)
+        deg = _to_float_array(parts[0])
+        minutes = np.nan_to_num(_to_float_array(parts[1]), nan=0.0)
+        seconds = np.nan_to_num(_to_float_array(parts[2]), nan=0.0)
+        val = np.abs(deg) + (minutes / 60) + (seconds / 3600)
+        negative = direction.isin(["S", "W"]).to_numpy() | raw.str.startswith("-").to_numpy(dtype=bool)
+        val[negative] *= -1
+        out[rest] = val
+    return out
+
+def normalize_lon_lat_arrays(a, b):
+    # Versi array dari normalize_lon_lat -> (lon/x, lat/y, mask valid)
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    with np.errstate(invalid="ignore"):
+        ab = (95 <= a) & (a <= 141) & (-15 <= b) & (b <= 15)
+        ba = ~ab & (95 <= b) & (b <= 141) & (-15 <= a) & (a <= 15)
+        meter = ~ab & ~ba & (np.abs(a) > 1000) & (np.abs(b) > 1000)
+    x = np.where(ba, b, a)
+    y = np.where(ba, a, b)
+    return x, y, ab | ba | meter
+
+def _parse_no(value, default):
+    try:
+        return int(str(value).strip())
+    except:
+        return default
+
+def table_coordinates_rowwise(df, x_col, y_col, no_col=None, ket_col=None):
+    coords_with_no = []
+    groups = {}
+    last_ket = None
+
+    for _, row in df.iterrows():
+        try:
+            x = parse_any_coordinate(row.get(x_col))
+            y = parse_any_coordinate(row.get(y_col))
+            if x is None or y is None:
+                continue
+            xy = normalize_lon_lat(x, y)
+            if not xy:
+                continue
+            ket = ""
+            if ket_col:
+                val = row.get(ket_col)
+                if pd.notna(val):
+                    ket = str(val).strip()
+                    if ket:
+                        last_ket = ket
+            if last_ket:
+                groups.setdefault(last_ket, []).append(xy)
+            no = len(coords_with_no) + 1
+            if no_col:
+                try:
+                    no = int(str(row.get(no_col)).strip())
+                except:
+                    pass
+            coords_with_no.append((no, xy))
+        except:
+            continue
+
+    return coords_with_no, groups
+
+@timed("parse_koordinat")
+def table_coordinates(df, x_col, y_col, no_col=None, ket_col=None):
+    # Kembalikan (coords_with_no, groups per keterangan) untuk satu tabel
+    used = [c for c in (x_col, y_col, no_col, ket_col) if c]
+    if any(list(df.columns).count(c) > 1 for c in used):
+        # Nama kolom ganda: row.get() mengembalikan Series, pertahankan perilaku lama
+        return table_coordinates_rowwise(df, x_col, y_col, no_col, ket_col)
+
+    x, y, valid = normalize_lon_lat_arrays(
+        parse_coordinate_series(df[x_col]),
+        parse_coordinate_series(df[y_col]),
+    )
+    idx = np.flatnonzero(valid)
+    xys = list(zip(x[idx].tolist(), y[idx].tolist()))
+
+    groups = {}
+    if ket_col:
+        # last_ket hanya diperbarui pada baris dengan koordinat valid
+        raw = df[ket_col].reset_index(drop=True).iloc[idx]
+        ket = raw[raw.notna()].astype(str).str.strip()
+        ket = ket[ket != ""].reindex(raw.index).ffill()
+        for last_ket, xy in zip(ket.tolist(), xys):
+            if isinstance(last_ket, str):
+                groups.setdefault(last_ket, []).append(xy)
+
+    if no_col:
+        nos = df[no_col].reset_index(drop=True).iloc[idx].tolist()
+        coords_with_no = [(_parse_no(v, i), xy) for i, (v, xy) in enumerate(zip(nos, xys), 1)]
+    else:
+        coords_with_no = [(i, xy) for i, xy in enumerate(xys, 1)]
+
+    return coords_with_no, groups
+
+# =========================================================
+# PDF COORD PARSER
+# =========================================================
+def parse_coords_from_text_block(block):
+    coords = []
+    lines = block.splitlines()
+    for line in lines:
+        nums = _NUMBER_RE.findall(line)
+        if len(nums) >= 2:
+            a = parse_any_coordinate(nums[-2])
+            b = parse_any_coordinate(nums[-1])
+            xy = normalize_lon_lat(a, b)
+            if xy:
+                coords.append(xy)
+    return coords
+
+# Kata kunci header kolom koordinat (dicocokkan sebagai substring nama kolom)
+X_HEADER_TOKENS = ("bujur", "longitude", "long", "x")
+Y_HEADER_TOKENS = ("lintang", "latitude", "lat", "y")
+# Tabel lanjutan (tabel multi-halaman) digabung bila paling jauh 2 halaman dari tabel sebelumnya
+CONTINUATION_PAGES = 2
+
+def get_table_priority(text):
+    text = str(text).lower()
+    if "tabel koordinat yang disetujui" in text:
+        return 1
+    if "tabel koordinat yang dimohonkan" in text:
+        return 2
+    if "tabel koordinat yang dimohonkan dan disetujui" in text:
+        return 3
+    return 999
+
+def detect_coordinate_type(coords):
+    if not coords:
+        return "UNKNOWN"
+    xs = [x for x, y in coords]
+    ys = [y for x, y in coords]
+    try:
+        maxx = max(xs); minx = min(xs)
+        maxy = max(ys); miny = min(ys)
+        if (90 <= minx <= 150 and 90 <= maxx <= 150 and -15 <= miny <= 15 and -15 <= maxy <= 15):
+            return "WGS84"
+        if (100000 <= maxx <= 900000 and 1000000 <= maxy <= 10000000):
+            return "UTM"
+        if (maxx > 1000 and maxy > 1000):
+            return "TM3"
+    except:
+        pass
+    return "UNKNOWN"
+
+# =========================================================
+# PRE-SCREENING HALAMAN
+# =========================================================
+# Token angka yang mirip koordinat: DMS (106° 48' / 106 48 30), desimal (106.8 / -6,2) atau meter UTM/TM3
+_COORD_TOKEN_RE = re.compile(
+    r"\d{1,3}\s*[°º]\s*\d{1,2}"
+    r"|\d{1,3}\s+\d{1,2}\s*['′’]?\s+\d{1,2}(?:[.,]\d+)?"
+    r"|[-+]?\d{1,3}[.,]\d+|\d{5,8}(?:[.,]\d+)?"
+)
+# Kata header kolom X/Y sama dengan yang dicari ResultBuilder, ditambah "koordinat";
+# di teks halaman dicocokkan per kata agar huruf x/y di kalimat biasa tidak ikut
+_HEADER_RE = re.compile(r"\b(?:%s|koordinat)\b" % "|".join(X_HEADER_TOKENS + Y_HEADER_TOKENS))
+# Tabel baru dipakai bila minimal 3 baris koordinat, jadi halaman dengan < 3 baris bisa dilewati
+PRESCREEN_MIN_LINES = 3
+
+def score_page_text(text):
+    text = str(text)
+    lower = text.lower()
+    coord_lines = 0
+    for line in text.splitlines():
+        if len(_COORD_TOKEN_RE.findall(line)) >= 2:
+            coord_lines += 1
+    return {
+        "priority": get_table_priority(lower),
+        "header": len(set(_HEADER_RE.findall(lower))),
+        "coord_lines": coord_lines,
+    }
+
+def page_may_hold_coordinates(text):
+    score = score_page_text(text)
+    return score["priority"] < 999 or score["header"] > 0 or score["coord_lines"] >= PRESCREEN_MIN_LINES
+
+def pages_to_rescan(skipped, candidate_tables, results):
+    # Halaman yang dilewati pre-screening tapi tetap perlu diekstrak: semua bila belum ada hasil,
+    # selain itu yang punya baris mirip koordinat dan masih dalam jangkauan tabel lanjutan
+    # dari halaman yang punya tabel (sisa tabel multi-halaman yang hanya 1-2 baris)
+    if not results:
+        return list(skipped)
+    table_pages = {item["page"] for item in candidate_tables}
+    return [
+        (page_no, priority, coord_lines) for page_no, priority, coord_lines in skipped
+        if coord_lines and any(abs(page_no - p) <= CONTINUATION_PAGES for p in table_pages)
+    ]
+
+# =========================================================
+# PDF TABLE EXTRACTION
+# =========================================================
+@timed("ekstraksi_tabel")
+def extract_page_tables(page, page_no, priority):
+    try:
+        tables = page.extract_tables()
+    except:
+        tables = []
+    candidate_tables = []
+    for table in tables:
+        if not table or len(table) < 2:
+            continue
+        candidate_tables.append({"priority": priority, "page": page_no, "table": table})
+    return candidate_tables
+
+def scan_page(page, prescreen=True):
+    # Satu halaman -> (kandidat tabel, (halaman, prioritas, baris koordinat) bila dilewati pre-screening,
+    # teks halaman).
+    # Teks disimpan per halaman untuk cadangan bila tidak ada tabel koordinat, sehingga PDF tidak perlu
+    # dibuka ulang; koordinatnya baru di-parse bila cadangan itu benar-benar dipakai.
+    page_no = page.page_number - 1
+    with stage("teks_halaman"):
+        page_text = page.extract_text() or ""
+    priority = get_table_priority(page_text)
+    if prescreen and not page_may_hold_coordinates(page_text):
+        return [], (page_no, priority, score_page_text(page_text)["coord_lines"]), page_text
+    return extract_page_tables(page, page_no, priority), None, page_text
+
+def collect_candidate_tables(pages, prescreen=True):
+    # Kembalikan (kandidat tabel, halaman yang dilewati pre-screening, teks per halaman);
+    # cache objek halaman pdfplumber dibuang setelah halaman selesai dibaca
+    candidate_tables = []
+    skipped = []
+    page_texts = []
+    for page in pages:
+        tables, skip, text = scan_page(page, prescreen)
+        page.close()
+        candidate_tables += tables
+        if skip:
+            skipped.append(skip)
+        page_texts.append(text)
+    return candidate_tables, skipped, page_texts
+
+class ResultBuilder:
+    # build_results_from_tables secara bertahap: tabel dimasukkan satu per satu dalam urutan
+    # (prioritas, halaman). Tabel lanjutan hanya digabung ke hasil terakhir, jadi semua hasil
+    # sebelum results[-1] sudah final.
+
+    def __init__(self):
+        self.results = []
+        self._seen = set()
+
+    def add(self, item):
+        all_results = self.results
+        seen_coords = self._seen
+        table = item["table"]
+        try:
+            df = pd.DataFrame(table[1:], columns=table[0])
+        except:
+            return
+
+        df.columns = [re.sub(r"\s+", " ", str(c)).strip().lower() for c in df.columns]
+
+        no_col = x_col = y_col = ket_col = None
+        for c in df.columns:
+            if "no" in c:
+                no_col = c
+            if any(k in c for k in X_HEADER_TOKENS):
+                x_col = c
+            if any(k in c for k in Y_HEADER_TOKENS):
+                y_col = c
+            if "keterangan" in c:
+                ket_col = c
+
+        if not (x_col and y_col):
+            return
+
+        coords_with_no, groups = table_coordinates(df, x_col, y_col, no_col, ket_col)
+
+        if groups:
+            for nama_sumur, coords in groups.items():
+                if len(coords) < 4:
+                    continue
+                coord_type = detect_coordinate_type(coords)
+                coord_signature = tuple((round(x, 8), round(y, 8)) for x, y in coords)
+                if coord_signature in seen_coords:
+                    continue
+                seen_coords.add(coord_signature)
+                all_results.append({"nama": nama_sumur, "coords": coords, "coord_type": coord_type, "page": item["page"]})
+
+        if len(coords_with_no) >= 3:
+            coords_with_no.sort(key=lambda x: x[0])
+            coords = [xy for _, xy in coords_with_no]
+            coord_type = detect_coordinate_type(coords)
+            if coord_type == "TM3":
+                return
+            coord_signature = tuple((round(x, 8), round(y, 8)) for x, y in coords)
+            if coord_signature in seen_coords:
+                return
+
+            # Cek apakah tabel ini adalah lanjutan dari tabel sebelumnya
+            # (tabel multi-halaman yang dipecah — nomor urut lanjut dari tabel sebelumnya)
+            merged = False
+            if all_results:
+                prev = all_results[-1]
+                prev_coords = prev["coords"]
+                # Cek apakah titik pertama tabel ini dekat dengan titik terakhir tabel sebelumnya
+                # atau nomor koordinat lanjut (tidak mulai dari 1)
+                first_no = coords_with_no[0][0] if coords_with_no else 1
+                if first_no > 1 and abs(item["page"] - prev.get("page", 0)) <= CONTINUATION_PAGES:
+                    # Gabung ke tabel sebelumnya
+                    merged_coords = prev_coords + coords
+                    # Hapus duplikat berurutan
+                    deduped = [merged_coords[0]]
+                    for c in merged_coords[1:]:
+                        if (round(c[0], 6), round(c[1], 6)) != (round(deduped[-1][0], 6), round(deduped[-1][1], 6)):
+                            deduped.append(c)
+                    prev["coords"] = deduped
+                    prev["coord_type"] = detect_coordinate_type(deduped)
+                    seen_coords.add(coord_signature)
+                    merged = True
+
+            if not merged:
+                seen_coords.add(coord_signature)
+                all_results.append({"coords": coords, "coord_type": coord_type, "page": item["page"], "nama": f"PKKPR {len(all_results)+1}"})
+
+def build_results_from_tables(candidate_tables):
+    builder = ResultBuilder()
+    for item in sorted(candidate_tables, key=lambda x: (x["priority"], x["page"])):
+        builder.add(item)
+    return builder.results
+
+# =========================================================
+# PARALLEL PAGE EXTRACTION
+# =========================================================
+# Dokumen dengan halaman lebih sedikit dari ini tidak sebanding dengan overhead proses
+PARALLEL_MIN_PAGES = 8
+
+_page_pools = {}
+_page_pool_lock = threading.Lock()
+
+def get_page_pool(workers):
+    # Satu pool per jumlah worker, dipakai ulang antar dokumen dan tidak pernah dimatikan selama
+    # proses hidup: sesi/job lain mungkin masih memakai pool dengan jumlah worker berbeda.
+    # "spawn" aman dipanggil dari thread Streamlit
+    with _page_pool_lock:
+        pool = _page_pools.get(workers)
+        if pool is None:
+            pool = _page_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return pool
+
+def _pdf_source(uploaded_file):
+    # File di disk dikirim sebagai path, selain itu (UploadedFile, BytesIO) sebagai bytes
+    name = getattr(uploaded_file, "name", None)
+    if isinstance(uploaded_file, io.BufferedReader) and isinstance(name, str):
+        return name
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+def _collect_page_chunk(source, page_numbers, prescreen):
+    import pdfplumber
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with pdfplumber.open(source, pages=[n + 1 for n in page_numbers]) as pdf:
+        return collect_candidate_tables(pdf.pages, prescreen=prescreen)
+
+def iter_candidate_tables_parallel(source, page_numbers, workers, prescreen=True):
+    # Halaman dibagi menjadi rentang berurutan; hasil tiap rentang di-yield sesuai urutan halaman:
+    # (kandidat tabel, halaman dilewati, teks per halaman, jumlah halaman)
+    size = math.ceil(len(page_numbers) / workers)
+    chunks = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+    pool = get_page_pool(workers)
+    results = pool.map(_collect_page_chunk, [source] * len(chunks), chunks, [prescreen] * len(chunks))
+    for (tables, skip, texts), chunk in zip(results, chunks):
+        yield tables, skip, texts, len(chunk)
+
+def collect_candidate_tables_parallel(source, page_numbers, workers, prescreen=True):
+    candidate_tables = []
+    skipped = []
+    page_texts = []
+    for tables, skip, texts, _ in iter_candidate_tables_parallel(source, page_numbers, workers, prescreen):
+        candidate_tables += tables
+        skipped += skip
+        page_texts += texts
+    return candidate_tables, skipped, page_texts
+
+# =========================================================
+# STREAMING EKSTRAKSI
+# =========================================================
+def _iter_page_chunks(pdf, uploaded_file, workers, prescreen):
+    if workers > 1 and len(pdf.pages) >= PARALLEL_MIN_PAGES:
+        yield from iter_candidate_tables_parallel(
+            _pdf_source(uploaded_file), list(range(len(pdf.pages))), workers, prescreen=prescreen
+        )
+        return
+    for page in pdf.pages:
+        tables, skip, text = scan_page(page, prescreen)
+        page.close()
+        yield tables, [skip] if skip else [], [text], 1
+
+def iter_pdf_results(uploaded_file, prescreen=True, workers=1, stats=None):
+    # Ekstraksi bertahap per halaman (per rentang halaman bila workers > 1). Event:
+    #   ("halaman", (selesai, total)) setelah tiap halaman/rentang
+    #   ("pkkpr", hasil)              segera setelah satu PKKPR lengkap
+    #   ("selesai", semua hasil)      hasil akhir, sama dengan ekstraksi sekaligus
+    # Tabel diproses dalam urutan (prioritas, halaman). Selama prioritas tidak turun antar
+    # halaman urutan itu sama dengan urutan halaman; bila turun, event "pkkpr" berhenti dan
+    # hasil akhir disusun ulang dari kandidat tabel (hanya teks sel, disimpan sampai selesai).
+    # stats (opsional) diisi: halaman, dilewati, diulang, tabel, pkkpr, disusun_ulang, detik, peak_mb (bila tracemalloc aktif).
+    t0 = time.perf_counter()
+    stats = {} if stats is None else stats
+    candidate_tables = []
+    skipped = []
+    page_texts = []
+    builder = ResultBuilder()
+    emitted = 0
+    max_priority = 0
+    in_order = True
+
+    # pdfplumber baru dimuat saat ada PDF yang dibaca (start aplikasi lebih ringan)
+    import pdfplumber
+
+    uploaded_file.seek(0)
+    with pdfplumber.open(uploaded_file) as pdf:
+        n_pages = len(pdf.pages)
+        parallel = workers > 1 and n_pages >= PARALLEL_MIN_PAGES
+        done = 0
+        for tables, skip, texts, n in _iter_page_chunks(pdf, uploaded_file, workers, prescreen):
+            candidate_tables += tables
+            skipped += skip
+            page_texts += texts
+            done += n
+            for item in tables:
+                in_order = in_order and item["priority"] >= max_priority
+                max_priority = max(max_priority, item["priority"])
+                if in_order:
+                    builder.add(item)
+            if in_order:
+                while emitted < len(builder.results) - 1:
+                    yield "pkkpr", builder.results[emitted]
+                    emitted += 1
+            yield "halaman", (done, n_pages)
+
+        all_results = builder.results if in_order else build_results_from_tables(candidate_tables)
+        rescan = pages_to_rescan(skipped, candidate_tables, all_results)
+        if rescan:
+            # Pre-screening mungkin terlalu ketat (tidak ada hasil, atau tabel bisa berlanjut ke
+            # halaman yang dilewati) — ekstrak juga halaman tersebut lalu susun ulang hasilnya
+            if parallel and len(rescan) >= PARALLEL_MIN_PAGES:
+                retry, _, _ = collect_candidate_tables_parallel(
+                    _pdf_source(uploaded_file), [page_no for page_no, _, _ in rescan], workers, prescreen=False
+                )
+            else:
+                retry = []
+                for page_no, priority, _ in rescan:
+                    retry += extract_page_tables(pdf.pages[page_no], page_no, priority)
+                    pdf.pages[page_no].close()
+            if retry:
+                candidate_tables += retry
+                in_order = False
+                all_results = build_results_from_tables(candidate_tables)
+
+    if in_order:
+        for r in all_results[emitted:]:
+            yield "pkkpr", r
+
+    if not all_results:
+        # Cadangan: koordinat dari teks semua halaman (dikumpulkan saat halaman dibaca)
+        coords = [xy for text in page_texts for xy in parse_coords_from_text_block(text)]
+        if len(coords) >= 3:
+            coord_type = detect_coordinate_type(coords)
+            all_results = [{"coords": coords, "coord_type": coord_type, "page": 0, "nama": "PKKPR 1"}]
+            yield "pkkpr", all_results[0]
+
+    stats.update({
+        "halaman": n_pages,
+        "dilewati": len(skipped),
+        "diulang": len(rescan),
+        "tabel": len(candidate_tables),
+        "pkkpr": len(all_results),
+        "disusun_ulang": not in_order,
+        "detik": round(time.perf_counter() - t0, 3),
+    })
+    if tracemalloc.is_tracing():
+        stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+    yield "selesai", all_results
+
+def extract_tables_and_coords_from_pdf(uploaded_file, prescreen=True, workers=1, stats=None):
+    for event, data in iter_pdf_results(uploaded_file, prescreen=prescreen, workers=workers, stats=stats):
+        if event == "selesai":
+            return data
+    return []
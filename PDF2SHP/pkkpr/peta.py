@@ -0,0 +1,138 @@
+import json
+import math
+
+import numpy as np
+import shapely
+
+from pkkpr.instrument import timed
+
+# =========================================================
+# LAYER TITIK KOORDINAT
+# =========================================================
+CLUSTER_MIN_POINTS = 500
+COORD_DECIMALS = 7  # ~1 cm, cukup untuk tampilan peta
+
+VERTEX_STYLE = {
+    "radius": 4,
+    "color": "black",
+    "fill": True,
+    "fill_color": "orange",
+    "fill_opacity": 1,
+}
+
+# Popup dibuat di browser saat titik diklik, bukan disimpan per titik di HTML
+_POPUP_JS = """
+function (feature, layer) {
+    layer.bindPopup(function () { return "Titik " + feature.properties.titik; });
+}
+"""
+
+_CLUSTER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 4, color: "black", fill: true, fillColor: "orange", fillOpacity: 1
+    });
+    marker.bindPopup(function () { return "Titik " + row[2]; });
+    return marker;
+}
+"""
+
+
+def _vertex_xy(gdf_points):
+    xy = shapely.get_coordinates(gdf_points.geometry.to_numpy())
+    return np.round(xy, COORD_DECIMALS)
+
+
+def vertex_geojson(gdf_points):
+    # FeatureCollection ringkas: hanya koordinat (dibulatkan) dan nomor titik
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [x, y]},
+            "properties": {"titik": i},
+        }
+        for i, (x, y) in enumerate(_vertex_xy(gdf_points).tolist(), 1)
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+@timed("titik_peta")
+def add_vertex_layer(m, gdf_points, cluster_min=CLUSTER_MIN_POINTS, name="Titik"):
+    # Satu layer untuk semua titik (bukan satu CircleMarker per titik);
+    # di atas cluster_min titik dikelompokkan dan marker dibuat di browser.
+    # gdf_points harus EPSG:4326.
+    if gdf_points is None or gdf_points.empty:
+        return None
+    # folium baru dimuat saat peta dibangun (tidak membebani start aplikasi)
+    import folium
+    from folium.plugins import FastMarkerCluster
+    from folium.utilities import JsCode
+
+    if cluster_min and len(gdf_points) >= cluster_min:
+        data = [[y, x, i] for i, (x, y) in enumerate(_vertex_xy(gdf_points).tolist(), 1)]
+        layer = FastMarkerCluster(data, callback=_CLUSTER_JS, name=name)
+    else:
+        layer = folium.GeoJson(
+            vertex_geojson(gdf_points),
+            name=name,
+            marker=folium.CircleMarker(**VERTEX_STYLE),
+            on_each_feature=JsCode(_POPUP_JS),
+        )
+    layer.add_to(m)
+    return layer
+
+
+# =========================================================
+# LOD POLIGON (PKKPR / TAPAK)
+# =========================================================
+MAP_MAX_BYTES = 2 * 1024 * 1024
+LOD_PIXELS = 4000  # toleransi awal = sisi terpanjang extent / LOD_PIXELS (tidak terlihat saat zoom ke layer)
+LOD_STEPS = 12
+
+
+def _quantize(geoms, decimals):
+    return shapely.transform(geoms, lambda c: np.round(c, decimals))
+
+
+def _decimals_for(tolerance):
+    # Presisi koordinat mengikuti toleransi (1e-5° ~ 1 m), minimal 5 dan maksimal 7 desimal
+    return int(min(7, max(5, math.ceil(-math.log10(tolerance)) + 1)))
+
+
+@timed("lod_peta")
+def lod_geojson(gdf, max_bytes=MAP_MAX_BYTES, pixels=LOD_PIXELS):
+    # GeoJSON ringan khusus tampilan peta: disederhanakan (preserve_topology) dengan toleransi
+    # dari extent layer, lalu koordinat dibulatkan. Toleransi digandakan sampai ukuran
+    # <= max_bytes. gdf harus EPSG:4326 dan tidak diubah (luas/overlay/export tetap presisi penuh).
+    # Kembalikan (FeatureCollection, info).
+    geoms = gdf.geometry.to_numpy()
+    geoms = geoms[~(shapely.is_missing(geoms) | shapely.is_empty(geoms))]
+    info = {"fitur": int(len(geoms)), "vertex_asli": int(shapely.get_num_coordinates(geoms).sum())}
+    if len(geoms) == 0:
+        info.update({"vertex_peta": 0, "toleransi": 0.0, "desimal": 7, "bytes": 0, "dalam_anggaran": True})
+        return {"type": "FeatureCollection", "features": []}, info
+
+    minx, miny, maxx, maxy = shapely.total_bounds(geoms)
+    tolerance = max(maxx - minx, maxy - miny, 1e-6) / pixels
+    for step in range(LOD_STEPS):
+        decimals = _decimals_for(tolerance)
+        simple = _quantize(shapely.simplify(geoms, tolerance, preserve_topology=True), decimals)
+        parts = shapely.to_geojson(simple)
+        size = sum(len(p) for p in parts) + len(parts) * 48  # 48 ~ pembungkus Feature
+        if size <= max_bytes:
+            break
+        tolerance *= 2
+
+    text = "".join([
+        '{"type":"FeatureCollection","features":[',
+        ",".join('{"type":"Feature","properties":{},"geometry":%s}' % p for p in parts),
+        "]}",
+    ])
+    info.update({
+        "vertex_peta": int(shapely.get_num_coordinates(simple).sum()),
+        "toleransi": float(tolerance),
+        "desimal": decimals,
+        "bytes": len(text),
+        "dalam_anggaran": len(text) <= max_bytes,
+    })
+    return json.loads(text), info
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import shapely
+
+HASH_DECIMALS = 7  # ~1 cm; koordinat dibulatkan sebelum di-hash
+
+# =========================================================
+# HASH GEOMETRI
+# =========================================================
+def default_registry_path():
+    return os.environ.get("PKKPR_REGISTRY_PATH") or os.path.join(os.path.expanduser("~"), ".cache", "pkkpr", "registry.sqlite")
+
+
+def geometry_hash(geoms):
+    # Hash ringkas (32 hex) per geometri: koordinat dibulatkan lalu dinormalisasi, sehingga
+    # titik awal dan arah ring tidak berpengaruh. geoms = array shapely EPSG:4326.
+    geoms = shapely.normalize(shapely.transform(np.asarray(geoms, dtype=object), lambda c: np.round(c, HASH_DECIMALS)))
+    return [
+        None if wkb is None else hashlib.blake2b(wkb, digest_size=16).hexdigest()
+        for wkb in shapely.to_wkb(geoms)
+    ]
+
+# =========================================================
+# REGISTRY PKKPR (SQLITE + R-TREE)
+# =========================================================
+CHECK_COLUMNS = ["pkkpr", "jenis", "id", "nama", "file", "halaman", "luas_ha", "persen"]
+
+
+class PkkprRegistry:
+    # Semua poligon PKKPR yang pernah diproses, disimpan di satu file SQLite:
+    # tabel pkkpr (unik per hash geometri) + indeks R-tree atas bbox. Cek duplikat memakai
+    # indeks hash, cek tumpang tindih memakai R-tree lalu uji geometri hanya pada kandidat.
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {"cek": 0, "daftar": 0, "duplikat": 0, "tumpang_tindih": 0, "ms_cek_terakhir": 0.0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dokumen (hash TEXT PRIMARY KEY, file TEXT, dibuat REAL);
+            CREATE TABLE IF NOT EXISTS pkkpr (
+                id INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, dokumen TEXT, file TEXT,
+                nama TEXT, halaman INTEGER, luas_ha REAL, geom BLOB, dibuat REAL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS pkkpr_rtree USING rtree(id, minx, maxx, miny, maxy);
+        """)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def seen(self, dokumen):
+        # Waktu dokumen (hash isi file) pertama kali didaftarkan, None bila belum pernah
+        with self._lock:
+            row = self._conn.execute("SELECT dibuat FROM dokumen WHERE hash=?", (dokumen,)).fetchone()
+        return row[0] if row else None
+
+    def register(self, geoms, dokumen, file="", records=None):
+        # Daftarkan poligon satu dokumen (satu transaksi); geometri yang hash-nya sudah ada dilewati.
+        # records = dict per poligon (nama, halaman, luas_ha). Kembalikan jumlah poligon baru.
+        geoms = np.asarray(geoms, dtype=object)
+        records = records or [{}] * len(geoms)
+        hashes = geometry_hash(geoms)
+        bounds = shapely.bounds(geoms)
+        wkbs = shapely.to_wkb(geoms)
+        now = time.time()
+        added = 0
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR IGNORE INTO dokumen VALUES (?, ?, ?)", (dokumen, file, now))
+                for h, (minx, miny, maxx, maxy), wkb, rec in zip(hashes, bounds, wkbs, records):
+                    if h is None or np.isnan(minx):
+                        continue
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO pkkpr (hash, dokumen, file, nama, halaman, luas_ha, geom, dibuat) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (h, dokumen, file, rec.get("nama"), rec.get("halaman"), rec.get("luas_ha"), sqlite3.Binary(wkb), now),
+                    )
+                    if cur.rowcount == 1:
+                        self._conn.execute(
+                            "INSERT INTO pkkpr_rtree VALUES (?, ?, ?, ?, ?)",
+                            (cur.lastrowid, float(minx), float(maxx), float(miny), float(maxy)),
+                        )
+                        added += 1
+            self._stats["daftar"] += added
+        return added
+
+    def check(self, geoms, exclude_dokumen=None):
+        # Duplikat persis (hash sama) dan tumpang tindih (luas irisan > 0) dengan PKKPR terdaftar.
+        # exclude_dokumen: abaikan poligon dari dokumen yang sama (unggah ulang / rerun).
+        # Kembalikan DataFrame CHECK_COLUMNS; pkkpr = indeks poligon input, persen = irisan / luas input.
+        t0 = time.perf_counter()
+        geoms = np.asarray(geoms, dtype=object)
+        hashes = geometry_hash(geoms)
+        bounds = shapely.bounds(geoms)
+        rows = []
+        with self._lock:
+            for i, (geom, h, (minx, miny, maxx, maxy)) in enumerate(zip(geoms, hashes, bounds)):
+                if h is None or np.isnan(minx):
+                    continue
+                cand = self._conn.execute(
+                    "SELECT p.id, p.hash, p.nama, p.file, p.halaman, p.luas_ha, p.geom "
+                    "FROM pkkpr_rtree r JOIN pkkpr p ON p.id = r.id "
+                    "WHERE r.minx <= ? AND r.maxx >= ? AND r.miny <= ? AND r.maxy >= ? AND p.dokumen IS NOT ?",
+                    (float(maxx), float(minx), float(maxy), float(miny), exclude_dokumen),
+                ).fetchall()
+                if not cand:
+                    continue
+                others = shapely.from_wkb([c[6] for c in cand])
+                area = shapely.area(shapely.intersection(geom, others))
+                base = geom.area or 1.0
+                for c, a in zip(cand, area):
+                    if c[1] == h:
+                        jenis = "duplikat"
+                    elif a > 0:
+                        jenis = "tumpang tindih"
+                    else:
+                        continue
+                    rows.append((i, jenis, c[0], c[2], c[3], c[4], c[5], round(min(100.0, a / base * 100), 2)))
+            self._stats["cek"] += len(geoms)
+            self._stats["duplikat"] += sum(1 for r in rows if r[1] == "duplikat")
+            self._stats["tumpang_tindih"] += sum(1 for r in rows if r[1] == "tumpang tindih")
+            self._stats["ms_cek_terakhir"] = round((time.perf_counter() - t0) * 1000, 2)
+        return pd.DataFrame(rows, columns=CHECK_COLUMNS)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["pkkpr"] = self._conn.execute("SELECT COUNT(*) FROM pkkpr").fetchone()[0]
+            s["dokumen"] = self._conn.execute("SELECT COUNT(*) FROM dokumen").fetchone()[0]
+        return s
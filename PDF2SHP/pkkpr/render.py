@@ -0,0 +1,189 @@
+import io
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pkkpr.instrument import timed
+from pkkpr.tiles import BASEMAPS, add_basemap, basemap_source
+
+PNG_DPI = 150
+PNG_SIZE = 10  # inci, persegi
+PNG_TITLE = "Peta Kesesuaian Tapak Proyek dengan PKKPR"
+
+# =========================================================
+# PETA PNG
+# =========================================================
+@timed("render_png")
+def render_peta_png(gdf_poly_3857, gdf_tapak_3857=None, gdf_points_3857=None, tile_store=None,
+                    dpi=PNG_DPI, size=PNG_SIZE):
+    # Semua layer EPSG:3857. Memakai Figure langsung (tanpa pyplot) agar aman dipanggil
+    # dari thread lain, mis. callback download Streamlit.
+    # Kembalikan (png bytes, basemap_ok).
+    # matplotlib baru dimuat saat PNG pertama dirender (tidak membebani start aplikasi)
+    import matplotlib.lines as mlines
+    import matplotlib.patches as mpatches
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    gdf_poly_3857 = gdf_poly_3857.copy()
+    gdf_poly_3857["geometry"] = gdf_poly_3857.geometry.buffer(0)
+
+    if gdf_tapak_3857 is not None:
+        gdf_tapak_3857 = gdf_tapak_3857.copy()
+        gdf_tapak_3857["geometry"] = gdf_tapak_3857.geometry.buffer(0)
+        extent_gdf = pd.concat([gdf_poly_3857, gdf_tapak_3857], ignore_index=True)
+    else:
+        extent_gdf = gdf_poly_3857
+
+    xmin, ymin, xmax, ymax = extent_gdf.total_bounds
+    width = xmax - xmin
+    height = ymax - ymin
+    padx = max(width * 0.20, 100)
+    pady = max(height * 0.20, 100)
+
+    x0 = xmin - padx
+    x1 = xmax + padx
+    y0 = ymin - pady
+    y1 = ymax + pady
+
+    fig = Figure(figsize=(size, size), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
+    # 1. Set extent sebelum basemap
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+
+    # 2. Basemap tanpa mengubah extent; tile dibaca dari cache lokal dulu, baru diunduh bila belum ada
+    basemap_ok = False
+    if tile_store is not None:
+        basemap_ok = add_basemap(ax, tile_store, [basemap_source(name) for name in BASEMAPS]) is not None
+    if not basemap_ok:
+        ax.set_facecolor("#c9e8f5")
+
+    # 3. Plot vektor di atas basemap
+    if gdf_tapak_3857 is not None:
+        gdf_tapak_3857.plot(ax=ax, facecolor="red", edgecolor="red", alpha=0.35, linewidth=1.5, zorder=5)
+
+    gdf_poly_3857.plot(ax=ax, facecolor="none", edgecolor="yellow", linewidth=2, zorder=4)
+
+    if gdf_points_3857 is not None and not gdf_points_3857.empty:
+        gdf_points_3857.plot(ax=ax, color="orange", edgecolor="black", markersize=30, zorder=6)
+
+    # 4. Paksa extent kembali ke nilai awal (plot() bisa menggeser)
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    ax.set_aspect("equal")
+    ax.axis("off")
+    ax.set_title(PNG_TITLE, fontsize=12, pad=10)
+
+    legend_elements = [
+        mlines.Line2D([], [], color="orange", marker="o", markeredgecolor="black", linestyle="None", markersize=8, label="Titik PKKPR"),
+        mpatches.Patch(facecolor="none", edgecolor="yellow", linewidth=2, label="PKKPR"),
+        mpatches.Patch(facecolor="red", edgecolor="red", alpha=0.4, label="Tapak")
+    ]
+
+    poly_centroid = gdf_poly_3857.union_all().centroid
+    corners = {
+        "upper left":  (xmin, ymax),
+        "upper right": (xmax, ymax),
+        "lower left":  (xmin, ymin),
+        "lower right": (xmax, ymin)
+    }
+    max_dist = -1
+    best_corner = "upper right"
+    for loc, (x, y) in corners.items():
+        dist = ((poly_centroid.x - x) ** 2 + (poly_centroid.y - y) ** 2)
+        if dist > max_dist:
+            max_dist = dist
+            best_corner = loc
+
+    ax.legend(handles=legend_elements, loc=best_corner, frameon=True,
+              facecolor="white", framealpha=0.9, edgecolor="black", fontsize=9)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=dpi)
+    return buf.getvalue(), basemap_ok
+
+
+# =========================================================
+# POOL RENDER
+# =========================================================
+class RenderPool:
+    # Batasi render PNG yang berjalan bersamaan (workers) dan yang menunggu (max_queue)
+    # untuk semua sesi. Permintaan identik yang sedang dirender ditunggu bersama, bukan dirender
+    # ulang. Latensi (antre + render) dicatat untuk persentil.
+    # Render tanpa basemap (offline / tile gagal) di-cache dengan kunci terpisah yang berlaku
+    # no_basemap_ttl detik; sesudahnya basemap dicoba lagi (koneksi pulih atau tile baru di-seed).
+
+    def __init__(self, workers=2, max_queue=8, cache=None, history=500, no_basemap_ttl=300):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache = cache
+        self.no_basemap_ttl = no_basemap_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render-png")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._latency = deque(maxlen=history)
+        self._stats = {"render": 0, "dari_cache": 0, "digabung": 0, "ditolak": 0, "gagal": 0}
+
+    def _run(self, key, t_submit, layers, kwargs):
+        try:
+            png, basemap_ok = render_peta_png(*layers, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats["gagal"] += 1
+            raise
+        else:
+            if self.cache is not None:
+                self.cache.put(key if basemap_ok else self._no_basemap_key(key), png)
+            return png
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._latency.append(time.perf_counter() - t_submit)
+            self._slots.release()
+
+    def _no_basemap_key(self, key):
+        return f"{key}|tanpa-basemap|{int(time.time() // self.no_basemap_ttl)}"
+
+    def submit(self, key, *layers, **kwargs):
+        # Future berisi png bytes; RuntimeError bila antrean penuh
+        if self.cache is not None:
+            png = self.cache.get(key)
+            if png is None:
+                png = self.cache.get(self._no_basemap_key(key))
+            if png is not None:
+                with self._lock:
+                    self._stats["dari_cache"] += 1
+                future = Future()
+                future.set_result(png)
+                return future
+        with self._lock:
+            if key in self._inflight:
+                self._stats["digabung"] += 1
+                return self._inflight[key]
+            if not self._slots.acquire(blocking=False):
+                self._stats["ditolak"] += 1
+                raise RuntimeError("Antrean render PNG penuh, coba beberapa saat lagi")
+            self._stats["render"] += 1
+            future = self._executor.submit(self._run, key, time.perf_counter(), layers, kwargs)
+            self._inflight[key] = future
+        return future
+
+    def render(self, key, *layers, timeout=None, **kwargs):
+        return self.submit(key, *layers, **kwargs).result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["sedang_jalan"] = len(self._inflight)
+            latency = np.array(self._latency)
+        for p in (50, 90, 99):
+            s[f"p{p}_detik"] = round(float(np.percentile(latency, p)), 3) if len(latency) else None
+        return s
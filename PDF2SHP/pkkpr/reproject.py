@@ -0,0 +1,80 @@
+import functools
+
+import geopandas as gpd
+import shapely
+from pyproj import CRS, Transformer
+
+from pkkpr.instrument import timed
+
+# =========================================================
+# REPROJECTION CACHE
+# =========================================================
+@functools.lru_cache(maxsize=64)
+def _crs(value):
+    return CRS.from_user_input(value)
+
+
+@functools.lru_cache(maxsize=64)
+def _transformer(src_wkt, dst_wkt):
+    return Transformer.from_crs(CRS.from_wkt(src_wkt), CRS.from_wkt(dst_wkt), always_xy=True)
+
+
+def get_transformer(src, dst):
+    # Transformer pyproj dipakai ulang per pasangan CRS (pembuatannya relatif mahal)
+    return _transformer(_crs(src).to_wkt(), _crs(dst).to_wkt())
+
+
+@timed("reproyeksi")
+def reproject_gdf(gdf, dst):
+    # Sama dengan gdf.to_crs(dst), tetapi memakai Transformer yang di-cache
+    if gdf.crs is None:
+        raise ValueError("Tidak bisa reproyeksi layer tanpa CRS")
+    dst = _crs(dst)
+    transformer = get_transformer(gdf.crs, dst)
+    geoms = shapely.transform(
+        gdf.geometry.to_numpy(),
+        lambda *coords: transformer.transform(*coords),
+        include_z=None,
+        interleaved=False,
+    )
+    result = gdf.copy(deep=False)
+    result[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=dst)
+    return result
+
+
+class ProjectedLayers:
+    # Cache geometri terproyeksi per (layer, CRS) selama satu rerun: setiap layer cukup
+    # ditransformasi sekali per CRS lalu dipakai bersama oleh luas, overlay, peta dan export.
+    # Hasil dibagi antar pemakai, jadi jangan diubah in-place (pakai .copy()).
+
+    def __init__(self):
+        self._layers = {}
+        self._cache = {}
+        self._stats = {"permintaan": 0, "transformasi": 0}
+
+    def set(self, name, gdf, cache=None):
+        # cache: dict proyeksi milik pemanggil untuk gdf yang sama (mis. memo sesi), diisi langsung
+        # sehingga proyeksi rerun ini terpakai lagi di rerun berikutnya
+        self._layers[name] = gdf
+        self._cache[name] = {} if cache is None else cache
+        return gdf
+
+    def get(self, name, crs):
+        self._stats["permintaan"] += 1
+        gdf = self._layers.get(name)
+        if gdf is None:
+            return None
+        cache = self._cache[name]
+        key = _crs(crs).to_wkt()
+        if key not in cache:
+            if gdf.crs is not None and gdf.crs == _crs(crs):
+                cache[key] = gdf
+            else:
+                self._stats["transformasi"] += 1
+                cache[key] = reproject_gdf(gdf, crs)
+        return cache[key]
+
+    def stats(self):
+        s = dict(self._stats)
+        s["dihindari"] = s["permintaan"] - s["transformasi"]
+        return s
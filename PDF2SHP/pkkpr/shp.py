@@ -0,0 +1,199 @@
+import datetime
+import importlib.util
+import io
+import os
+import struct
+import zipfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyogrio
+import shapely
+
+from pkkpr.instrument import timed
+from pkkpr.reproject import get_transformer
+
+# =========================================================
+# SHP
+# =========================================================
+def _zip_dataset(data):
+    # Pilih dataset di dalam ZIP tanpa ekstrak: .shp paling dangkal (lalu urut nama), atau .gpkg.
+    # Kembalikan (bytes ZIP dengan dataset di root, nama layer) atau (None, None).
+    # Dataset di subfolder dikemas ulang ke ZIP baru di memori karena GDAL hanya mengenali
+    # shapefile di root ZIP saat dibaca dari buffer.
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = [n for n in zf.namelist() if not n.endswith("/")]
+        by_depth = lambda n: (n.count("/"), n)
+        shp = sorted((n for n in names if n.lower().endswith(".shp")), key=by_depth)
+        gpkg = sorted((n for n in names if n.lower().endswith(".gpkg")), key=by_depth)
+        if shp:
+            target = shp[0]
+            stem = os.path.splitext(target)[0]
+            members = [n for n in names if os.path.splitext(n)[0] == stem]
+            layer = os.path.basename(stem)
+        elif gpkg:
+            target = gpkg[0]
+            members = [target]
+            layer = None
+        else:
+            return None, None
+        if "/" not in target:
+            return data, layer
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as out:
+            for n in members:
+                out.writestr(os.path.basename(n), zf.read(n))
+        return buf.getvalue(), layer
+
+def zip_fields(uploaded):
+    # Nama kolom atribut layer di ZIP (tanpa membaca fitur)
+    uploaded.seek(0)
+    data, layer = _zip_dataset(uploaded.read())
+    if data is None:
+        return []
+    return list(pyogrio.read_info(io.BytesIO(data), layer=layer)["fields"])
+
+@timed("baca_tapak")
+def read_shp_zip(uploaded, bbox=None, columns=None):
+    # Baca SHP/GPKG langsung dari ZIP di memori lewat GDAL (/vsizip), tanpa folder sementara.
+    # bbox (minx, miny, maxx, maxy) dalam EPSG:4326: hanya fitur yang bersinggungan yang dibaca.
+    # columns: daftar kolom atribut yang dibaca (None = semua).
+    uploaded.seek(0)
+    data, layer = _zip_dataset(uploaded.read())
+    if data is None:
+        return None
+    kwargs = {"layer": layer, "engine": "pyogrio"}
+    if importlib.util.find_spec("pyarrow") is not None:
+        kwargs["use_arrow"] = True
+    if columns is not None:
+        kwargs["columns"] = list(columns)
+    if bbox is not None:
+        crs = pyogrio.read_info(io.BytesIO(data), layer=layer)["crs"] or "EPSG:4326"
+        kwargs["bbox"] = tuple(get_transformer(4326, crs).transform_bounds(*bbox, densify_pts=21))
+    return gpd.read_file(io.BytesIO(data), **kwargs)
+
+def save_shapefile_layers(gdf_poly, gdf_points):
+    # ZIP berisi layer polygon + titik (EPSG:4326), semua file shapefile dibuat langsung di memori
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, gdf in (("PKKPR_Polygon", gdf_poly), ("PKKPR_Points", gdf_points)):
+            if gdf is None:
+                continue
+            for ext, data in shapefile_parts(gdf.to_crs(4326)).items():
+                zf.writestr(name + ext, data)
+    return buf.getvalue()
+
+# =========================================================
+# SHAPEFILE DI MEMORI
+# =========================================================
+# GDAL (pyogrio) tidak bisa menulis shapefile ke buffer memori karena terdiri dari beberapa file,
+# jadi .shp/.shx/.dbf/.prj/.cpg disusun di sini. Cincin luar polygon searah jarum jam (spesifikasi ESRI).
+_SHAPE_TYPES = {"Point": 1, "LineString": 3, "MultiLineString": 3, "Polygon": 5, "MultiPolygon": 5, "MultiPoint": 8}
+
+def _shape_record(geom, shape_type):
+    # Isi satu record .shp (tanpa header record); geometri kosong -> Null shape
+    if geom is None or geom.is_empty:
+        return struct.pack("<i", 0), None
+    if shape_type == 1:
+        return struct.pack("<i2d", 1, geom.x, geom.y), (geom.x, geom.y, geom.x, geom.y)
+    if shape_type == 8:
+        coords = shapely.get_coordinates(geom)
+        parts = []
+    else:
+        if shape_type == 5:
+            rings = shapely.get_rings(shapely.get_parts(shapely.orient_polygons(geom, exterior_cw=True)))
+        else:
+            rings = shapely.get_parts(geom)
+        coords = shapely.get_coordinates(rings)
+        parts = np.cumsum(shapely.get_num_coordinates(rings)) - shapely.get_num_coordinates(rings)
+    bbox = tuple(shapely.bounds(geom))
+    head = struct.pack("<i4d", shape_type, *bbox)
+    if shape_type == 8:
+        return head + struct.pack("<i", len(coords)) + coords.astype("<f8").tobytes(), bbox
+    return (
+        head + struct.pack(f"<2i{len(parts)}i", len(parts), len(coords), *parts)
+        + coords.astype("<f8").tobytes()
+    ), bbox
+
+def _shp_header(shape_type, n_bytes, bbox):
+    return struct.pack(">7i", 9994, 0, 0, 0, 0, 0, n_bytes // 2) + struct.pack("<2i8d", 1000, shape_type, *bbox, 0, 0, 0, 0)
+
+def _shp_shx(geoms):
+    # (.shp, .shx) untuk satu layer; semua geometri harus satu keluarga tipe (mis. Polygon/MultiPolygon)
+    types = {_SHAPE_TYPES.get(g.geom_type) for g in geoms if g is not None and not g.is_empty}
+    if None in types or len(types) > 1:
+        names = sorted({g.geom_type for g in geoms if g is not None and not g.is_empty})
+        raise ValueError(f"Tipe geometri tidak bisa ditulis ke satu shapefile: {', '.join(names)}")
+    shape_type = types.pop() if types else 0
+    records, index, bounds = [], [], []
+    offset = 100
+    for i, geom in enumerate(geoms):
+        content, bbox = _shape_record(geom, shape_type)
+        if bbox:
+            bounds.append(bbox)
+        records.append(struct.pack(">2i", i + 1, len(content) // 2) + content)
+        index.append(struct.pack(">2i", offset // 2, len(content) // 2))
+        offset += 8 + len(content)
+    b = np.array(bounds) if bounds else np.zeros((1, 4))
+    bbox = (b[:, 0].min(), b[:, 1].min(), b[:, 2].max(), b[:, 3].max())
+    shp = _shp_header(shape_type, offset, bbox) + b"".join(records)
+    shx = _shp_header(shape_type, 100 + 8 * len(geoms), bbox) + b"".join(index)
+    return shp, shx
+
+def _dbf_column(series):
+    # (tipe, lebar, desimal, isi sel) satu kolom atribut dBASE; nilai kosong -> sel berisi spasi
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series):
+        return "L", 1, 0, [b"?" if m else (b"T" if v else b"F") for v, m in zip(series, missing)]
+    if pd.api.types.is_integer_dtype(series):
+        return "N", 18, 0, [b"" if m else str(int(v)).encode() for v, m in zip(series, missing)]
+    if pd.api.types.is_float_dtype(series):
+        cells = []
+        for v in series:
+            text = f"{v:.15f}" if np.isfinite(v) else ""
+            cells.append((text if len(text) <= 24 else f"{v:.15e}").encode())
+        return "N", 24, 15, cells
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Seperti GDAL: shapefile tidak punya tipe tanggal-waktu, ditulis sebagai teks
+        series = series.dt.strftime("%Y/%m/%d %H:%M:%S")
+    cells = [b"" if m else str(v).encode("utf-8")[:254] for v, m in zip(series, missing)]
+    return "C", max([len(c) for c in cells] + [1]), 0, cells
+
+def _dbf_names(columns):
+    # Nama field maksimal 10 byte dan unik (seperti GDAL: nama_1, nama_2, ...)
+    names = []
+    for col in columns:
+        base = str(col).encode("utf-8")[:10].decode("utf-8", "ignore")
+        name, n = base, 1
+        while name.upper() in {x.upper() for x in names}:
+            suffix = f"_{n}"
+            name = base.encode("utf-8")[:10 - len(suffix)].decode("utf-8", "ignore") + suffix
+            n += 1
+        names.append(name)
+    return names
+
+def _dbf(df):
+    if df.shape[1] == 0:
+        # dBASE butuh minimal satu field; GDAL juga menambahkan FID
+        df = pd.DataFrame({"FID": np.arange(len(df), dtype=np.int64)})
+    fields = [(name, *_dbf_column(df[col])) for name, col in zip(_dbf_names(df.columns), df.columns)]
+    today = datetime.date.today()
+    record_len = 1 + sum(width for _, _, width, _, _ in fields)
+    header_len = 32 + 32 * len(fields) + 1
+    out = [struct.pack("<4BIHH20x", 3, today.year - 1900, today.month, today.day, len(df), header_len, record_len)]
+    for name, kind, width, decimals, _ in fields:
+        out.append(struct.pack("<11sc4xBB14x", name.encode("utf-8"), kind.encode(), width, decimals))
+    out.append(b"\r")
+    columns = [[c.rjust(width) if kind == "N" else c.ljust(width) for c in cells] for _, kind, width, _, cells in fields]
+    out.extend(b" " + b"".join(row) for row in zip(*columns))
+    out.append(b"\x1a")
+    return b"".join(out)
+
+def shapefile_parts(gdf):
+    # {".shp": bytes, ".shx": ..., ".dbf": ..., ".cpg": ..., ".prj": ...} untuk satu GeoDataFrame
+    shp, shx = _shp_shx(gdf.geometry.to_numpy())
+    parts = {".shp": shp, ".shx": shx, ".dbf": _dbf(pd.DataFrame(gdf.drop(columns=gdf.geometry.name))), ".cpg": b"UTF-8"}
+    if gdf.crs is not None:
+        parts[".prj"] = gdf.crs.to_wkt("WKT1_ESRI").encode()
+    return parts
@@ -0,0 +1,316 @@
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.request
+
+import mercantile
+import numpy as np
+import pandas as pd
+
+from pkkpr.instrument import timed
+
+TILE_SIZE = 256
+USER_AGENT = "pdf2shp-pkkpr/1.0"
+BACKGROUND = (201, 232, 245)  # #c9e8f5, sama dengan latar bila basemap gagal
+RETRY_AFTER = 60  # detik; sumber yang gagal tidak dicoba lagi selama ini (server tanpa internet)
+
+# Urutan sama dengan export PNG: citra Esri, cadangan OpenStreetMap.
+# Disimpan sebagai nama provider; xyzservices baru dimuat saat basemap dipakai
+BASEMAPS = {
+    "esri": "Esri.WorldImagery",
+    "osm": "OpenStreetMap.Mapnik",
+}
+
+
+def basemap_source(name):
+    import xyzservices.providers as xyz
+
+    return xyz.query_name(BASEMAPS[name])
+
+
+def default_tile_dir():
+    return os.environ.get("PKKPR_TILE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "pkkpr", "tiles")
+
+# =========================================================
+# SUMBER TILE
+# =========================================================
+def source_name(source):
+    # xyzservices.TileProvider (xyzservices.providers.*) atau template URL "…/{z}/{x}/{y}.png"
+    # (http(s):// maupun file:// untuk sumber tile lokal)
+    if isinstance(source, str):
+        return "url_" + hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", source.name)
+
+
+def tile_url(source, z, x, y):
+    if isinstance(source, str):
+        return source.format(z=z, x=x, y=y)
+    return source.build_url(x=x, y=y, z=z)
+
+
+def source_max_zoom(source):
+    if isinstance(source, str):
+        return 19
+    return int(source.get("max_zoom", 19) or 19)
+
+
+def fetch_tile(source, z, x, y, timeout=10):
+    req = urllib.request.Request(tile_url(source, z, x, y), headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.read()
+
+
+def auto_zoom(w, s, e, n):
+    # Sama dengan zoom="auto" pada contextily (w/s/e/n dalam lon/lat)
+    zoom_lon = np.ceil(np.log2(360 * 2.0 / abs(e - w)))
+    zoom_lat = np.ceil(np.log2(360 * 2.0 / abs(n - s)))
+    return int(min(zoom_lon, zoom_lat))
+
+# =========================================================
+# TILE STORE (MBTILES PER SUMBER)
+# =========================================================
+class TileStore:
+    # Cache tile basemap di disk: satu file MBTiles (SQLite) per sumber, dengan batas ukuran
+    # total dan eviksi LRU. Sumber jaringan hanya dipakai bila tile belum ada (dan offline=False).
+
+    def __init__(self, tile_dir, max_bytes=512 * 1024 * 1024, offline=False, timeout=10):
+        self.tile_dir = tile_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._conns = {}
+        self._down = {}
+        self._touched = {}  # nama sumber -> {kunci tile: waktu akses}, ditulis oleh flush()
+        self._stats = {"hit": 0, "miss": 0, "unduh": 0, "gagal": 0, "evict": 0}
+        os.makedirs(tile_dir, exist_ok=True)
+        with self._lock:
+            for fname in sorted(os.listdir(tile_dir)):
+                if fname.endswith(".mbtiles"):
+                    self._open(fname[: -len(".mbtiles")])
+            self._bytes = sum(
+                conn.execute("SELECT COALESCE(SUM(LENGTH(tile_data)), 0) FROM tiles").fetchone()[0]
+                for conn in self._conns.values()
+            )
+
+    def _open(self, name):
+        if name not in self._conns:
+            conn = sqlite3.connect(os.path.join(self.tile_dir, f"{name}.mbtiles"), check_same_thread=False)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS tiles (
+                    zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                    last_access REAL, PRIMARY KEY (zoom_level, tile_column, tile_row)
+                );
+                CREATE INDEX IF NOT EXISTS tiles_last_access ON tiles (last_access);
+            """)
+            conn.execute("INSERT OR IGNORE INTO metadata VALUES ('name', ?)", (name,))
+            conn.commit()
+            self._conns[name] = conn
+        return self._conns[name]
+
+    @staticmethod
+    def _key(z, x, y):
+        # MBTiles memakai skema TMS (baris dihitung dari selatan)
+        return (z, x, (1 << z) - 1 - y)
+
+    def get(self, source, z, x, y):
+        with self._lock:
+            conn = self._open(source_name(source))
+            row = conn.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                self._key(z, x, y),
+            ).fetchone()
+            if row is None:
+                self._stats["miss"] += 1
+                return None
+            # Waktu akses dicatat di memori; ditulis sekaligus oleh flush() (per basemap_image)
+            self._touched.setdefault(source_name(source), {})[self._key(z, x, y)] = time.time()
+            self._stats["hit"] += 1
+            return row[0]
+
+    def flush(self):
+        # Tulis waktu akses yang tertunda: satu executemany + commit per sumber
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        touched, self._touched = self._touched, {}
+        for name, keys in touched.items():
+            conn = self._conns[name]
+            conn.executemany(
+                "UPDATE tiles SET last_access=? WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                [(ts,) + key for key, ts in keys.items()],
+            )
+            conn.commit()
+
+    def put(self, source, z, x, y, data):
+        with self._lock:
+            conn = self._open(source_name(source))
+            old = conn.execute(
+                "SELECT LENGTH(tile_data) FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                self._key(z, x, y),
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?)",
+                self._key(z, x, y) + (sqlite3.Binary(data), time.time()),
+            )
+            conn.commit()
+            self._bytes += len(data) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._flush()  # urutan LRU harus memakai waktu akses terbaru
+            self._evict()
+
+    def tile(self, source, z, x, y):
+        # Tile dari cache, atau unduh lalu simpan; None bila tidak tersedia
+        data = self.get(source, z, x, y)
+        if data is not None or self.offline:
+            return data
+        name = source_name(source)
+        if self._down.get(name, 0) > time.time():
+            return None
+        try:
+            data = fetch_tile(source, z, x, y, timeout=self.timeout)
+        except Exception:
+            with self._lock:
+                self._stats["gagal"] += 1
+                self._down[name] = time.time() + RETRY_AFTER
+            return None
+        with self._lock:
+            self._stats["unduh"] += 1
+        self.put(source, z, x, y, data)
+        return data
+
+    def _evict(self):
+        # Hapus tile paling lama tidak dipakai (lintas semua sumber) sampai di bawah batas
+        while self._bytes > self.max_bytes:
+            oldest = None
+            for conn in self._conns.values():
+                row = conn.execute(
+                    "SELECT last_access, zoom_level, tile_column, tile_row, LENGTH(tile_data) "
+                    "FROM tiles ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                if row and (oldest is None or row[0] < oldest[1][0]):
+                    oldest = (conn, row)
+            if oldest is None:
+                break
+            conn, (_, z, x, r, size) = oldest
+            conn.execute("DELETE FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?", (z, x, r))
+            conn.commit()
+            self._bytes -= size
+            self._stats["evict"] += 1
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["mb"] = round(self._bytes / 1024 / 1024, 2)
+        lookups = s["hit"] + s["miss"]
+        s["hit_rate"] = round(s["hit"] / lookups, 3) if lookups else 0.0
+        return s
+
+    # -------------------------
+    # SEEDING
+    # -------------------------
+    def seed(self, source, w, s, e, n, zooms, max_tiles=None, log=None):
+        # Isi cache untuk bbox lon/lat pada zoom yang diberikan; kembalikan jumlah tile tersedia
+        tiles = [t for z in zooms for t in mercantile.tiles(w, s, e, n, z)]
+        if max_tiles is not None and len(tiles) > max_tiles:
+            raise ValueError(f"{len(tiles)} tile melebihi batas {max_tiles}; kecilkan zoom atau area")
+        ok = 0
+        for i, t in enumerate(tiles, 1):
+            if self.tile(source, t.z, t.x, t.y) is not None:
+                ok += 1
+            if log and (i % 100 == 0 or i == len(tiles)):
+                log(f"[{i}/{len(tiles)}] tile tersedia: {ok}")
+        self.flush()
+        return ok
+
+# =========================================================
+# BASEMAP UNTUK MATPLOTLIB (EPSG:3857)
+# =========================================================
+# Mosaik dirakit sendiri (meniru ctx.bounds2img/ctx.add_basemap, lihat tests/test_tiles.py),
+# bukan lewat contextily, karena contextily tidak bisa diarahkan ke TileStore:
+# - tile hanya diambil lewat requests (http/https), jadi file:// atau MBTiles tidak terbaca;
+# - cache-nya joblib per URL di folder temp, tanpa batas ukuran/eviksi dan tidak bisa di-seed;
+# - satu tile gagal membatalkan seluruh basemap, sehingga cakupan offline parsial tidak dipakai;
+# - import contextily ikut memuat rasterio (berat) hanya untuk menempel PNG.
+def _decode(data):
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    if img.size != (TILE_SIZE, TILE_SIZE):
+        img = img.resize((TILE_SIZE, TILE_SIZE))
+    return np.asarray(img)
+
+
+def basemap_image(store, source, x0, y0, x1, y1, zoom="auto"):
+    # Mosaik tile untuk extent EPSG:3857 -> (array RGB, (kiri, kanan, bawah, atas)).
+    # Tile yang tidak tersedia diisi warna latar; ValueError bila tidak ada satu pun.
+    w, s = mercantile.lnglat(x0, y0)
+    e, n = mercantile.lnglat(x1, y1)
+    if zoom == "auto":
+        zoom = auto_zoom(w, s, e, n)
+    zoom = max(0, min(int(zoom), source_max_zoom(source)))
+
+    tiles = list(mercantile.tiles(w, s, e, n, zoom))
+    xs = [t.x for t in tiles]
+    ys = [t.y for t in tiles]
+    tx0, ty0 = min(xs), min(ys)
+    img = np.empty(((max(ys) - ty0 + 1) * TILE_SIZE, (max(xs) - tx0 + 1) * TILE_SIZE, 3), dtype=np.uint8)
+    img[:] = BACKGROUND
+
+    found = 0
+    try:
+        for t in tiles:
+            data = store.tile(source, t.z, t.x, t.y)
+            if data is None:
+                continue
+            try:
+                arr = _decode(data)
+            except Exception:
+                continue
+            r, c = (t.y - ty0) * TILE_SIZE, (t.x - tx0) * TILE_SIZE
+            img[r:r + TILE_SIZE, c:c + TILE_SIZE] = arr
+            found += 1
+    finally:
+        store.flush()
+    if found == 0:
+        raise ValueError(f"Tidak ada tile {source_name(source)} zoom {zoom} yang tersedia")
+
+    ul = mercantile.xy_bounds(mercantile.Tile(tx0, ty0, zoom))
+    lr = mercantile.xy_bounds(mercantile.Tile(max(xs), max(ys), zoom))
+    return img, (ul.left, lr.right, lr.bottom, ul.top)
+
+
+@timed("basemap")
+def add_basemap(ax, store, sources, zoom="auto"):
+    # Pengganti ctx.add_basemap(reset_extent=False) yang membaca TileStore dulu;
+    # sumber dicoba berurutan. Kembalikan nama sumber yang dipakai, None bila semua gagal.
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    for source in sources:
+        try:
+            img, extent = basemap_image(store, source, x0, y0, x1, y1, zoom=zoom)
+        except Exception:
+            continue
+        ax.imshow(img, extent=extent, interpolation="bilinear", zorder=0)
+        ax.set_xlim(x0, x1)
+        ax.set_ylim(y0, y1)
+        return source_name(source)
+    return None
+
+
+def wilayah_bbox(gazetteer, provinsi, kabupaten="", pad=0.05):
+    # Bbox lon/lat titik kecamatan untuk satu provinsi (dan opsional kabupaten)
+    df = gazetteer.df
+    mask = df["PROVINSI"] == provinsi
+    if kabupaten:
+        mask &= df["KABUPATEN/KOTA"] == kabupaten
+    xy = df.loc[mask, ["X", "Y"]].apply(pd.to_numeric, errors="coerce").dropna()
+    if xy.empty:
+        raise ValueError(f"Wilayah tidak ditemukan : {provinsi} {kabupaten}".strip())
+    return (xy["X"].min() - pad, xy["Y"].min() - pad, xy["X"].max() + pad, xy["Y"].max() + pad)
@@ -0,0 +1,162 @@
+import functools
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import shapely
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(BASE_DIR, "Kecamatan.csv")
+
+LEVELS = ("PROVINSI", "KABUPATEN/KOTA", "KECAMATAN")
+
+# =========================================================
+# GAZETTEER KECAMATAN
+# =========================================================
+def read_wilayah_csv(path=CSV_PATH):
+    try:
+        df = pd.read_csv(path, sep=";", encoding="utf-8")
+        df.columns = df.columns.astype(str).str.strip()
+    except:
+        df = pd.DataFrame(columns=["PROVINSI", "KABUPATEN/KOTA", "KECAMATAN", "X", "Y"])
+    return df
+
+
+def utm_columns(lon, lat):
+    # Versi array dari get_utm_info -> (epsg, zona); NaN bila X/Y tidak valid
+    lon = pd.to_numeric(lon, errors="coerce").to_numpy(dtype=float)
+    lat = pd.to_numeric(lat, errors="coerce").to_numpy(dtype=float)
+    ok = np.isfinite(lon) & np.isfinite(lat)
+    zone = np.trunc((np.where(ok, lon, 0) + 180) / 6).astype(int) + 1
+    north = lat >= 0
+    epsg = np.where(north, 32600, 32700) + zone
+    zona = [f"{z}{'N' if n else 'S'}" if v else None for z, n, v in zip(zone, north, ok)]
+    return pd.Series(np.where(ok, epsg, -1)).where(ok), pd.Series(zona, dtype=object)
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0088 * 2 * np.arcsin(np.sqrt(a))
+
+
+NEAREST_COLUMNS = ["PROVINSI", "KABUPATEN/KOTA", "KECAMATAN", "UTM_ZONA", "UTM_EPSG", "JARAK_KM"]
+
+
+class Gazetteer:
+    # Dimuat sekali per proses dan hanya dibaca; semua daftar pilihan sidebar dan
+    # zona UTM per kombinasi provinsi/kabupaten/kecamatan sudah dihitung di awal.
+    # Kunci memakai "" untuk tingkat yang belum dipilih, sama seperti selectbox.
+
+    def __init__(self, df):
+        df = df.copy()
+        for col in LEVELS:
+            if col not in df.columns:
+                df[col] = np.nan
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        epsg, zona = utm_columns(df.get("X", pd.Series(dtype=float)), df.get("Y", pd.Series(dtype=float)))
+        df["UTM_EPSG"] = epsg.to_numpy()
+        df["UTM_ZONA"] = zona.to_numpy()
+        self.df = df
+
+        kabupaten = {}
+        kecamatan = {}
+        zona = {}
+        masks2 = list(itertools.product([False, True], repeat=2))
+        masks3 = [m for m in itertools.product([False, True], repeat=3) if any(m)]
+        rows = zip(
+            *[[None if pd.isna(v) else v for v in df[c].tolist()] for c in LEVELS],
+            df["UTM_ZONA"].tolist(),
+            df["UTM_EPSG"].tolist(),
+        )
+        # Satu kali lewat semua baris: setiap baris masuk ke semua kunci kombinasi "" / nilai
+        for prov, kab, kec, z, epsg in rows:
+            values = (prov, kab, kec)
+            if kab is not None:
+                kabupaten.setdefault(("",), set()).add(kab)
+                if prov is not None:
+                    kabupaten.setdefault((prov,), set()).add(kab)
+            for mask in masks2:
+                key = self._key(values[:2], mask)
+                if key is not None:
+                    group = kecamatan.setdefault(key, set())
+                    if kec is not None:
+                        group.add(kec)
+            for mask in masks3:
+                key = self._key(values, mask)
+                if key is not None:
+                    group = zona.setdefault(key, set())
+                    if z is not None:
+                        group.add((z, int(epsg)))
+
+        self.provinsi_options = self._options(df["PROVINSI"].dropna())
+        self._kabupaten_options = {k: self._options(v) for k, v in kabupaten.items()}
+        self._kabupaten_options.setdefault(("",), ("",))
+        self._kecamatan_options = {k: self._options(v) for k, v in kecamatan.items()}
+        self._zona = {k: tuple(sorted(v)) for k, v in zona.items()}
+
+        # Indeks spasial titik kecamatan (hanya baris dengan X/Y valid dan punya nama wilayah)
+        xy = df.reindex(columns=["X", "Y"]).apply(pd.to_numeric, errors="coerce")
+        keep = xy.notna().all(axis=1) & df[list(LEVELS)].notna().any(axis=1)
+        self._points_df = df[keep].reset_index(drop=True)
+        self._points_xy = xy[keep].to_numpy(dtype=float)
+        self._tree = shapely.STRtree(shapely.points(self._points_xy)) if len(self._points_xy) else None
+
+    @staticmethod
+    def _key(values, mask):
+        # None bila tingkat yang dipilih kosong (baris tidak cocok dengan pilihan apa pun)
+        if any(m and v is None for v, m in zip(values, mask)):
+            return None
+        return tuple(v if m else "" for v, m in zip(values, mask))
+
+    @staticmethod
+    def _options(values):
+        return tuple([""] + sorted(set(str(v) for v in values)))
+
+    @classmethod
+    def load(cls, path=CSV_PATH):
+        return cls(read_wilayah_csv(path))
+
+    def kabupaten_options(self, provinsi=""):
+        return self._kabupaten_options.get((provinsi,), ("",))
+
+    def kecamatan_options(self, provinsi="", kabupaten=""):
+        return self._kecamatan_options.get((provinsi, kabupaten), ("",))
+
+    def nearest_many(self, lon, lat):
+        # Kecamatan terdekat untuk tiap titik lon/lat (EPSG:4326), satu baris per titik
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        out = pd.DataFrame(index=range(len(lon)), columns=NEAREST_COLUMNS, dtype=object)
+        if self._tree is None or len(lon) == 0:
+            return out
+        idx_in, idx_tree = self._tree.query_nearest(shapely.points(lon, lat), all_matches=False)
+        found = self._points_df.iloc[idx_tree]
+        for col in NEAREST_COLUMNS[:-1]:
+            out.loc[idx_in, col] = found[col].to_numpy()
+        out.loc[idx_in, "JARAK_KM"] = haversine_km(
+            lon[idx_in], lat[idx_in], self._points_xy[idx_tree, 0], self._points_xy[idx_tree, 1]
+        )
+        return out
+
+    def nearest(self, lon, lat):
+        row = self.nearest_many([lon], [lat]).iloc[0]
+        if pd.isna(row["JARAK_KM"]):
+            return None
+        return {k: (None if pd.isna(v) else v) for k, v in row.items()}
+
+    def nearest_for_geometries(self, geoms):
+        # geoms dalam EPSG:4326; memakai centroid tiap geometri
+        centroids = shapely.centroid(np.asarray(geoms, dtype=object))
+        return self.nearest_many(shapely.get_x(centroids), shapely.get_y(centroids))
+
+    def zona_utm(self, provinsi="", kabupaten="", kecamatan=""):
+        # None bila tidak ada wilayah yang dipilih/cocok, selain itu [(zona, epsg), ...]
+        return self._zona.get((provinsi, kabupaten, kecamatan))
+
+
+@functools.lru_cache(maxsize=1)
+def default_gazetteer():
+    # Untuk pemakaian tanpa Streamlit (batch); satu instance per proses
+    return Gazetteer.load()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Paket pkkpr dan bench/ diimpor dari folder PDF2SHP, dari mana pun pytest dijalankan
+# (pytest biasa hanya menambahkan tests/ ke sys.path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
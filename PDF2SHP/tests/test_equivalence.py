@@ -0,0 +1,95 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench.bench_fix_geometry import fix_geometry_lama, make_layer
+from bench.bench_luas import luas_lama, make_results
+from bench.bench_overlay import overlay_lama
+from bench.synthetic import format_coordinate, make_pkkpr_gdf, make_tapak_gdf, polygon_coords, write_pkkpr_pdf
+from pkkpr.geometry import fix_geometry, hitung_luas_pkkpr
+from pkkpr.overlay import overlay_areas
+from pkkpr.parse import PARALLEL_MIN_PAGES, extract_tables_and_coords_from_pdf, table_coordinates, table_coordinates_rowwise
+
+# Versi cepat harus memberi hasil yang sama dengan versi lama/per baris (acuan di bench/)
+
+# =========================================================
+# PARSE TABEL
+# =========================================================
+def test_table_coordinates_sama_dengan_per_baris():
+    coords = polygon_coords(12)
+    fmts = ["decimal", "comma", "dms"]
+    rows = []
+    for i, (lon, lat) in enumerate(coords):
+        fmt = fmts[i % 3]
+        rows.append([str(i + 1), format_coordinate(lon, fmt, True), format_coordinate(lat, fmt, False), f"Sumur {i // 4}"])
+    rows += [["x", "", "-", ""], ["13", "None", "abc", "Sumur 9"], ["14", "6,1", "106,2", ""]]
+    df = pd.DataFrame(rows, columns=["no", "bujur", "lintang", "keterangan"])
+    assert table_coordinates(df, "bujur", "lintang", "no", "keterangan") == table_coordinates_rowwise(
+        df, "bujur", "lintang", "no", "keterangan"
+    )
+
+
+# =========================================================
+# GEOMETRI
+# =========================================================
+def test_overlay_areas_sama_dengan_gpd_overlay():
+    gdf_poly = make_pkkpr_gdf().to_crs(32748)
+    gdf_tapak = make_tapak_gdf(500).to_crs(32748)
+    expected = overlay_lama(gdf_tapak, gdf_poly)
+    _, got = overlay_areas(gdf_tapak, gdf_poly)
+    for key in ("luas_tapak", "luas_overlap", "luas_luar"):
+        assert got[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("invalid", [0.0, 0.05])
+def test_fix_geometry_sama_dengan_per_baris(invalid):
+    gdf = make_layer(300, invalid)
+    old = fix_geometry_lama(gdf)
+    new = fix_geometry(gdf)
+    assert len(new) == len(old)
+    assert new.to_crs(32748).area.sum() == pytest.approx(old.to_crs(32748).area.sum(), rel=1e-9)
+    assert new.geometry.is_valid.all()
+
+
+def test_hitung_luas_pkkpr_sama_dengan_per_poligon():
+    results = make_results(50)
+    r_old = copy.deepcopy(results)
+    total_old, utm_old, merc_old = luas_lama(r_old)
+    r_new = copy.deepcopy(results)
+    luas = hitung_luas_pkkpr(r_new)
+    assert luas["total_ha"] == pytest.approx(total_old, rel=1e-9)
+    assert luas["luas_utm"] == pytest.approx(utm_old, rel=1e-9)
+    assert luas["luas_mercator"] == pytest.approx(merc_old, rel=1e-9)
+    np.testing.assert_allclose([r["luas_ha"] for r in r_new], [r["luas_ha"] for r in r_old], rtol=1e-9)
+
+
+# =========================================================
+# EKSTRAKSI PDF: BERURUTAN vs PARALEL
+# =========================================================
+KORPUS = {
+    "desimal": {"n_tables": 2},
+    "koma": {"n_tables": 1, "fmt": "comma"},
+    "dms": {"n_tables": 1, "fmt": "dms"},
+    "sumur": {"n_tables": 1, "wells": 3},
+    "lanjutan": {"n_tables": 2, "continuation": True},
+}
+
+
+@pytest.fixture(scope="module", params=sorted(KORPUS))
+def pdf_path(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("korpus") / f"{request.param}.pdf"
+    return write_pkkpr_pdf(str(path), n_pages=PARALLEL_MIN_PAGES + 2, **KORPUS[request.param])
+
+
+def _extract(path, **kwargs):
+    with open(path, "rb") as f:
+        return extract_tables_and_coords_from_pdf(f, **kwargs)
+
+
+def test_ekstraksi_paralel_sama_dengan_berurutan(pdf_path):
+    expected = _extract(pdf_path, prescreen=False)
+    assert expected
+    assert _extract(pdf_path) == expected
+    assert _extract(pdf_path, workers=2) == expected
@@ -0,0 +1,65 @@
+import math
+import random
+
+import pytest
+
+from pkkpr.parse import (
+    page_may_hold_coordinates,
+    pages_to_rescan,
+    parse_any_coordinate,
+    parse_coordinate_series,
+)
+
+# =========================================================
+# PARSER KOLOM vs PARSER SKALAR
+# =========================================================
+KASUS = [
+    "106.8272", "106,8272", "-6,1754", "+6.5", ".5", "12.", "", "  7  ", None, "None",
+    "12,51e5", "1,5_0", "1_000", "1__0", "_1", "1,000_5", "1e-3", "1E5,", "nan", "-inf", "Infinity",
+    "106°49'38\" BT", "6° 10' 31,4\" LS", "106 49 38", "6º10′31″S", "-6 10 31", "LU 1 2 3", "abc",
+]
+
+
+def _sama(a, b):
+    a = math.nan if a is None else a
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+@pytest.mark.parametrize("teks", KASUS)
+def test_series_sama_dengan_skalar(teks):
+    assert _sama(parse_any_coordinate(teks), parse_coordinate_series([teks])[0])
+
+
+def test_series_sama_dengan_skalar_acak():
+    rng = random.Random(20240517)
+    huruf = "0123456789.,_-+eE °º'\"NSEWBTLUinfa"
+    teks = ["".join(rng.choice(huruf) for _ in range(rng.randint(0, 10))) for _ in range(5000)]
+    hasil = parse_coordinate_series(teks)
+    beda = [(t, parse_any_coordinate(t), h) for t, h in zip(teks, hasil) if not _sama(parse_any_coordinate(t), h)]
+    assert beda == []
+
+
+# =========================================================
+# PRE-SCREENING HALAMAN
+# =========================================================
+@pytest.mark.parametrize("teks", [
+    "No X Y\n1 -\n2 -",
+    "Koordinat titik batas",
+    "Long Lat",
+    "1 106 49 38 BT 6 10 31 LS\n2 106 49 39 BT 6 10 32 LS\n3 106 49 40 BT 6 10 33 LS",
+    "1 106 49' 38 6 10' 31\n2 106 49' 39 6 10' 32\n3 106 49' 40 6 10' 33",
+])
+def test_prescreen_menerima_halaman_koordinat(teks):
+    assert page_may_hold_coordinates(teks)
+
+
+@pytest.mark.parametrize("teks", ["", "Pasal 12 ayat 3 tentang perizinan berusaha yang exact", "Halaman 4 dari 9"])
+def test_prescreen_melewati_halaman_teks(teks):
+    assert not page_may_hold_coordinates(teks)
+
+
+def test_halaman_diulang():
+    skipped = [(0, 999, 0), (4, 999, 1), (5, 999, 0), (9, 999, 2)]
+    tabel = [{"page": 3, "priority": 1, "table": []}]
+    assert pages_to_rescan(skipped, tabel, []) == skipped
+    assert pages_to_rescan(skipped, tabel, [{"coords": []}]) == [(4, 999, 1)]
@@ -0,0 +1,54 @@
+import io
+import zipfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from shapely.geometry import MultiPolygon, Point, Polygon
+
+from bench.synthetic import make_pkkpr_gdf
+from pkkpr.shp import save_shapefile_layers
+
+# =========================================================
+# SHP DI MEMORI vs GDAL
+# =========================================================
+def _layers():
+    lubang = Polygon([(0, 0), (0, 10), (10, 10), (10, 0)], [[(2, 2), (4, 2), (4, 4), (2, 4)]])
+    multi = MultiPolygon([Polygon([(20, 0), (21, 0), (21, 1)]), Polygon([(30, 0), (31, 0), (31, 1)])])
+    poly = gpd.GeoDataFrame(
+        {
+            "nama": ["a", "ééé panjang", None],
+            "halaman": [1, 2, 3],
+            "luas_ha": [1.5, np.nan, -0.25],
+            "provinsi": [None, None, None],
+            "Keterangan_panjang1": ["x", "y", "z"],
+            "Keterangan_panjang2": [1, 2, 3],
+            "ok": [True, False, True],
+            "tgl": pd.to_datetime(["2024-01-02", None, "2023-12-31T10:30:00"], format="ISO8601"),
+        },
+        geometry=[lubang, multi, None],
+        crs=4326,
+    )
+    titik = gpd.GeoDataFrame(geometry=[Point(1, 2), Point(3, 4)], crs=4326)
+    return [(poly, titik), (make_pkkpr_gdf().to_crs(32748), None)]
+
+
+# Peringatan dari GDAL saat menulis acuan (nama kolom dipotong, tanggal jadi teks)
+@pytest.mark.filterwarnings("ignore")
+def test_shp_zip_sama_dengan_gdal(tmp_path):
+    for i, (poly, titik) in enumerate(_layers()):
+        with zipfile.ZipFile(io.BytesIO(save_shapefile_layers(poly, titik))) as zf:
+            zf.extractall(tmp_path / f"baru{i}")
+        for name, gdf in (("PKKPR_Polygon", poly), ("PKKPR_Points", titik)):
+            if gdf is None:
+                continue
+            gdf.to_crs(4326).to_file(tmp_path / f"{name}_{i}.shp")
+            expected = gpd.read_file(tmp_path / f"{name}_{i}.shp")
+            got = gpd.read_file(tmp_path / f"baru{i}" / f"{name}.shp")
+            assert got.crs == expected.crs
+            pd.testing.assert_frame_equal(got.drop(columns="geometry"), expected.drop(columns="geometry"))
+            assert all(
+                (a is None and b is None) or shapely.equals(a, b) for a, b in zip(got.geometry, expected.geometry)
+            )
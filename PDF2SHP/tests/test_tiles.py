@@ -0,0 +1,118 @@
+import http.server
+import io
+import threading
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from pkkpr.tiles import TileStore, add_basemap, basemap_image, source_name
+
+ctx = pytest.importorskip("contextily")
+
+# =========================================================
+# MOSAIK TILESTORE vs CONTEXTILY
+# =========================================================
+def _tile_png(z, x, y):
+    from PIL import Image
+
+    # Warna unik per tile supaya salah letak langsung terlihat
+    rng = np.random.default_rng(z * 1_000_003 + x * 1009 + y)
+    arr = rng.integers(0, 256, size=(256, 256, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class _TileHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        z, x, y = (int(v) for v in self.path.strip("/").removesuffix(".png").split("/"))
+        data = _tile_png(z, x, y)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def tile_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _TileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/{{z}}/{{x}}/{{y}}.png"
+    server.shutdown()
+
+
+# Extent EPSG:3857 sekitar Jawa Barat (satu/dua/empat tile) dan zoom yang diuji
+EXTENTS = [
+    ((11_870_000, -760_000, 11_880_000, -750_000), "auto"),
+    ((11_870_000, -760_000, 11_960_000, -700_000), 10),
+    ((11_800_000, -800_000, 12_100_000, -600_000), "auto"),
+]
+
+
+@pytest.mark.parametrize("extent,zoom", EXTENTS)
+def test_basemap_sama_dengan_contextily(tmp_path, tile_url, extent, zoom):
+    x0, y0, x1, y1 = extent
+    ctx.set_cache_dir(str(tmp_path / "ctx"))
+    img_ctx, ext_ctx = ctx.bounds2img(x0, y0, x1, y1, zoom=zoom, source=tile_url)
+
+    store = TileStore(str(tmp_path / "tiles"))
+    img, ext = basemap_image(store, tile_url, x0, y0, x1, y1, zoom=zoom)
+
+    np.testing.assert_array_equal(img, img_ctx[..., :3])
+    np.testing.assert_allclose(ext, ext_ctx, rtol=0, atol=1e-6)
+
+
+def test_add_basemap_sama_dengan_contextily(tmp_path, tile_url):
+    x0, y0, x1, y1 = EXTENTS[1][0]
+    ctx.set_cache_dir(str(tmp_path / "ctx"))
+    store = TileStore(str(tmp_path / "tiles"))
+    axes = []
+    for pakai_ctx in (True, False):
+        fig, ax = plt.subplots()
+        ax.set_xlim(x0, x1)
+        ax.set_ylim(y0, y1)
+        if pakai_ctx:
+            ctx.add_basemap(ax, source=tile_url, zoom=10, reset_extent=False, attribution=False)
+        else:
+            assert add_basemap(ax, store, [tile_url], zoom=10) is not None
+        axes.append(ax)
+    (im_ctx,), (im,) = axes[0].get_images(), axes[1].get_images()
+    np.testing.assert_array_equal(im.get_array(), im_ctx.get_array()[..., :3])
+    np.testing.assert_allclose(im.get_extent(), im_ctx.get_extent(), rtol=0, atol=1e-6)
+    # Bedanya disengaja: extent sumbu tetap (contextily melebarkannya ke batas tile)
+    assert axes[1].get_xlim() == (x0, x1)
+    plt.close("all")
+
+
+# =========================================================
+# WAKTU AKSES DITULIS PER BATCH
+# =========================================================
+def test_waktu_akses_ditulis_saat_flush(tmp_path):
+    url = "http://contoh.invalid/{z}/{x}/{y}.png"
+    store = TileStore(str(tmp_path), max_bytes=10**9, offline=True)
+    for x in range(3):
+        store.put(url, 5, x, 0, b"tile")
+    conn = store._open(source_name(url))
+    sebelum = dict(conn.execute("SELECT tile_column, last_access FROM tiles").fetchall())
+
+    assert store.get(url, 5, 0, 0) == b"tile"
+    assert dict(conn.execute("SELECT tile_column, last_access FROM tiles").fetchall()) == sebelum
+    store.flush()
+    sesudah = dict(conn.execute("SELECT tile_column, last_access FROM tiles").fetchall())
+    assert sesudah[0] > sebelum[0] and sesudah[1] == sebelum[1]
+
+    # Eviksi memakai waktu akses yang masih tertunda: tile 1 (paling lama) yang dibuang
+    assert store.get(url, 5, 2, 0) == b"tile"
+    store.max_bytes = 3 * len(b"tile")
+    store.put(url, 5, 3, 0, b"tile")
+    sisa = {r[0] for r in conn.execute("SELECT tile_column FROM tiles")}
+    assert sisa == {0, 2, 3}